@@ -0,0 +1,34 @@
+"""
+``Dict`` check speed on documents with same keys order, generic check
+against ``adaptive`` one with specialized check for that order
+"""
+import trafaret as t
+
+from .timer import dataset, measure, report
+
+
+def schema():
+    return t.Dict({
+        'id': t.Int,
+        'name': t.String,
+        'score': t.Float,
+        'tags': t.List(t.String),
+        t.Key('email', optional=True): t.String,
+        t.Key('active', default=True): t.Bool,
+    }).allow_extra('note')
+
+
+def main(size=100000):
+    data = dataset(schema(), size)
+    generic = schema()
+    adaptive = schema().adaptive()
+    assert [adaptive.check(doc) for doc in data] == \
+        [generic.check(doc) for doc in data]
+    for name, trafaret in (('generic', generic), ('adaptive', adaptive)):
+        report('%s, %d docs' % (name, size), measure(
+            lambda: [trafaret.check(doc) for doc in data]), size)
+    print('%-40s %10d' % ('shapes', len(adaptive._shapes)))
+
+
+if __name__ == '__main__':
+    main()
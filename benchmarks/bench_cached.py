@@ -0,0 +1,38 @@
+"""
+Retried payloads checked with ``Cached`` against plain ``Dict``
+"""
+import trafaret as t
+
+from .timer import measure, report
+
+
+def schema():
+    return t.Dict({
+        'id': t.Int,
+        'event': t.Enum('created', 'updated', 'deleted'),
+        'payload': t.Dict({
+            'name': t.String,
+            'tags': t.List(t.String),
+            'score': t.Float,
+        }),
+    })
+
+
+def main(size=20000, retries=5):
+    data = [{'id': i % (size // retries), 'event': 'created',
+             'payload': {'name': 'item%d' % i, 'tags': ['a', 'b', 'c'],
+                         'score': 1.5}}
+            for i in range(size)]
+    for name, trafaret in (
+            ('plain', schema()),
+            ('cached', t.Cached(schema(), maxsize=size)),
+            ('cached by id', t.Cached(schema(), maxsize=size,
+                                      key=lambda d: d['id'])),
+            ('cached no copy', t.Cached(schema(), maxsize=size, copy=False))):
+        check = trafaret.check
+        report('%s, %d retries' % (name, retries),
+               measure(lambda: [check(item) for item in data]), size)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Process startup with schema of several hundred regex keys: importing schema
+module against loading module generated by ``trafaret.codegen`` from warm
+cache, and check speed of both
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+import trafaret as t
+from trafaret import codegen
+
+from .timer import measure, report
+
+
+def schema_source(keys):
+    lines = ['import trafaret as t', '', 'SCHEMA = t.Dict({']
+    for i in range(keys):
+        lines.append("    t.Key('field%d', optional=True): "
+                     "t.String(regex=r'^f%d[a-z]{1,8}(-\\d+)?$'), " % (i, i))
+    lines.append('})')
+    return '\n'.join(lines) + '\n'
+
+
+def startup(code, path, repeat=5):
+    """
+    Best time of ``code`` in fresh process after trafaret is imported,
+    interpreter start is left out as it is too noisy
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([path, os.getcwd()]))
+    command = [sys.executable, '-c',
+               'import time, trafaret\n'
+               'started = time.time()\n'
+               '%s\n'
+               'print(time.time() - started)' % code]
+    return min(float(subprocess.check_output(command, env=env))
+               for _ in range(repeat))
+
+
+def main(keys=500):
+    path = tempfile.mkdtemp()
+    cache_dir = os.path.join(path, 'cache')
+    try:
+        with open(os.path.join(path, 'bench_schema.py'), 'w') as fp:
+            fp.write(schema_source(keys))
+        report('import schema, %d regex keys' % keys, startup(
+            'import bench_schema', path))
+        load = ('from trafaret import codegen; '
+                'codegen.load("bench_schema:SCHEMA", %r)' % cache_dir)
+        report('codegen, cold cache', startup(
+            'import shutil; shutil.rmtree(%r, True); %s' % (cache_dir, load),
+            path))
+        report('codegen, warm cache', startup(load, path))
+        sys.path.insert(0, path)
+        import bench_schema
+        generated = codegen.load('bench_schema:SCHEMA', cache_dir)
+        data = dict(('field%d' % i, 'f%dabc-1' % i) for i in range(keys))
+        assert generated.check(data) == bench_schema.SCHEMA.check(data)
+        report('check runtime', measure(
+            lambda: bench_schema.SCHEMA.check(data), number=100))
+        report('check generated', measure(
+            lambda: generated.check(data), number=100))
+    finally:
+        shutil.rmtree(path)
+
+
+if __name__ == '__main__':
+    main()
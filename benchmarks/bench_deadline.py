@@ -0,0 +1,69 @@
+"""
+Overhead of deadline support: leaf and container checks without
+deadline, checks while other thread holds ``deadline`` scope, and checks
+with deadline set
+"""
+import threading
+
+import trafaret as t
+
+from .timer import measure, report
+
+
+def schema():
+    return t.List(t.Dict({'id': t.Int, 'name': t.String,
+                          'tags': t.List(t.String)}))
+
+
+def unpatched_check(self, value):
+    """ ``Trafaret.check`` without deadline argument, for baseline """
+    if hasattr(self, 'check_value'):
+        self.check_value(value)
+        return self._convert(value)
+    if hasattr(self, 'check_and_return'):
+        return self._convert(self.check_and_return(value))
+    raise NotImplementedError
+
+
+def compare(name, fn, size):
+    # alternate runs, machine noise is larger than measured difference
+    check = t.Trafaret.check
+    baseline, plain = [], []
+    for _ in range(5):
+        t.Trafaret.check = unpatched_check
+        try:
+            baseline.append(measure(fn))
+        finally:
+            t.Trafaret.check = check
+        plain.append(measure(fn))
+    report('%s, baseline' % name, min(baseline), size)
+    report('%s, no deadline' % name, min(plain), size)
+
+
+def main(size=50000):
+    data = [{'id': i, 'name': 'user%d' % i, 'tags': ['a', 'b']}
+            for i in range(size)]
+    trafaret = schema()
+    number = t.Int()
+    compare('Int.check', lambda: [number.check(i) for i in range(size)],
+            size)
+    compare('schema', lambda: trafaret.check(data), size)
+    report('schema, deadline=60', measure(
+        lambda: trafaret.check(data, deadline=60), repeat=5), size)
+    entered, done = threading.Event(), threading.Event()
+
+    def hold_scope():
+        with t.deadline(60):
+            entered.set()
+            done.wait()
+    thread = threading.Thread(target=hold_scope)
+    thread.start()
+    entered.wait()
+    report('schema, scope in other thread',
+           measure(lambda: trafaret.check(data), repeat=5), size)
+    done.set()
+    thread.join()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,32 @@
+"""
+``utils.fold`` / ``utils.unfold`` on flat form posts of 1k, 10k and 100k keys
+"""
+from trafaret.utils import fold, unfold
+
+from .timer import measure, report
+
+
+def form(size):
+    """ Form like ``form__rows__N__field`` with 10 fields per row """
+    data = {}
+    for i in range(size // 10):
+        for field in range(10):
+            data['form__rows__%d__f%d' % (i, field)] = str(i)
+    return data
+
+
+def main():
+    for size in (1000, 10000, 100000):
+        flat = form(size)
+        nested = fold(flat)
+        number = max(1, 10000 // size)
+        report('fold %d keys' % size,
+               measure(lambda: fold(flat), number=number), size)
+        report('fold %d keys with prefix' % size,
+               measure(lambda: fold(flat, 'form'), number=number), size)
+        report('unfold %d keys' % size,
+               measure(lambda: unfold(nested), number=number), size)
+
+
+if __name__ == '__main__':
+    main()
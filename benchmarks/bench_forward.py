@@ -0,0 +1,38 @@
+"""
+Recursive ``Forward`` against ``Forward(iterative=True)`` on deep trees
+"""
+import trafaret as t
+
+from .timer import measure, report
+
+
+def schema(**kwargs):
+    node = t.Forward(**kwargs)
+    node << t.Dict(name=t.String, children=t.List(node))
+    return node
+
+
+def tree(depth, width=1):
+    node = {'name': 'leaf', 'children': []}
+    for _ in range(depth):
+        node = {'name': 'node', 'children': [node] * width}
+    return node
+
+
+def main():
+    recursive = schema()
+    iterative = schema(iterative=True)
+    for depth, width in ((50, 1), (10, 2)):
+        data = tree(depth, width)
+        nodes = sum(width ** level for level in range(depth + 1))
+        report('recursive depth=%d width=%d' % (depth, width),
+               measure(lambda: recursive.check(data), number=50), nodes)
+        report('iterative depth=%d width=%d' % (depth, width),
+               measure(lambda: iterative.check(data), number=50), nodes)
+    data = tree(100000)
+    report('iterative depth=100000',
+           measure(lambda: iterative.check(data), repeat=1), 100001)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+"""
+Cost of ``Limited`` scan on valid data and time to reject oversized data
+"""
+import trafaret as t
+
+from .timer import dataset, measure, report
+
+
+def schema():
+    return t.List(t.Dict({'id': t.Int, 'name': t.String(regex='^[a-z0-9]+$'),
+                          'tags': t.List(t.String)}))
+
+
+def main(size=50000):
+    data = dataset(schema().trafaret, size, max_items=3)
+    limits = dict(max_depth=4, max_total_items=10 * size,
+                  max_string_length=64, max_dict_keys=16)
+    plain = schema()
+    limited = t.Limited(schema(), **limits)
+    report('plain, %d records' % size, measure(lambda: plain.check(data)))
+    report('limited, %d records' % size, measure(lambda: limited.check(data)))
+    report('scan only', measure(lambda: t.check_limits(data, **limits)))
+    huge = data * 4
+    report('plain, oversized list', measure(
+        lambda: t.catch_error(plain, huge), repeat=1))
+    report('limited, oversized list', measure(
+        lambda: t.catch_error(limited, huge)))
+    text = 'a' * (100 * 1024 * 1024)
+    report('limited, 100 MB string', measure(
+        lambda: t.catch_error(limited, [{'id': 1, 'name': text}])))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,31 @@
+"""
+``List(..., parallel=N)`` against single thread, with pure Python items
+and with validator releasing GIL (hashing of large byte strings)
+"""
+import hashlib
+
+import trafaret as t
+
+from .timer import measure, report
+
+
+def digest(value):
+    return hashlib.sha256(value).hexdigest()
+
+
+def main(size=200000, blobs=200, threads=(1, 2, 4, 8)):
+    numbers = [str(i) for i in range(size)]
+    data = [bytes(bytearray([i % 256])) * (1 << 18) for i in range(blobs)]
+    for n in threads:
+        parallel = n if n > 1 else None
+        check = t.List(t.Int, parallel=parallel).check
+        report('List(Int), %d threads' % n,
+               measure(lambda: check(numbers)), size)
+        check = t.List(t.Any() >> digest, parallel=parallel,
+                       parallel_min=1).check
+        report('List(sha256 of 256 KB), %d threads' % n,
+               measure(lambda: check(data)), blobs)
+
+
+if __name__ == '__main__':
+    main()
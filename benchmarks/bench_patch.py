@@ -0,0 +1,39 @@
+"""
+``check_patch`` of small edits against full ``check`` of large document
+"""
+import trafaret as t
+
+from .timer import measure, report
+
+
+def schema():
+    item = t.Dict({
+        'id': t.Int,
+        'title': t.String,
+        'tags': t.List(t.String),
+        'attrs': t.Mapping(t.String, t.Float),
+    })
+    return t.Dict({'name': t.String, 'items': t.List(item)})
+
+
+def main(size=20000):
+    trafaret = schema()
+    doc = trafaret.check({
+        'name': 'catalog',
+        'items': [{'id': i, 'title': 'item %d' % i, 'tags': ['a', 'b'],
+                   'attrs': {'w': 1.0, 'h': 2.0}} for i in range(size)],
+    })
+    json_patch = [{'op': 'replace', 'path': '/items/%d/title' % (size // 2),
+                   'value': 'changed'},
+                  {'op': 'add', 'path': '/items/7/tags/-', 'value': 'c'}]
+    merge_patch = {'name': 'renamed'}
+    report('full check, %d items' % size,
+           measure(lambda: trafaret.check(doc)))
+    report('json patch, 2 operations',
+           measure(lambda: trafaret.check_patch(doc, json_patch), 100))
+    report('merge patch, 1 key',
+           measure(lambda: trafaret.check_patch(doc, merge_patch), 100))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""
+Memory and speed of ``Dict(...).as_record()`` outputs against plain dicts
+"""
+import tracemalloc
+
+import trafaret as t
+
+from .timer import dataset, measure, report
+
+
+def schema():
+    return t.Dict({
+        'id': t.Int,
+        'name': t.String,
+        'score': t.Float,
+        t.Key('email', optional=True): t.String,
+        t.Key('active', default=True): t.Bool,
+    })
+
+
+def retained(fn, data):
+    """ Bytes retained by results of ``fn`` over ``data`` """
+    tracemalloc.start()
+    results = [fn(item) for item in data]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del results
+    return size
+
+
+def main(size=100000):
+    data = dataset(schema(), size)
+    as_dict = schema().check
+    as_record = schema().as_record().check
+    for name, fn in (('dict', as_dict), ('record', as_record)):
+        report('%s output, %d records' % (name, size),
+               measure(lambda: [fn(item) for item in data], repeat=3), size)
+        print('%-40s %10.1f MB' % (
+            '%s output memory' % name, retained(fn, data) / 1024.0 / 1024))
+
+
+if __name__ == '__main__':
+    main()
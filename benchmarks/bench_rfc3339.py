@@ -0,0 +1,33 @@
+"""
+``contrib.rfc_3339.DateTime`` strict parser against ``dateutil`` fallback
+on a batch of timestamps, pass batch size as first argument::
+
+    python -m benchmarks.bench_rfc3339 1000000
+"""
+import sys
+
+from trafaret import List
+from trafaret.contrib.rfc_3339 import DateTime, parse
+
+from .timer import measure, report
+
+
+def timestamps(size):
+    return ['2012-%02d-%02dT%02d:%02d:%02d.%06d+03:00' % (
+        i % 12 + 1, i % 28 + 1, i % 24, i % 60, i % 60, i % 1000000)
+        for i in range(size)]
+
+
+def main(size):
+    data = timestamps(size)
+    report('strict %d timestamps' % size,
+           measure(lambda: List(DateTime()).check(data), repeat=1), size)
+    if parse is None:
+        print('dateutil is not installed, fallback path skipped')
+        return
+    report('dateutil %d timestamps' % size,
+           measure(lambda: List(parse).check(data), repeat=1), size)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,35 @@
+"""
+Cost of shipping schema to worker: pickled ``Described`` against building
+schema from JSON description and constructing it in code
+"""
+import pickle
+
+import trafaret as t
+from trafaret import serialize
+
+from .timer import measure, report
+
+
+def schema(keys=200):
+    return t.Dict(dict(
+        ('field%d' % i, t.String(regex='^f%d[a-z]+$' % i) | t.Int[0:100])
+        for i in range(keys)))
+
+
+def main():
+    described = serialize.Described(schema())
+    text = described.text
+    data = pickle.dumps(described)
+    print('%-40s %10d bytes' % ('pickled Described', len(data)))
+    report('construct in code', measure(schema, number=10))
+    report('build from JSON', measure(lambda: serialize.loads(text),
+                                      number=10))
+    serialize._built.clear()
+    report('unpickle Described, first', measure(
+        lambda: pickle.loads(data), number=1, repeat=1))
+    report('unpickle Described, again', measure(
+        lambda: pickle.loads(data), number=100))
+
+
+if __name__ == '__main__':
+    main()
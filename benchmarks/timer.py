@@ -0,0 +1,27 @@
+"""
+Tiny helpers shared by benchmark scripts. Run benchmarks from the repo root::
+
+    python -m benchmarks.bench_fold
+"""
+import itertools
+import timeit
+
+from trafaret.generator import documents
+
+
+def measure(fn, number=1, repeat=3):
+    """ Best time of one call in seconds """
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number
+
+
+def report(name, seconds, items=None):
+    line = '%-40s %10.3f ms' % (name, seconds * 1000)
+    if items:
+        line += ' %12.0f items/s' % (items / seconds)
+    print(line)
+
+
+def dataset(trafaret, size, invalid=0.0, seed=0, **kwargs):
+    """ Seeded documents for trafaret, ``invalid`` fraction is broken """
+    return [doc for doc, _ in itertools.islice(
+        documents(trafaret, seed=seed, invalid=invalid, **kwargs), size)]
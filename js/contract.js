@@ -83,9 +83,31 @@
      }
    };
 
-   var IntC = function(min, max) {
+   // characters of Python str.isspace(), JavaScript \s differs from them,
+   // int() and float() strip the same but \x1c-\x1f
+   var py_space = "[\\t\\n\\v\\f\\r \\x1c-\\x1f\\x85\\p{Z}]";
+   var py_strip = new RegExp("^" + py_space + "+|" + py_space + "+$", "gu");
+
+   // Python int() and float() take any Unicode decimal digits, they come
+   // in runs of ten code points starting from zero
+   var ascii_digits = function(value) {
+     return value.replace(/\p{Nd}/gu, function(digit) {
+       var code = digit.codePointAt(0), start = code;
+       while (/\p{Nd}/u.test(String.fromCodePoint(start - 1))) {
+         start--;
+       }
+       return String((code - start) % 10);
+     });
+   };
+
+   // gt and lt are exclusive bounds, with convert numeric strings and
+   // booleans are accepted like Python Int and Float do
+   var IntC = function(min, max, gt, lt, convert) {
      this.min = this._select(min, NaN);
      this.max = this._select(max, NaN);
+     this.gt = this._select(gt, NaN);
+     this.lt = this._select(lt, NaN);
+     this.convert = this._select(convert, false);
    };
 
    IntC.prototype = new Trafaret();
@@ -94,15 +116,35 @@
      if (! isNaN(this.min) && value < this.min) {
        this.failure("value is less than " + this.min);
      }
+     if (! isNaN(this.gt) && value <= this.gt) {
+       this.failure("value should be greater than " + this.gt);
+     }
    };
 
    IntC.prototype.check_max = function(value) {
      if (! isNaN(this.max) && value > this.max) {
        this.failure("value is greater than " + this.max);
      }
+     if (! isNaN(this.lt) && value >= this.lt) {
+       this.failure("value should be less than " + this.lt);
+     }
+   };
+
+   IntC.prototype.converted = function(value) {
+     if (this.convert && typeof value == "boolean") {
+       return Number(value);
+     }
+     if (this.convert && typeof value == "string") {
+       var stripped = ascii_digits(value.replace(py_strip, ""));
+       if (/^[+-]?\d[\d_]*$/.test(stripped)) {
+         return Number(stripped.replace(/_/g, ""));
+       }
+     }
+     return value;
    };
 
    IntC.prototype.check = function(value) {
+     value = this.converted(value);
      if (typeof value != "number" || /.*\..*/.test(value.toString())) {
        this.failure("value is not int");
      }
@@ -110,14 +152,32 @@
      this.check_max(value);
    };
 
-   var FloatC = function(min, max) {
-     this.min = this._select(min, NaN);
-     this.max = this._select(max, NaN);
+   var FloatC = function(min, max, gt, lt, convert) {
+     IntC.call(this, min, max, gt, lt, convert);
    };
 
    FloatC.prototype = new IntC(NaN, NaN);
 
+   FloatC.prototype.converted = function(value) {
+     if (this.convert && typeof value == "boolean") {
+       return Number(value);
+     }
+     if (this.convert && typeof value == "string") {
+       var stripped = ascii_digits(value.replace(py_strip, ""))
+         .replace(/_/g, "");
+       if (/^[+-]?(nan|inf|infinity)$/i.test(stripped)) {
+         return /nan/i.test(stripped) ? NaN
+           : (stripped.charAt(0) == "-" ? -Infinity : Infinity);
+       }
+       if (stripped.length && ! isNaN(Number(stripped))) {
+         return Number(stripped);
+       }
+     }
+     return value;
+   };
+
    FloatC.prototype.check = function(value) {
+     value = this.converted(value);
      if (typeof value != "number") {
        this.failure("value is not float");
      }
@@ -125,8 +185,13 @@
      this.check_max(value);
    };
 
-   var StringC = function(allow_blank) {
+   // lengths are counted in code points, regex should match at start of
+   // value, use sticky flag for that
+   var StringC = function(allow_blank, min_length, max_length, regex) {
      this.allow_blank = this._select(allow_blank, false);
+     this.min_length = this._select(min_length, NaN);
+     this.max_length = this._select(max_length, NaN);
+     this.regex = this._select(regex, null);
    };
 
    StringC.prototype = new Trafaret();
@@ -138,6 +203,21 @@
      if (! this.allow_blank && ! value.length) {
        this.failure("blank value is not allowed");
      }
+     var length = value.replace(/[\ud800-\udbff][\udc00-\udfff]/g, "_").length;
+     if (! isNaN(this.min_length) && length < this.min_length) {
+       this.failure("string is shorter than " + this.min_length
+                    + " characters");
+     }
+     if (! isNaN(this.max_length) && length > this.max_length) {
+       this.failure("string is longer than " + this.max_length
+                    + " characters");
+     }
+     if (this.regex) {
+       this.regex.lastIndex = 0;
+       if (! this.regex.test(value)) {
+         this.failure("value does not match pattern");
+       }
+     }
    };
 
    var ListC = function(trafaret, min_length, max_length) {
@@ -179,6 +259,158 @@
      }
    };
 
+   var failed_item = function(name, e) {
+     if (e.name) {
+       name = name + "." + e.name;
+     }
+     return new TrafaretValidationError(name + ": " + e.original_message,
+                                        e.original_message, name);
+   };
+
+   var EnumC = function(variants) {
+     this.variants = variants;
+   };
+
+   EnumC.prototype = new Trafaret();
+
+   EnumC.prototype.check = function(value) {
+     for (var i=0, length=this.variants.length; i < length; i++) {
+       var variant = this.variants[i];
+       if (variant === value) {
+         return;
+       }
+       // Python compares True == 1 and 1 == 1.0
+       if (typeof variant != "string" && typeof value != "string"
+           && variant !== null && value !== null
+           && Number(variant) === Number(value)) {
+         return;
+       }
+     }
+     this.failure("value doesn't match any variant");
+   };
+
+   // keys are [{name: ..., trafaret: ..., optional: true}], allow_extra
+   // and ignore_extra hold names or "*"
+   var DictC = function(keys, allow_extra, ignore_extra) {
+     this.keys = keys;
+     this.allow_extra = this._select(allow_extra, []);
+     this.ignore_extra = this._select(ignore_extra, []);
+   };
+
+   DictC.prototype = new Trafaret();
+
+   DictC.prototype.check = function(value) {
+     if (typeof value != "object" || value === null
+         || value instanceof Array) {
+       this.failure("value is not dict");
+     }
+     var known = {}, key, i, length;
+     for (i=0, length=this.keys.length; i < length; i++) {
+       key = this.keys[i];
+       known[key.name] = true;
+       if (! Object.prototype.hasOwnProperty.call(value, key.name)) {
+         if (! key.optional) {
+           throw new TrafaretValidationError(key.name + ": is required",
+                                             "is required", key.name);
+         }
+         continue;
+       }
+       try {
+         key.trafaret.check(value[key.name]);
+       } catch (e) {
+         if (e instanceof TrafaretValidationError) {
+           throw failed_item(key.name, e);
+         }
+         throw e;
+       }
+     }
+     var extras = this.allow_extra.concat(this.ignore_extra);
+     if (extras.indexOf("*") != -1) {
+       return;
+     }
+     for (var name in value) {
+       if (Object.prototype.hasOwnProperty.call(value, name)
+           && ! known[name] && extras.indexOf(name) == -1) {
+         throw new TrafaretValidationError(
+           name + ": " + name + " is not allowed key",
+           name + " is not allowed key", name);
+       }
+     }
+   };
+
+   var ForwardC = function() {
+     this.trafaret = null;
+   };
+
+   ForwardC.prototype = new Trafaret();
+
+   ForwardC.prototype.provide = function(trafaret) {
+     this.trafaret = trafaret;
+   };
+
+   ForwardC.prototype.check = function(value) {
+     return this.trafaret.check(value);
+   };
+
+   // Builds trafaret from document exported by trafaret.contract in Python
+   var loadTrafaret = function(document) {
+     if (typeof document == "string") {
+       document = JSON.parse(document);
+     }
+     var forwards = {};
+     var load = function(node) {
+       var select = Trafaret.prototype._select;
+       var i, length, items;
+       switch (node.type) {
+       case "Any":
+         return new AnyC();
+       case "Null":
+         return new NullC();
+       case "Bool":
+         return new BoolC();
+       case "Int":
+       case "Float":
+         return new (node.type == "Int" ? IntC : FloatC)(
+           select(node.gte, NaN), select(node.lte, NaN),
+           select(node.gt, NaN), select(node.lt, NaN), true);
+       case "String":
+         return new StringC(node.allow_blank, node.min_length,
+                            node.max_length,
+                            typeof node.regex == "string"
+                            ? new RegExp(node.regex, node.flags) : null);
+       case "Enum":
+         return new EnumC(node.variants);
+       case "List":
+         return new ListC(load(node.trafaret), node.min_length,
+                          node.max_length);
+       case "Or":
+         var or = new OrC();
+         for (i=0, length=node.trafarets.length; i < length; i++) {
+           or.trafarets.push(load(node.trafarets[i]));
+         }
+         return or;
+       case "Dict":
+         items = [];
+         for (i=0, length=node.keys.length; i < length; i++) {
+           items.push({name: node.keys[i].name,
+                       trafaret: load(node.keys[i].trafaret),
+                       optional: !! node.keys[i].optional});
+         }
+         return new DictC(items, node.allow_extra, node.ignore_extra);
+       case "Forward":
+         if (typeof node.ref != "undefined") {
+           return forwards[node.ref];
+         }
+         var forward = forwards[node.id] = new ForwardC();
+         forward.provide(load(node.trafaret));
+         return forward;
+       }
+       throw "unknown trafaret type " + node.type;
+     };
+     return load(typeof document.trafaret == "undefined"
+                 ? document : document.trafaret);
+   };
+
    window["TrafaretValidationError"] = TrafaretValidationError,
    window["AnyC"] = AnyC,
    window["NullC"] = NullC,
@@ -187,6 +419,10 @@
    window["StringC"] = StringC,
    window["BoolC"] = BoolC,
    window["OrC"] = OrC,
-   window["ListC"] = ListC;
+   window["ListC"] = ListC,
+   window["EnumC"] = EnumC,
+   window["DictC"] = DictC,
+   window["ForwardC"] = ForwardC,
+   window["loadTrafaret"] = loadTrafaret;
 
  })();
\ No newline at end of file
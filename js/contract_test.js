@@ -71,4 +71,55 @@ function testListC() {
   c.check([]);
   c.check([[]]);
   assertTrafaretFailure(c, [[1, 2], [""]], "1.0: value is not int");
-}
\ No newline at end of file
+}
+function testIntCBounds() {
+  var c = new IntC(NaN, NaN, 0, 10, true);
+  c.check(1);
+  c.check("9");
+  c.check(true);
+  assertTrafaretFailure(c, 0, "value should be greater than 0");
+  assertTrafaretFailure(c, "10", "value should be less than 10");
+  assertTrafaretFailure(c, "1.5", "value is not int");
+  c = new FloatC(NaN, NaN, NaN, 1, true);
+  c.check(" 0.5 ");
+  assertTrafaretFailure(c, "x", "value is not float");
+  assertTrafaretFailure(c, 1, "value should be less than 1");
+}
+
+function testStringCLength() {
+  var c = new StringC(false, 2, 3, new RegExp("[a-z]", "uy"));
+  c.check("ab1");
+  assertTrafaretFailure(c, "a", "string is shorter than 2 characters");
+  assertTrafaretFailure(c, "abcd", "string is longer than 3 characters");
+  assertTrafaretFailure(c, "1ab", "value does not match pattern");
+}
+
+function testEnumC() {
+  var c = new EnumC(["a", 1]);
+  c.check("a");
+  c.check(true);
+  assertTrafaretFailure(c, "1", "value doesn't match any variant");
+}
+
+function testDictC() {
+  var c = new DictC([{name: "a", trafaret: new IntC()},
+                     {name: "b", trafaret: new StringC(), optional: true}],
+                    ["c"]);
+  c.check({a: 1});
+  c.check({a: 1, b: "x", c: null});
+  assertTrafaretFailure(c, [], "value is not dict");
+  assertTrafaretFailure(c, {}, "a: is required");
+  assertTrafaretFailure(c, {a: 1, b: 2}, "b: value is not string");
+  assertTrafaretFailure(c, {a: 1, d: 2}, "d: d is not allowed key");
+}
+
+function testLoadTrafaret() {
+  var c = loadTrafaret({
+    trafaret: {type: "Forward", id: 0, trafaret: {type: "Dict", keys: [
+      {name: "name", trafaret: {type: "String", max_length: 5}},
+      {name: "children", optional: true, trafaret: {
+        type: "List", trafaret: {type: "Forward", ref: 0}}}]}}});
+  c.check({name: "a", children: [{name: "b"}]});
+  assertTrafaretFailure(c, {name: "a", children: [{}]},
+                        "children.0.name: is required");
+}
@@ -27,7 +27,7 @@ setupconf = dict(
     entry_points=dict(
         trafaret=[
             '.MongoId = trafaret.contrib.object_id:MongoId [objectid]',
-            '.DateTime = trafaret.contrib.rfc_3339:DateTime [rfc3339]'
+            '.DateTime = trafaret.contrib.rfc_3339:DateTime'
         ]
     ),
     classifiers=[
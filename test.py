@@ -1,8 +1,617 @@
 import doctest
 import trafaret
-from trafaret import utils, extras, visitor
+from trafaret import utils, extras, visitor, codegen, serialize, generator, contract
+from trafaret.contrib import rfc_3339
+from trafaret.__main__ import main as cli_main
 
 doctest.testmod(m=trafaret)
 doctest.testmod(m=extras)
 doctest.testmod(m=utils)
 doctest.testmod(m=visitor)
+doctest.testmod(m=codegen)
+doctest.testmod(m=serialize)
+doctest.testmod(m=generator)
+doctest.testmod(m=contract)
+doctest.testmod(m=rfc_3339)
+
+
+def peak_memory(fn, *args):
+    import tracemalloc
+    tracemalloc.start()
+    try:
+        fn(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_max_errors_peak_memory():
+    data = ['bad'] * 20000
+    unlimited = peak_memory(trafaret.catch_error, trafaret.List(trafaret.Int), data)
+    limited = peak_memory(trafaret.catch_error,
+                          trafaret.List(trafaret.Int, max_errors=10), data)
+    assert limited * 10 < unlimited
+    error = trafaret.catch_error(trafaret.List(trafaret.Int, max_errors=10), data)
+    assert len(error.error) == 10 and error.more == 19990
+
+
+def test_errors_limit_scope():
+    import threading
+    schema = trafaret.Mapping(trafaret.String, trafaret.Int)
+    data = {'...': 'a', 'b': 'b'}
+    seen = []
+    with trafaret.errors_limit(1):
+        errors = trafaret.extract_error(schema, data)
+        thread = threading.Thread(target=lambda: seen.append(
+            trafaret.extract_error(schema, data)))
+        thread.start()
+        thread.join()
+    assert len(errors) == 2 and errors[trafaret.truncated] == 'and 1 more'
+    assert seen[0] == trafaret.extract_error(schema, data)
+    assert set(seen[0]) == {'...', 'b'}
+
+
+def test_iter_errors_deep_tree():
+    error = trafaret.DataError('leaf')
+    for _ in range(10000):
+        error = trafaret.DataError({0: error})
+    path, message = next(error.iter_errors())
+    assert len(path) == 10000 and message == 'leaf'
+    assert error.to_json().endswith('"leaf"}')
+
+
+def test_fold_leaf_and_prefix_conflict():
+    import pytest
+    for data in ({'a': 1, 'a__b': 2}, {'a__b': 2, 'a': 1},
+                 {'f__a__b': {'c': 1}, 'f__a__b__c': 2}):
+        with pytest.raises(ValueError):
+            utils.fold(data, 'f' if 'f__a__b' in data else '')
+    schema = trafaret.Dict(a=trafaret.Dict(b=trafaret.Int))
+    error = trafaret.extract_error(schema.check_flat, {'a': 1, 'a__b': 2})
+    assert error == {'a': 'key has both value and nested keys'}
+
+
+def test_lazy_views():
+    import pytest
+    Int, List = trafaret.Int, trafaret.List
+    view = List(Int, lazy=True).check(['1', 'x', 3])
+    assert len(view) == 3 and view[0] == 1 and view[-1] == 3
+    assert view[::2] == [1, 3]
+    for index in (3, -4):
+        with pytest.raises(IndexError):
+            view[index]
+    with pytest.raises(trafaret.DataError):
+        view[1]
+    with pytest.raises(trafaret.DataError):
+        list(view)
+    assert trafaret.extract_error(view.materialize) == {
+        1: "value x can't be converted to int"}
+
+    schema = trafaret.Dict(a=Int, b=List(Int, lazy=True)).make_lazy()
+    view = schema.check({'a': '1', 'b': ['2']})
+    assert set(view) == {'a', 'b'} and 'a' in view and 'c' not in view
+    assert view['a'] == 1 and view['b'][0] == 2
+    with pytest.raises(KeyError):
+        view['c']
+    assert view.materialize() == {'a': 1, 'b': [2]}
+    view = schema.check({'a': 'x', 'b': []})
+    with pytest.raises(trafaret.DataError):
+        view['a']
+    assert view['b'].materialize() == []
+
+    mapping = trafaret.Mapping(trafaret.String, Int, lazy=True)
+    view = mapping.check({'a': '1', 'b': 'x'})
+    assert view['a'] == 1 and len(view) == 2
+    assert trafaret.extract_error(view.materialize) == {
+        'b': {'value': "value x can't be converted to int"}}
+
+
+def test_deep_key_forgets_classes():
+    import gc
+    key = visitor.DeepKey('a.b')
+    for _ in range(100):
+        node = type('Node', (object,), {'b': 1})
+        assert dict(key.pop({'a': node()})) == {'a.b': 1}
+    del node
+    gc.collect()
+    assert len(visitor._item_access) < 10
+
+
+def test_mongo_id_hex_bytes():
+    import pytest
+    object_id = pytest.importorskip('trafaret.contrib.object_id')
+    value = b'0123456789abcdef01234567'
+    expected = object_id.ObjectId('0123456789abcdef01234567')
+    assert object_id.MongoId().check(value) == expected
+    schema = trafaret.List(object_id.MongoId)
+    assert schema.check([value, bytes(expected.binary)]) == [expected] * 2
+    assert trafaret.extract_error(schema, [b'0123456789abcdef0123456z']) == {
+        0: 'value is not ObjectId'}
+
+
+def test_record_field_names():
+    schema = trafaret.Dict({
+        '_id': trafaret.Int,
+        'first-name': trafaret.String,
+        trafaret.Key('class', optional=True): trafaret.String,
+        'name': trafaret.String,
+    }).allow_extra('x-y').as_record('Row')
+    data = {'_id': '1', 'first-name': 'a', 'name': 'b', 'x-y': 2}
+    for row in (schema.check(data), schema.check_flat(data)):
+        assert list(row) == [1, 'a', trafaret.missing, 'b', 2]
+        assert row.name == 'b'
+
+
+def test_bytes_output_checks_items():
+    List, Int = trafaret.List, trafaret.Int
+    data = b'\x01\x05\x09'
+    for item in (trafaret.Enum(1, 5, 9), Int[0:10] | trafaret.Atom(200),
+                 Int >> (lambda x: x * 2), Int[0:10]):
+        schema = List(item, output='bytes')
+        for value in (data, bytearray(data), memoryview(data)):
+            assert schema.check(value) == schema.check(list(data))
+    assert List(Int >> (lambda x: x * 2), output='bytes').check(
+        b'\x01') == b'\x02'
+    for item in (trafaret.Enum(1, 5), Int[0:8] | trafaret.Atom(200)):
+        error = trafaret.extract_error(List(item, output='bytes'), data)
+        assert list(error) == [2]
+
+
+def test_string_buffers_checked_as_text():
+    String = trafaret.String
+    word = String(regex=r'^\w+$', min_length=4, max_length=4)
+    text = u'caf\xe9'
+    for value in (text, text.encode('utf-8'), bytearray(text.encode('utf-8')),
+                  memoryview(text.encode('utf-8'))):
+        res = word.check(value)
+        assert res == text if value is text else res is value
+    assert trafaret.extract_error(
+        String(regex=u'^[\xe9]+$'), b'\xc3\xc3\xa9\xa9') == \
+        'value is not valid utf-8'
+    assert trafaret.extract_error(
+        String(max_length=3), bytearray(text.encode('utf-8'))) == \
+        'String is longer than 3 characters'
+    assert trafaret.extract_error(
+        String(regex='^a$'), memoryview(b'b')) == \
+        "value 'b'b'' does not match pattern: '^a$'"
+    big = bytearray(u'\xe9'.encode('utf-8') * (2 ** 22))
+    bounded = String(min_length=2 ** 22, max_length=2 ** 22)
+    assert bounded.check(big) is big
+    assert peak_memory(bounded.check, big) < 2 ** 20
+
+
+def test_rfc3339_blank_and_offset():
+    DateTime = rfc_3339.DateTime
+    assert DateTime(allow_blank=True).check('') == ''
+    assert trafaret.extract_error(DateTime(), '') == 'value is not valid'
+    for offset in ('+01:75', '+24:00'):
+        assert trafaret.extract_error(
+            DateTime(), '2012-05-30T12:01:02' + offset) == \
+            'value is not RFC3339 timestamp'
+    assert DateTime().check('2012-05-30T12:01:02-23:59').utcoffset() == \
+        -rfc_3339.timedelta(hours=23, minutes=59)
+
+
+def test_iterative_rejects_cycles():
+    tree = trafaret.Forward(iterative=True)
+    tree << trafaret.List(tree | trafaret.Int)
+    loop = [1]
+    loop.append([loop])
+    error = trafaret.catch_error(tree, loop)
+    assert ((1, 0, 0, 0), 'value has reference cycle') in \
+        list(error.iter_errors())
+    assert tree.check([[1], [[2]]]) == [[1], [[2]]]
+
+
+def test_shared_containers():
+    Int, List, Dict = trafaret.Int, trafaret.List, trafaret.Dict
+    item = {'id': '1'}
+    items = List(Dict(id=Int), shared=True)
+    # own memo under deadline and inside walk of other container
+    for res in (items.check([item, item]), items.check([item, item], 10),
+                trafaret.Tuple(items).check([[item, item]], 10)[0]):
+        assert res == [{'id': 1}, {'id': 1}] and res[0] is res[1]
+    numbers = [1]
+    mapping = trafaret.Mapping(trafaret.String, List(Int), shared=True)
+    res = mapping.check({'a': numbers, 'b': numbers})
+    assert res == {'a': [1], 'b': [1]} and res['a'] is res['b']
+    loop = {'next': None}
+    loop['next'] = loop
+    node = trafaret.Forward()
+    node << Dict(next=node | trafaret.Null).share()
+    assert trafaret.extract_error(node, loop) == {
+        'next': {0: 'value has reference cycle',
+                 1: 'value should be None'}}
+    node = trafaret.Forward()
+    node << Dict(next=node | trafaret.Null).share(cycles='reproduce')
+    res = node.check(loop)
+    assert res['next'] is res
+
+
+def test_check_patch_matches_full_check():
+    from trafaret.extras import KeysSubset
+    same = lambda d: {'lo': d['lo'], 'hi': d['hi']} if d['lo'] <= d['hi'] \
+        else trafaret.DataError({'lo': 'lo is greater than hi'})
+    node = trafaret.Forward()
+    node << trafaret.Dict({
+        'name': trafaret.String,
+        'children': trafaret.List(node),
+        'tags': trafaret.Mapping(trafaret.String, trafaret.Int),
+        KeysSubset('lo', 'hi'): same,
+    })
+    raw = {'name': 'root', 'tags': {'a': '1'}, 'lo': 1, 'hi': 2, 'children': [
+        {'name': 'n%d' % i, 'tags': {}, 'lo': 0, 'hi': 0, 'children': []}
+        for i in range(100)
+    ]}
+    doc = node.check(raw)
+    patches = [
+        [{'op': 'replace', 'path': '/children/5/tags', 'value': {'x': '2'}}],
+        [{'op': 'remove', 'path': '/children/0'},
+         {'op': 'move', 'from': '/children/3', 'path': '/children/-'}],
+        [{'op': 'add', 'path': '/children/2/children/0',
+          'value': {'name': 'deep', 'tags': {}, 'lo': 1, 'hi': 1,
+                    'children': []}}],
+        {'children': [], 'tags': {'a': None, 'b': '7'}},
+    ]
+    for patch in patches:
+        patched = trafaret._Patch(doc)
+        if isinstance(patch, dict):
+            patched.merge(patch)
+        else:
+            patched.apply(patch)
+        assert node.check_patch(doc, patch) == node.check(patched.doc)
+    assert doc == node.check(raw)
+    new = node.check_patch(doc, [{'op': 'replace', 'path': '/children/9/name',
+                                  'value': 'x'}])
+    assert new['children'][8] is doc['children'][8]
+    error = trafaret.catch_error(node.check_patch, doc, {'lo': 5})
+    assert error.as_dict() == {'lo': 'lo is greater than hi'}
+
+
+CLI_SCHEMA = trafaret.Dict(id=trafaret.Int, tags=trafaret.List(trafaret.String))
+
+
+def test_cached_error_traceback():
+    import traceback
+    cached = trafaret.Cached(trafaret.Dict(id=trafaret.Int), copy=False)
+    depths = []
+    for _ in range(3):
+        error = trafaret.catch_error(cached, {'id': 'x'})
+        depths.append(len(traceback.extract_tb(error.__traceback__)))
+        assert error.as_dict() == {'id': "value x can't be converted to int"}
+    assert depths[1] == depths[2]
+
+
+def test_cli_validate(tmp_path, capsys):
+    import json
+    path = tmp_path / 'data.ndjson'
+    lines = [json.dumps({'id': i, 'tags': ['a']}) for i in range(1000)]
+    lines[10] = json.dumps({'id': 'x', 'tags': [1]})
+    lines[500] = '{broken'
+    lines[700] = ' '
+    path.write_text('\n'.join(lines) + '\n')
+    args = ['validate', 'test:CLI_SCHEMA', str(path), '--chunk-size', '1000']
+    assert cli_main(args + ['-j', '1']) == 1
+    out, err = capsys.readouterr()
+    failures = [json.loads(line) for line in out.splitlines()]
+    assert [(f['line'], f['path']) for f in failures] == [
+        (11, 'id'), (11, 'tags.0'), (501, '')]
+    assert '3 errors reported' in err and 'checked 999 of 999 records' in err
+    assert cli_main(args + ['-j', '2']) == 1
+    assert capsys.readouterr()[0] == out
+    assert cli_main(args + ['--fail-fast']) == 1
+    assert len(capsys.readouterr()[0].splitlines()) == 1
+    assert cli_main(args + ['--sample', '2']) == 1
+    assert [json.loads(line)['line'] for line in
+            capsys.readouterr()[0].splitlines()] == [11, 11, 501]
+    assert cli_main(args + ['--sample', '3']) == 0
+
+
+def test_shared_schema_threads():
+    from concurrent.futures import ThreadPoolExecutor
+    node = trafaret.Forward()
+    node << trafaret.Dict(name=trafaret.String, children=trafaret.List(node))
+    expected = repr(node)
+    doc = {'name': 'a', 'children': [{'name': 'b', 'children': []}]}
+    items = trafaret.List(trafaret.Int, parallel=4, parallel_min=10)
+
+    def work(i):
+        assert repr(node) == expected
+        assert node.check(doc) == doc
+        assert (node >> len).check(doc) == 2
+        assert items.check(list(range(i))) == list(range(i))
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(work, range(200)))
+    assert repr(node) == expected and not hasattr(node, 'converters')
+
+
+def test_parallel_list_pool():
+    import copy
+    import pickle
+    import threading
+    import time
+    checked = []
+
+    def slow(value):
+        checked.append(value)
+        time.sleep(0.001)
+        if value % 2:
+            raise trafaret.DataError('odd')
+        return value
+    items = trafaret.List(trafaret.Int, parallel=2, parallel_min=2)
+    for clone in (pickle.loads(pickle.dumps(items)), copy.deepcopy(items)):
+        assert clone.check(['1', 2]) == [1, 2]
+    before = threading.active_count()
+    for _ in range(20):
+        trafaret.List(trafaret.Int, parallel=2, parallel_min=2).check([1, 2])
+    assert threading.active_count() <= before + 2
+    limited = trafaret.List(trafaret.Int >> slow, parallel=2, parallel_min=2,
+                            max_errors=1, stop_on_limit=True)
+    error = trafaret.catch_error(limited, list(range(1000)))
+    assert error.stopped and len(checked) < 1000
+
+
+def test_parallel_list_thread_state():
+    import pytest
+    rows = trafaret.List(trafaret.List(trafaret.Int), parallel=2,
+                         parallel_min=2)
+    with trafaret.errors_limit(1):
+        error = trafaret.catch_error(rows, [['a', 'b', 'c']] * 4)
+    assert error.more == 3 and error.error[0].more == 2
+    big = [list(range(100))] * 2000
+    with pytest.raises(trafaret.ValidationTimeout):
+        rows.check(big, deadline=0)
+    with trafaret.deadline(0):
+        with pytest.raises(trafaret.ValidationTimeout):
+            rows.check(big)
+    shared = trafaret.Dict(a=trafaret.Int)
+    extended = shared.allow_extra('b').ignore_extra('c')
+    assert extended.check({'a': 1, 'b': 2, 'c': 3}) == {'a': 1, 'b': 2}
+    assert trafaret.extract_error(shared, {'a': 1, 'b': 2}) == \
+        {'b': 'b is not allowed key'}
+
+
+def test_deadline_through_wrappers():
+    import threading
+    import pytest
+    check = trafaret.Trafaret.check
+    data = [{'id': i} for i in range(5000)]
+    inner = trafaret.List(trafaret.Dict(id=trafaret.Int))
+    for schema in (trafaret.Limited(inner, max_total_items=10 ** 6),
+                   trafaret.Cached(inner),
+                   trafaret.Dict(a=trafaret.Limited(trafaret.Cached(inner)))):
+        value = {'a': data} if isinstance(schema, trafaret.Dict) else data
+        with pytest.raises(trafaret.ValidationTimeout):
+            schema.check(value, deadline=0)
+        results = []
+        with trafaret.deadline(0):
+            other = threading.Thread(target=lambda: results.append(
+                len(schema.check(value))))
+            other.start()
+            other.join()
+            with pytest.raises(trafaret.ValidationTimeout):
+                schema.check(value)
+        assert results == [len(value)]
+        assert len(schema.check(value, deadline=60)) == len(value)
+    assert trafaret.Trafaret.check is check
+
+
+def test_deadline_keeps_forward_options():
+    deep = []
+    for _ in range(1000):
+        deep = [deep]
+    limited = trafaret.Forward(max_depth=100)
+    limited << trafaret.List(limited)
+    node = trafaret.Forward(shared=True, cycles='reproduce')
+    node << trafaret.Dict(name=trafaret.String, next=node | trafaret.Null)
+    loop = {'name': 'a', 'next': None}
+    loop['next'] = loop
+    for kwargs in ({}, {'deadline': 60}):
+        assert trafaret.extract_error(limited.check, deep, **kwargs) \
+            == 'value is nested deeper than 100 containers'
+        assert trafaret.extract_error(
+            trafaret.List(limited).check, [deep], **kwargs) \
+            == {0: 'value is nested deeper than 100 containers'}
+        res = node.check(loop, **kwargs)
+        assert res['next'] is res
+
+
+CODEGEN_SCHEMA = trafaret.Dict({
+    trafaret.Key('id') >> 'pk': trafaret.Int[1:],
+    trafaret.Key('score', default=0.5): trafaret.Float(gte=0, lt=1),
+    'kind': trafaret.Enum('a', 'b') | trafaret.Null,
+    trafaret.Key('tags', optional=True): trafaret.List(
+        trafaret.String(regex=r'^\w+$', max_length=5), max_length=3),
+    trafaret.Key('pair', optional=True): trafaret.Tuple(trafaret.Bool,
+                                                        trafaret.Atom('x')),
+    trafaret.Key('name', optional=True): trafaret.String(max_length=3),
+}).allow_extra('meta')
+
+
+def test_codegen_matches_runtime(tmp_path):
+    values = [None, [], {}, {'id': 1, 'kind': None},
+              {'id': '2', 'kind': 'a', 'score': '0.3', 'meta': [1]},
+              {'id': 0, 'kind': 'c', 'score': 1, 'other': 1},
+              {'id': 1.5, 'kind': 'b', 'tags': ['ok', 'too_long', '-', 3]},
+              {'id': 3, 'kind': 'b', 'tags': ['a'] * 4, 'pair': (1, 'y')},
+              {'id': 3, 'kind': 'b', 'tags': [b'ab'], 'pair': [True, 'x']},
+              {'id': 1, 'kind': None, 'name': u'\xe9\xe9'.encode('utf-8')},
+              {'id': 1, 'kind': None, 'name': b'\xff\xfe'}]
+    generated = codegen.load('test:CODEGEN_SCHEMA', str(tmp_path))
+    for value in values:
+        expected = trafaret.extract_error(CODEGEN_SCHEMA, value)
+        assert trafaret.extract_error(generated, value) == expected
+    assert len(list(tmp_path.glob('*.py'))) == 1
+    assert codegen.load('test:CODEGEN_SCHEMA', str(tmp_path)).check(
+        {'id': 1, 'kind': None}) == {'pk': 1, 'score': 0.5, 'kind': None}
+
+
+@serialize.registry.register(name='test.strip')
+def strip(value):
+    return value.strip()
+
+
+def serialized_schema():
+    node = trafaret.Forward(max_depth=20)
+    node << trafaret.Dict({
+        trafaret.Key('name') >> 'title': trafaret.String(max_length=5) >> strip,
+        trafaret.Key('kind', default='a'): trafaret.Enum('a', 'b'),
+        trafaret.Key('size', optional=True): trafaret.Int(gt=0) | trafaret.Float[0:1],
+        trafaret.Key('pair', optional=True): trafaret.Tuple(trafaret.Bool, str),
+        trafaret.Key('children', optional=True): trafaret.List(
+            node, max_length=2, shared=True),
+        trafaret.Key('map', optional=True): trafaret.Mapping(
+            trafaret.String(regex='(?i)^[a-z]+$'), trafaret.Atom(1),
+            shared=True, cycles='reproduce'),
+    }).allow_extra('meta').ignore_extra('skip').adaptive(2, 4)
+    return trafaret.Limited(node | trafaret.Or(
+        trafaret.Int, trafaret.Null, adaptive=True, reorder_every=2),
+        max_total_items=100)
+
+
+def test_serialize_round_trip():
+    import pickle
+    from concurrent.futures import ProcessPoolExecutor
+    import multiprocessing
+    schema = serialized_schema()
+    text = serialize.dumps(schema)
+    rebuilt = serialize.loads(text)
+    assert serialize.dumps(rebuilt) == text
+    adaptive_dict = rebuilt.trafaret.trafarets[0].trafaret
+    adaptive_or = rebuilt.trafaret.trafarets[1]
+    assert (adaptive_dict.sightings, adaptive_dict.max_shapes) == (2, 4)
+    assert (adaptive_or.adaptive, adaptive_or.reorder_every) == (True, 2)
+    keys = dict((key.name, key.trafaret) for key in adaptive_dict.keys)
+    assert keys['children'].shared and keys['map'].cycles == 'reproduce'
+    values = [None, {}, {'name': ' x '}, {'name': 'toolong', 'kind': 'c'},
+              {'name': 'a', 'size': 0.5, 'pair': [True, 's'], 'meta': 1,
+               'skip': 2, 'other': 3},
+              {'name': 'a', 'size': -1, 'map': {'AB': 1, '1': 2}},
+              {'name': 'a', 'children': [{'name': 'b'}, {'name': 1}, {}]},
+              1, '2', {'name': 'a'}, {'name': 'b'}, {'name': 'c'}]
+    expected = [trafaret.extract_error(schema, value) for value in values]
+    assert [trafaret.extract_error(rebuilt, value)
+            for value in values] == expected
+    described = pickle.loads(pickle.dumps(serialize.Described(schema)))
+    assert [trafaret.extract_error(described, value)
+            for value in values] == expected
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(2, mp_context=context) as pool:
+        # workers import this module to register strip, then build schema
+        assert list(pool.map(trafaret.extract_error,
+                             [described] * len(values), values)) == expected
+
+
+def test_generated_documents():
+    node = trafaret.Forward()
+    node << trafaret.Dict({
+        'id': trafaret.Int(gt=0),
+        'email': trafaret.Email,
+        trafaret.Key('home', optional=True): trafaret.URL,
+        trafaret.Key('score', default=0.5): trafaret.Float(gte=0, lt=1),
+        'tags': trafaret.List(trafaret.String(regex=r'^[a-z]+(-\d)?$'),
+                              min_length=1, max_length=3),
+        'attrs': trafaret.Mapping(trafaret.String(max_length=4),
+                                  trafaret.Int | trafaret.Null),
+        'parent': trafaret.Null | node,
+    }).allow_extra('note')
+    docs = list(generator.documents(node, 300, seed=7, invalid=0.2))
+    assert docs == list(generator.documents(node, 300, seed=7, invalid=0.2))
+    assert docs != list(generator.documents(node, 300, seed=8, invalid=0.2))
+    for doc, valid in docs:
+        error = trafaret.catch_error(node, doc)
+        assert isinstance(error, trafaret.DataError) != valid
+    assert 30 < sum(not valid for doc, valid in docs) < 90
+
+
+JS_CHECK = """
+global.window = global;
+require(process.argv[2]);
+var input = JSON.parse(require('fs').readFileSync(0, 'utf8'));
+var checker = loadTrafaret(input.schema);
+console.log(JSON.stringify(input.docs.map(function(doc) {
+    try { checker.check(doc); return true; } catch (e) { return false; }
+})));
+"""
+
+
+def test_contract_export_never_stricter(tmp_path):
+    import json
+    import os
+    import shutil
+    import subprocess
+    import pytest
+    if shutil.which('node') is None:
+        pytest.skip('node is not installed')
+    script = tmp_path / 'check.js'
+    script.write_text(JS_CHECK)
+    js = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'js',
+                      'contract.js')
+
+    def accepted(schema, docs):
+        document = contract.export(schema)
+        assert document['unexported'] == []
+        out = subprocess.check_output(['node', str(script), js], input=json.dumps(
+            {'schema': document, 'docs': docs}).encode('utf-8'))
+        return json.loads(out.decode('utf-8'))
+    node = trafaret.Forward()
+    node << trafaret.Dict({
+        'id': trafaret.Int(gt=0, lte=1000),
+        'score': trafaret.Float(gte=0, lt=1) | trafaret.Null,
+        'name': trafaret.String(regex=r'^[A-Z]\w*( \d{1,3})?$', max_length=9),
+        'kind': trafaret.Enum('a', 'b', 1),
+        trafaret.Key('tags', default=[]): trafaret.List(
+            trafaret.String(min_length=2), max_length=2),
+        trafaret.Key('parent', optional=True): node,
+        trafaret.Key('code', optional=True): trafaret.String(regex=r'^\w+\s?$'),
+    }).allow_extra('note')
+    docs = [doc for doc, _ in generator.documents(node, 400, seed=3,
+                                                   invalid=0.5)]
+    docs += [{'id': '5', 'score': '0.5', 'name': 'Ab 1\n', 'kind': True,
+              'tags': ['\U0001F600\U0001F600']},
+             {'id': '\u0661\u0662', 'score': '\u0660.\u0665', 'name': 'A',
+              'kind': 'a', 'code': 'x\x1c'},
+             {'id': '\u2028 7\x85', 'score': '\x85 0.5', 'name': 'A', 'kind': 1,
+              'code': 'x\x85'}]
+    js_ok = accepted(node, docs)
+    python = [not isinstance(trafaret.catch_error(node, doc),
+                             trafaret.DataError) for doc in docs]
+    # client may let through what server rejects, never the other way
+    assert all(ok for ok, python_ok in zip(js_ok, python) if python_ok)
+    assert all(python[-2:]) and all(js_ok[-2:])
+    assert sum(not ok for ok in js_ok) > 150
+    for schema, values in ((trafaret.String(regex=r'^\S+$'),
+                            ['x\ufeff', '\u200bx']),
+                           (trafaret.Int(gte=10), ['\u0661\u0662', '\u3000\u0663\u0660\x85'])):
+        assert all(not isinstance(trafaret.catch_error(schema, value),
+                                  trafaret.DataError) for value in values)
+        assert all(accepted(schema, values))
+
+
+def test_adaptive_dict_matches_generic():
+    import random
+
+    def schema():
+        return trafaret.Dict({
+            'id': trafaret.Int,
+            trafaret.Key('name') >> 'title': trafaret.String,
+            trafaret.Key('score', default=0): trafaret.Float,
+            trafaret.Key('tag', optional=True): trafaret.String,
+        }).allow_extra('note').ignore_extra('debug')
+    generic = schema()
+    adaptive = schema().adaptive(sightings=2, max_shapes=4)
+    names = ['id', 'name', 'score', 'tag', 'note', 'debug', 'x']
+    rnd = random.Random(3)
+    for _ in range(3000):
+        doc = dict((name, rnd.choice([1, '2', 'a', None]))
+                   for name in rnd.sample(names, rnd.randint(0, 6)))
+        expected = trafaret.catch_error(generic, doc)
+        res = trafaret.catch_error(adaptive, doc)
+        if isinstance(expected, trafaret.DataError):
+            assert res.as_dict() == expected.as_dict()
+        else:
+            assert list(res.items()) == list(expected.items())
+    assert 0 < len(adaptive._shapes) <= 4
+    extended = adaptive.allow_extra('x')
+    assert adaptive._shapes and not extended._shapes
+    assert extended.check({'x': 1, 'id': 1, 'name': 'a'})['x'] == 1
@@ -7,7 +7,26 @@ import re
 import copy
 import itertools
 import numbers
+import operator
 import pkg_resources
+import codecs
+import mmap
+import time
+import threading
+from array import array
+from collections import namedtuple, OrderedDict
+from json.encoder import encode_basestring_ascii as _encode_json_string
+try:
+    from collections.abc import Mapping as _MappingABC, Sequence as _SequenceABC
+except ImportError:
+    from collections import Mapping as _MappingABC, Sequence as _SequenceABC
+
+from .utils import fold_paths
+
+try:
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:
+    ThreadPoolExecutor = None
 
 
 # Python3 support
@@ -31,14 +50,99 @@ It provides several primitives to validate complex data structures
 Look at doctests for usage examples
 """
 
+# bytes-like values String accepts and List(output='bytes') passes
+_buffer_types = (bytes, bytearray, memoryview)
+_match_type = type(re.match('', ''))
+class _Local(threading.local):
+
+    """
+    Per thread state. Defaults are class attributes, so lookups do not
+    raise ``AttributeError`` in new threads. ``forward_repr``, set of ids
+    of ``Forward`` being repred, is created on first use.
+    """
+
+    # ``Deadline`` of running check, see ``deadline``
+    deadline = None
+    # ``(limit, stop_on_limit)`` set by ``errors_limit``
+    errors_limit = (None, False)
+    # set in ``List`` parallel workers, nested lists run sequentially
+    parallel = False
+
+_local = _Local()
+
 __all__ = ("DataError", "Trafaret", "Any", "Int", "String",
            "List", "Dict", "Or", "Null", "Float", "Enum", "Callable",
            "Call", "Forward", "Bool", "Type", "Mapping", "guard", "Key",
-           "Tuple", "Atom", "Email", "URL")
+           "Tuple", "Atom", "Email", "URL", "errors_limit", "truncated",
+           "LazyDict", "LazyList", "missing", "check_iterative", "Cached",
+           "Limited", "check_limits",
+           "Deadline", "deadline", "ValidationTimeout")
 
 ENTRY_POINT = 'trafaret'
 _empty = object()
 
+
+class _Missing(object):
+
+    """
+    Value of optional keys absent in data for ``Dict(...).as_record()``
+    """
+
+    def __repr__(self):
+        return '<missing>'
+
+    def __bool__(self):
+        return False
+    __nonzero__ = __bool__
+
+missing = _Missing()
+
+class _Truncated(object):
+
+    """
+    Key of errors dropped by container errors limit in ``as_dict`` and
+    ``iter_errors``, it is not string so it can't clash with data keys
+    """
+
+    def __repr__(self):
+        return '<truncated>'
+
+    def __str__(self):
+        return '...'
+
+truncated = _Truncated()
+
+
+class errors_limit(object):
+
+    """
+    Context manager setting default errors limit for ``List``, ``Dict``
+    and ``Mapping`` checked in current thread. Containers with own
+    ``max_errors``, see ``limit_errors``, ignore this default.
+
+    >>> with errors_limit(1):
+    ...     extract_error(List(Int), ['a', 'b', 'c'])
+    {0: "value a can't be converted to int", <truncated>: 'and 2 more'}
+    >>> len(extract_error(List(Int), ['a', 'b', 'c']))
+    3
+    """
+
+    def __init__(self, limit, stop_on_limit=False):
+        self.limit = (limit, stop_on_limit)
+
+    def __enter__(self):
+        self.previous = _default_errors_limit()
+        _local.errors_limit = self.limit
+        return self
+
+    def __exit__(self, *exc_info):
+        _local.errors_limit = self.previous
+
+
+def _default_errors_limit():
+    """ ``(limit, stop_on_limit)`` set by ``errors_limit`` in this thread """
+    return _local.errors_limit
+
 def py3metafix(cls):
     if not py3:
         return cls
@@ -56,24 +160,467 @@ class DataError(ValueError):
     data can be anything
     """
 
-    def __init__(self, error=None, name=None):
+    def __init__(self, error=None, name=None, more=0, stopped=False):
         self.error = error
         self.name = name
+        # count of children errors dropped by container errors limit
+        self.more = more
+        self.stopped = stopped
 
     def __str__(self):
+        if self.more:
+            return '%s %s' % (self.error, self.more_message())
         return str(self.error)
 
     def __repr__(self):
         return 'DataError(%s)' % str(self)
 
+    def more_message(self):
+        if self.stopped:
+            return 'and more, validation stopped'
+        return 'and %d more' % self.more
+
     def as_dict(self):
         def as_dict(dataerror):
             if not isinstance(dataerror.error, dict):
-                return self.error
-            return dict((k, v.as_dict() if isinstance(v, DataError) else v)
-                        for k, v in dataerror.error.items())
+                return dataerror.error
+            res = dict((k, v.as_dict() if isinstance(v, DataError) else v)
+                       for k, v in dataerror.error.items())
+            if dataerror.more:
+                res[truncated] = dataerror.more_message()
+            return res
         return as_dict(self)
 
+    def iter_errors(self):
+        """
+        Lazily yields ``(path, message)`` pairs for every leaf error,
+        ``path`` is a tuple of keys from the root error. Walks the tree
+        with explicit stack, so deep errors do not hit recursion limit.
+
+        >>> err = catch_error(Dict(a=List(Int), b=String), {'a': [1, 'x'], 'b': 1})
+        >>> sorted(err.iter_errors())
+        [(('a', 1), "value x can't be converted to int"), (('b',), 'value is not a string')]
+        >>> list(DataError('oops').iter_errors())
+        [((), 'oops')]
+        """
+        stack = [((), self)]
+        while stack:
+            path, error = stack.pop()
+            if not isinstance(error, DataError):
+                yield path, error
+            elif isinstance(error.error, dict):
+                if error.more:
+                    stack.append((path + (truncated,), error.more_message()))
+                items = list(error.error.items())
+                for key, child in reversed(items):
+                    stack.append((path + (key,), child))
+            else:
+                yield path, error.error
+
+    def as_flat_dict(self, sep='.'):
+        """
+        Returns flat dict with ``sep`` joined paths as keys
+
+        >>> err = catch_error(Dict(a=List(Int)), {'a': [1, 'x']})
+        >>> err.as_flat_dict()
+        {'a.1': "value x can't be converted to int"}
+        >>> err.as_flat_dict(sep='__')
+        {'a__1': "value x can't be converted to int"}
+        """
+        return dict((sep.join(map(str, path)), message)
+                    for path, message in self.iter_errors())
+
+    def iter_json(self, sep='.'):
+        """
+        Yields chunks of JSON object built like ``as_flat_dict``,
+        can be written to response as is without building whole report
+
+        >>> err = catch_error(Dict(a=List(Int)), {'a': [1, 'x']})
+        >>> print(''.join(err.iter_json()))
+        {"a.1": "value x can't be converted to int"}
+        """
+        yield '{'
+        first = True
+        for path, message in self.iter_errors():
+            yield '%s%s: %s' % (
+                '' if first else ', ',
+                _encode_json_string(sep.join(map(str, path))),
+                _encode_json_string(unicode(message)),
+            )
+            first = False
+        yield '}'
+
+    def to_json(self, sep='.'):
+        return ''.join(self.iter_json(sep=sep))
+
+
+class ErrorsCollector(object):
+
+    """
+    Collects children errors of container trafaret. Stores no more than
+    ``limit`` errors, the rest are only counted. With ``stop_on_limit``
+    ``add`` returns ``False`` when container should stop validation.
+    """
+
+    def __init__(self, limit=None, stop_on_limit=False):
+        self.errors = {}
+        self.limit = limit
+        self.stop_on_limit = stop_on_limit
+        self.more = 0
+
+    def add(self, key, error):
+        if self.limit is None or len(self.errors) < self.limit:
+            self.errors[key] = error
+            return True
+        self.more += 1
+        return not self.stop_on_limit
+
+    def __bool__(self):
+        return bool(self.errors or self.more)
+    __nonzero__ = __bool__
+
+    def raise_error(self):
+        raise DataError(error=self.errors, more=self.more,
+                        stopped=self.stop_on_limit and bool(self.more))
+
+
+class ValidationTimeout(DataError):
+
+    """
+    Raised when check runs out of deadline, ``path`` holds keys of
+    value being checked at that moment
+    """
+
+    def __init__(self, path=()):
+        DataError.__init__(self, error='validation deadline exceeded at %s'
+                           % ('.'.join(map(str, path)) or 'root'))
+        self.path = path
+
+    def __repr__(self):
+        return 'ValidationTimeout(%s)' % self
+
+
+class Deadline(object):
+
+    """
+    Time budget for checks. Pass it or seconds as ``deadline`` to
+    ``check``, or use ``deadline`` context manager for all checks in
+    ``with`` block. Containers ``Dict``, ``List``, ``Mapping``, ``Tuple``,
+    ``Or`` and ``Forward`` are checked with explicit stack then, clock is
+    read every ``every`` checked values:
+
+    >>> schema = List(Dict(id=Int))
+    >>> data = [{'id': i} for i in range(10000)]
+    >>> err = catch_error(schema.check, data, deadline=0)
+    >>> err
+    ValidationTimeout(validation deadline exceeded at 31)
+    >>> err.path
+    (31,)
+    >>> len(schema.check(data, deadline=60))
+    10000
+    >>> with deadline(0):
+    ...     extract_error(schema, data)
+    'validation deadline exceeded at 31'
+    >>> Int().check('1', deadline=Deadline(0))
+    1
+    """
+
+    def __init__(self, seconds, every=64, timer=getattr(
+            time, 'monotonic', time.time)):
+        self.timer = timer
+        self.at = timer() + seconds
+        self.every = every
+
+    def expired(self):
+        return self.timer() >= self.at
+
+
+class deadline(object):
+
+    """
+    Context manager setting ``Deadline`` for checks in current thread
+    """
+
+    def __init__(self, seconds, **kwargs):
+        self.deadline = seconds if isinstance(seconds, Deadline) \
+            else Deadline(seconds, **kwargs)
+
+    def __enter__(self):
+        self.previous = _local.deadline
+        _local.deadline = self.deadline
+        return self.deadline
+
+    def __exit__(self, *exc_info):
+        _local.deadline = self.previous
+        return False
+
+
+def _current_deadline(deadline):
+    if isinstance(deadline, Deadline):
+        return deadline
+    return Deadline(deadline)
+
+
+def _check_in_time(trafaret, value, deadline):
+    """
+    Checks containers with ``check_iterative``, which reads clock while
+    walking them. Deadline is kept in thread local for the check, so
+    containers checked by wrappers like ``Limited`` or ``Cached`` use it.
+    """
+    previous = _local.deadline
+    _local.deadline = deadline
+    try:
+        if not _walks_itself(trafaret):
+            if hasattr(trafaret, '_iter_check'):
+                return check_iterative(trafaret, value, deadline=deadline)
+        elif not isinstance(trafaret, Forward):
+            # container with ``shared`` walks value with its own memo
+            return _check_walk(trafaret, value, None, True, trafaret.cycles,
+                               deadline, trafaret)
+        return Trafaret.check(trafaret, value)
+    finally:
+        _local.deadline = previous
+
+
+def _container_check(self, value, deadline=None):
+    """
+    ``check`` of containers, also picks up deadline of ``deadline`` block
+    or of outer check. Leaf trafarets do not read it, so checks without
+    deadline cost the same as before.
+    """
+    if deadline is None:
+        deadline = _local.deadline
+        if deadline is None:
+            if getattr(self, 'shared', False):
+                return _check_in_time(self, value, None)
+            return Trafaret.check(self, value)
+    return _check_in_time(self, value, _current_deadline(deadline))
+
+
+def _flat_value(items):
+    """ Folds ``(path, value)`` pairs, single pair with empty path is value """
+    if len(items) == 1 and not items[0][0]:
+        return items[0][1]
+    if any(not path for path, _ in items):
+        raise DataError('key has both value and nested keys')
+    try:
+        return fold_paths(items)
+    except ValueError as exc:
+        raise DataError(str(exc))
+
+
+def _flat_buckets(items):
+    """ Groups ``(path, value)`` pairs by path head """
+    buckets = {}
+    for path, value in items:
+        if path:
+            buckets.setdefault(path[0], []).append((path[1:], value))
+    return buckets
+
+
+def _checked_flat(trafaret, items):
+    if isinstance(trafaret, Trafaret):
+        return trafaret._check_flat(items)
+    return trafaret(_flat_value(items))
+
+
+class _Touched(object):
+
+    """
+    Node of patched paths tree. ``children`` maps keys to child nodes or
+    to ``True`` for values to be checked whole, ``original`` is container
+    before patch, ``resized`` is set when items of list were shifted.
+    """
+
+    __slots__ = ('children', 'original', 'resized')
+
+    def __init__(self, original):
+        self.children = {}
+        self.original = original
+        self.resized = False
+
+
+class _Patch(object):
+
+    """
+    Applies JSON Patch (RFC 6902) operations to document. Containers on
+    patched paths are copied, the rest of document is shared.
+
+    >>> doc = {'a': {'b': [1, 2]}, 'c': {'d': 1}}
+    >>> patch = _Patch(doc)
+    >>> patch.apply([{'op': 'add', 'path': '/a/b/-', 'value': 3},
+    ...              {'op': 'replace', 'path': '/a/x', 'value': 1}])
+    Traceback (most recent call last):
+    ...
+    trafaret.DataError: path /a/x does not exist
+    >>> patch.apply([{'op': 'remove', 'path': '/a/b/0'}])
+    >>> patch.doc['a'], doc['a'], patch.doc['c'] is doc['c']
+    ({'b': [2, 3]}, {'b': [1, 2]}, True)
+    """
+
+    def __init__(self, doc):
+        self.doc = doc
+        self.touched = None
+        # copies made by patch, kept referenced so ids are not reused
+        self.owned = {}
+
+    def apply(self, operations):
+        for operation in operations:
+            op = operation.get('op')
+            path = operation.get('path')
+            if op in ('add', 'replace', 'test') and 'value' not in operation:
+                raise DataError("%s operation requires value" % op)
+            if op == 'add':
+                self.add(path, operation['value'])
+            elif op == 'remove':
+                self.remove(path)
+            elif op == 'replace':
+                self.replace(path, operation['value'])
+            elif op == 'move':
+                value = self.get(operation.get('from'))
+                self.remove(operation.get('from'))
+                self.add(path, value)
+            elif op == 'copy':
+                self.add(path, copy.deepcopy(self.get(operation.get('from'))))
+            elif op == 'test':
+                if self.get(path) != operation['value']:
+                    raise DataError("test failed for path %s" % path)
+            else:
+                raise DataError("unknown patch operation %r" % op)
+
+    def merge(self, patch):
+        """ Applies JSON Merge Patch (RFC 7396) """
+        self.doc, touched = _merge_patch(self.doc, patch)
+        if touched is not None:
+            self.touched = touched
+
+    @staticmethod
+    def segments(path):
+        if not isinstance(path, str_types) or path and path[0] != '/':
+            raise DataError("invalid path %r" % (path,))
+        return [seg.replace('~1', '/').replace('~0', '~')
+                for seg in path.split('/')[1:]]
+
+    @staticmethod
+    def key(container, seg, path, append=False):
+        if isinstance(container, list):
+            if append and seg == '-':
+                return len(container)
+            if not seg.isdigit() \
+                    or int(seg) >= len(container) + (1 if append else 0):
+                raise DataError("path %s does not exist" % path)
+            return int(seg)
+        if isinstance(container, dict):
+            if not append and seg not in container:
+                raise DataError("path %s does not exist" % path)
+            return seg
+        raise DataError("path %s does not exist" % path)
+
+    def get(self, path):
+        value = self.doc
+        for seg in self.segments(path):
+            value = value[self.key(value, seg, path)]
+        return value
+
+    def own(self, value):
+        if id(value) not in self.owned:
+            value = copy.copy(value)
+            self.owned[id(value)] = value
+        return value
+
+    def parent(self, segments, path):
+        """ Returns patched container for path and its touched node """
+        if self.touched is None:
+            self.touched = _Touched(self.doc)
+        self.doc = container = self.own(self.doc)
+        node = self.touched
+        for seg in segments[:-1]:
+            key = self.key(container, seg, path)
+            original = container[key]
+            if not isinstance(original, (dict, list)):
+                raise DataError("path %s does not exist" % path)
+            container[key] = child = self.own(original)
+            if node is not True:
+                node = node.children.setdefault(key, _Touched(original))
+            container = child
+        if not isinstance(container, (dict, list)):
+            raise DataError("path %s does not exist" % path)
+        return container, node
+
+    def add(self, path, value):
+        segments = self.segments(path)
+        if not segments:
+            self.doc, self.touched = value, True
+            return
+        container, node = self.parent(segments, path)
+        key = self.key(container, segments[-1], path, append=True)
+        if isinstance(container, list):
+            container.insert(key, value)
+            if node is not True:
+                node.resized = True
+        else:
+            container[key] = value
+            if node is not True:
+                node.children[key] = True
+
+    def remove(self, path):
+        segments = self.segments(path)
+        if not segments:
+            raise DataError("document root can't be removed")
+        container, node = self.parent(segments, path)
+        key = self.key(container, segments[-1], path)
+        del container[key]
+        if node is not True:
+            if isinstance(container, list):
+                node.resized = True
+            else:
+                node.children[key] = True
+
+    def replace(self, path, value):
+        segments = self.segments(path)
+        if not segments:
+            self.doc, self.touched = value, True
+            return
+        container, node = self.parent(segments, path)
+        key = self.key(container, segments[-1], path)
+        container[key] = value
+        if node is not True:
+            node.children[key] = True
+
+
+def _merge_patch(target, patch):
+    """
+    Returns merged document and its touched node, ``None`` if nothing
+    was changed
+    """
+    if not isinstance(patch, dict):
+        return patch, True
+    if not isinstance(target, dict):
+        return _merge_patch({}, patch)[0], True
+    merged = copy.copy(target)
+    node = _Touched(target)
+    for key, value in patch.items():
+        if value is None:
+            if key in merged:
+                del merged[key]
+                node.children[key] = True
+            continue
+        if key in merged:
+            merged[key], touched = _merge_patch(merged[key], value)
+        else:
+            merged[key], touched = _merge_patch(None, value)
+        if touched is not None:
+            node.children[key] = touched
+    return merged, node if node.children else None
+
+
+def _checked_patch(trafaret, value, touched):
+    """ Checks patched value, untouched parts of it are taken as is """
+    if touched is True or hasattr(trafaret, 'converters') \
+            or not isinstance(trafaret, Trafaret):
+        return getattr(trafaret, 'check', trafaret)(value)
+    return trafaret._check_patched(value, touched)
+
 
 class TrafaretMeta(type):
 
@@ -110,15 +657,27 @@ class Trafaret(object):
     Check order
     >>> (Int() >> float >> str).check(4)
     '4.0'
+
+    ``>>`` returns copy, trafaret itself is not changed, so it can be
+    shared between threads
+    >>> number = Int()
+    >>> double = number >> (lambda x: x * 2)
+    >>> number.check(2), double.check(2)
+    (2, 4)
     """
 
     __metaclass__ = TrafaretMeta
 
-    def check(self, value):
+    def check(self, value, deadline=None):
         """
         Common logic. In subclasses you need to implement check_value or
         check_and_return.
+
+        ``deadline`` is time budget in seconds or ``Deadline``, see
+        ``Deadline``.
         """
+        if deadline is not None:
+            return _check_in_time(self, value, _current_deadline(deadline))
         if hasattr(self, 'check_value'):
             self.check_value(value)
             return self._convert(value)
@@ -128,6 +687,66 @@ class Trafaret(object):
         raise NotImplementedError("You must implement check_value or"
                                   " check_and_return methods '%s'" % cls)
 
+    def check_flat(self, data, prefix='', delimeter='__'):
+        """
+        Checks flat form data like ``{'form__a__0': 1}`` without folding it
+        first. Keys are matched with ``Dict`` keys and ``List`` items by
+        path, errors are reported with same flat names as in ``data``.
+        See ``Dict`` for examples.
+        """
+        head = prefix + delimeter if prefix else ''
+        head_len = len(head)
+        items = []
+        for key, value in data.items():
+            if head:
+                if not key.startswith(head):
+                    continue
+                key = key[head_len:]
+            items.append((tuple(key.split(delimeter)), value))
+        try:
+            return self._check_flat(items)
+        except DataError as err:
+            root = (prefix,) if prefix else ()
+            errors = dict(
+                (delimeter.join(map(str, root + path)), DataError(message))
+                for path, message in err.iter_errors()
+            )
+            raise DataError(error=errors)
+
+    def _check_flat(self, items):
+        """
+        Checks ``(path, value)`` pairs relative to this trafaret. Containers
+        override it to dispatch pairs to children without folding.
+        """
+        return self.check(_flat_value(items))
+
+    def check_patch(self, previous_valid, patch):
+        """
+        Checks ``previous_valid`` output of this trafaret changed by
+        ``patch``, which is JSON Patch list of operations or JSON Merge
+        Patch dict. Only values on patched paths are checked, walking
+        ``Dict`` keys, ``List`` items, ``Mapping`` values and ``Forward``.
+        Other trafarets, trafarets with converters and keys like
+        ``KeysSubset`` recheck their whole value. Untouched parts of
+        ``previous_valid`` are shared with result, which relies on checked
+        output being valid input. See ``Dict`` for examples.
+        """
+        patched = _Patch(previous_valid)
+        if isinstance(patch, dict):
+            patched.merge(patch)
+        else:
+            patched.apply(patch)
+        if patched.touched is None:
+            return previous_valid
+        return _checked_patch(self, patched.doc, patched.touched)
+
+    def _check_patched(self, value, touched):
+        """
+        Checks ``value`` with paths in ``touched`` node changed by patch.
+        Containers override it to check touched children only.
+        """
+        return self.check(value)
+
     def converter(self, value):
         """
         You can change converter with `>>` operator or append method
@@ -163,24 +782,34 @@ class Trafaret(object):
 
     def append(self, converter):
         """
-        Appends new converter to list.
+        Appends new converter to list. List is replaced, not changed in
+        place, so copies made by ``>>`` do not share it.
         """
-        if hasattr(self, 'converters'):
-            self.converters.append(converter)
-        else:
-            self.converters = [converter]
+        self.converters = getattr(self, 'converters', []) + [converter]
         return self
 
     def __or__(self, other):
         return Or(self, other)
 
     def __rshift__(self, other):
-        self.append(other)
-        return self
+        """
+        Returns copy with converter appended, see ``Trafaret``
+        """
+        return copy.copy(self).append(other)
 
     def __call__(self, val):
         return self.check(val)
 
+    def _errors_collector(self):
+        """
+        Helper for containers, takes ``max_errors`` and ``stop_on_limit``
+        attributes into account with fallback to ``errors_limit`` defaults
+        """
+        limit = getattr(self, 'max_errors', None)
+        if limit is None:
+            return ErrorsCollector(*_default_errors_limit())
+        return ErrorsCollector(limit, getattr(self, 'stop_on_limit', False))
+
 
 class TypeMeta(TrafaretMeta):
 
@@ -230,6 +859,44 @@ class Any(Trafaret):
         return "<Any>"
 
 
+_disjoint_modules = ('builtins', '__builtin__', 'mmap', 'numbers')
+
+
+def _accepted_types(trafaret, seen=None):
+    """
+    Returns types of values trafaret can accept or ``None`` if unknown
+    """
+    if isinstance(trafaret, Forward):
+        seen = seen or set()
+        if trafaret.trafaret is None or id(trafaret) in seen:
+            return None
+        seen.add(id(trafaret))
+        return _accepted_types(trafaret.trafaret, seen)
+    if isinstance(trafaret, Or):
+        types = ()
+        for branch in trafaret.trafarets:
+            branch_types = _accepted_types(branch, seen)
+            if branch_types is None:
+                return None
+            types += branch_types
+        return types
+    if isinstance(trafaret, Type):
+        return (trafaret.type_,)
+    if isinstance(trafaret, Null):
+        return (type(None),)
+    if isinstance(trafaret, Bool):
+        return (bool,)
+    if isinstance(trafaret, String):
+        return str_types + _string_buffer_types
+    if isinstance(trafaret, Float):
+        return trafaret.convertable
+    if isinstance(trafaret, List):
+        return (list,) + (_buffer_types if trafaret.typecode == 'B' else ())
+    if isinstance(trafaret, Dict):
+        return (dict,)
+    return None
+
+
 class OrMeta(TrafaretMeta):
 
     """
@@ -255,14 +922,46 @@ class Or(Trafaret):
     'test'
     >>> extract_error(nullString, 1)
     {0: 'value is not a string', 1: 'value should be None'}
+
+    ``|`` returns new ``Or``, ``<<`` adds branch in place:
+
+    >>> number = Int | Float
+    >>> (number | Null, number)
+    (<Or(<Int>, <Float>, <Null>)>, <Or(<Int>, <Float>)>)
+
+    With ``adaptive`` branches are reordered by count of successful checks
+    every ``reorder_every`` checks. Branch moves before other one only if
+    they accept disjoint types, so results never change. Errors are keyed
+    by original branch index:
+
+    >>> json = Or(Null, Bool, String, List(Any), Dict().allow_extra('*'),
+    ...           adaptive=True, reorder_every=10)
+    >>> for _ in range(10):
+    ...     _ = json.check({'a': 1})
+    >>> [(index, hits) for index, trafaret, hits in json.stats()]
+    [(4, 10), (0, 0), (1, 0), (2, 0), (3, 0)]
+    >>> extract_error(json, 1)[0]
+    'value should be None'
+    >>> Or(Int, String, adaptive=True).reorderable(0, 1)
+    False
     """
 
     __metaclass__ = OrMeta
 
-    def __init__(self, *trafarets):
+    def __init__(self, *trafarets, **kwargs):
         self.trafarets = list(map(self._trafaret, trafarets))
+        self.adaptive = kwargs.pop('adaptive', False)
+        self.reorder_every = kwargs.pop('reorder_every', 1000)
+        if kwargs:
+            raise TypeError('unexpected arguments: %s' % ', '.join(kwargs))
+        # original indexes of branches in order they are tried
+        self.order = list(range(len(self.trafarets)))
+        self.hits = [0] * len(self.trafarets)
+        self.calls = 0
 
     def check_and_return(self, value):
+        if self.adaptive:
+            return self._check_adaptive(value)
         errors = []
         for trafaret in self.trafarets:
             try:
@@ -271,13 +970,82 @@ class Or(Trafaret):
                 errors.append(e)
         raise DataError(dict(enumerate(errors)))
 
+    def _check_adaptive(self, value):
+        self.calls += 1
+        if self.calls % self.reorder_every == 0:
+            self.reorder()
+        errors = {}
+        for index in self.order:
+            try:
+                res = self.trafarets[index].check(value)
+            except DataError as e:
+                errors[index] = e
+            else:
+                # counters are hints only, lost updates from other threads
+                # can not change results
+                self.hits[index] += 1
+                return res
+        raise DataError(errors)
+
+    def reorderable(self, first, second):
+        """ Checks that branches with given indexes accept disjoint types """
+        first = _accepted_types(self.trafarets[first])
+        second = _accepted_types(self.trafarets[second])
+        if first is None or second is None:
+            return False
+        # user classes can share subclasses, builtin layouts can not
+        if not all(t.__module__ in _disjoint_modules for t in first + second):
+            return False
+        return not any(issubclass(a, b) or issubclass(b, a)
+                       for a in first for b in second)
+
+    def reorder(self):
+        """
+        Moves branches with more hits forward, past branches that accept
+        disjoint types only
+        """
+        order = list(self.order)
+        hits = self.hits
+        for pos in range(1, len(order)):
+            while pos > 0 and hits[order[pos]] > hits[order[pos - 1]] \
+                    and self.reorderable(order[pos], order[pos - 1]):
+                order[pos - 1], order[pos] = order[pos], order[pos - 1]
+                pos -= 1
+        self.order = order
+
+    def stats(self):
+        """ Returns ``(index, trafaret, hits)`` in current order """
+        return [(index, self.trafarets[index], self.hits[index])
+                for index in self.order]
+
+    check = _container_check
+
+    def _iter_check(self, value, shared=False):
+        errors = {}
+        for index in self.order:
+            res = yield self.trafarets[index], value
+            if not isinstance(res, DataError):
+                yield _Return(self._convert(res))
+                return
+            errors[index] = res
+        raise DataError(errors)
+
     def __lshift__(self, trafaret):
         self.trafarets.append(self._trafaret(trafaret))
+        self.order.append(len(self.trafarets) - 1)
+        self.hits.append(0)
         return self
 
     def __or__(self, trafaret):
-        self << trafaret
-        return self
+        return copy.copy(self) << trafaret
+
+    def __copy__(self):
+        res = self.__class__.__new__(self.__class__)
+        res.__dict__.update(self.__dict__)
+        res.trafarets = list(self.trafarets)
+        res.order = list(self.order)
+        res.hits = list(self.hits)
+        return res
 
     def __repr__(self):
         return "<Or(%s)>" % (", ".join(map(repr, self.trafarets)))
@@ -533,6 +1301,54 @@ class Atom(Trafaret):
             self._failure("value is not exactly '%s'" % self.value)
 
 
+_string_buffer_types = _buffer_types + (mmap.mmap,)
+
+
+def _utf8_length(value, chunk=65536):
+    """
+    Count of characters in utf-8 bytes-like value or ``None`` if it is not
+    valid utf-8. Decodes chunks of buffer with incremental decoder, so
+    decoded copy of whole value is never kept
+    """
+    if isinstance(value, (bytes, bytearray)):
+        try:
+            if value.isascii():
+                return len(value)
+        except AttributeError:
+            pass
+    view = memoryview(value)
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    length = 0
+    try:
+        for start in range(0, len(view), chunk):
+            length += len(decoder.decode(view[start:start + chunk]))
+        length += len(decoder.decode(b'', True))
+    except UnicodeDecodeError:
+        return None
+    return length
+
+
+def _decoded(value):
+    """ Decodes bytes-like value, ``None`` on failure """
+    if isinstance(value, _string_buffer_types):
+        try:
+            # decodes buffer itself, without intermediate bytes copy
+            return codecs.utf_8_decode(value, 'strict', True)[0]
+        except UnicodeDecodeError:
+            return None
+    return value
+
+
+def _shown(value, limit=64):
+    """ Buffer for error message, repr of ``memoryview`` has no data """
+    if isinstance(value, _string_buffer_types) \
+            and not isinstance(value, bytes):
+        if len(value) > limit:
+            return bytes(value[:limit]) + b'...'
+        return bytes(value[:])
+    return value
+
+
 class String(Trafaret):
 
     """
@@ -564,39 +1380,102 @@ class String(Trafaret):
     AssertionError: Either allow_blank or min_length should be specified, not both
     >>> String(min_length=0, max_length=6, allow_blank=True).check('123')
     '123'
-    """
 
-    def __init__(self, allow_blank=False, regex=None, min_length=None, max_length=None):
+    Bytes, ``bytearray``, ``memoryview`` and ``mmap`` are utf-8 text,
+    buffers are returned as is, unless ``decode`` is set. Length bounds
+    count characters without decoding whole value, text regexes are
+    matched against decoded text. Bytes regexes match raw bytes:
+
+    >>> buf = memoryview(b'name=Jeff')
+    >>> String(max_length=10).check(buf) is buf
+    True
+    >>> (String(regex=r'name=(\w+)') >> (lambda m: m.group(1))).check(buf)
+    'Jeff'
+    >>> String(regex=r'^\w+$', max_length=4).check(bytearray('café'.encode('utf-8')))
+    bytearray(b'caf\\xc3\\xa9')
+    >>> String(max_length=3).check('éé'.encode('utf-8'))
+    b'\\xc3\\xa9\\xc3\\xa9'
+    >>> extract_error(String(regex='^[é]+$'), b'\\xc3\\xc3\\xa9\\xa9')
+    'value is not valid utf-8'
+    >>> extract_error(String(regex='^a$'), memoryview(b'b'))
+    "value 'b'b'' does not match pattern: '^a$'"
+    >>> String(decode=True).check(bytearray(b'caf\\xc3\\xa9'))
+    'café'
+    >>> extract_error(String(utf8=True), bytearray(b'caf\\xe9'))
+    'value is not valid utf-8'
+    """
+
+    def __init__(self, allow_blank=False, regex=None, min_length=None,
+                 max_length=None, utf8=False, decode=False):
         assert not (allow_blank and min_length), \
             "Either allow_blank or min_length should be specified, not both"
         self.allow_blank = allow_blank
         self.regex = re.compile(regex) if isinstance(regex, str_types) else regex
         self.min_length = min_length
         self.max_length = max_length
+        self.utf8 = utf8 or decode
+        self.decode = decode
         self._raw_regex = self.regex.pattern if self.regex else None
 
+    def _measured(self, value):
+        """
+        Returns text to match regex against and length in characters.
+        Bytes-like value is decoded for text regex only, for bytes regex
+        it is raw bytes.
+        """
+        if isinstance(value, unicode):
+            return value, len(value)
+        if isinstance(self._raw_regex, bytes):
+            if self.utf8 and _utf8_length(value) is None:
+                self._failure('value is not valid utf-8')
+            return value, len(value)
+        if self.regex is not None:
+            text = _decoded(value)
+            if text is None:
+                self._failure('value is not valid utf-8')
+            return text, len(text)
+        if self.utf8 or self.min_length is not None \
+                or self.max_length is not None:
+            length = _utf8_length(value)
+            if length is None:
+                self._failure('value is not valid utf-8')
+            return value, length
+        return value, len(value)
+
     def check_and_return(self, value):
         if not isinstance(value, str_types):
-            self._failure("value is not a string")
-        if not self.allow_blank and len(value) is 0:
+            if not isinstance(value, _string_buffer_types) \
+                    or isinstance(value, memoryview) and value.itemsize != 1:
+                self._failure("value is not a string")
+        text, length = self._measured(value)
+        if not self.allow_blank and length == 0:
             self._failure("blank value is not allowed")
-        if self.min_length is not None and len(value) < self.min_length:
+        if self.min_length is not None and length < self.min_length:
             self._failure('String is shorter than %s characters' % self.min_length)
-        if self.max_length is not None and len(value) > self.max_length:
+        if self.max_length is not None and length > self.max_length:
             self._failure('String is longer than %s characters' % self.max_length)
         if self.regex is not None:
-            match = self.regex.match(value)
+            match = self.regex.match(text)
             if not match:
                 self._failure("value '%s' does not match pattern: %s" % (
-                    value, repr(self._raw_regex))
+                    _shown(value), repr(self._raw_regex))
                 )
-            return match
+            if text is value or hasattr(self, 'converters') \
+                    or match.span() != (0, len(text)):
+                return match
         return value
 
     def converter(self, value):
-        if isinstance(value, str_types):
-            return value
-        return value.group()
+        if isinstance(value, _match_type):
+            source = value.string
+            if isinstance(source, str_types) or value.span() != (0, len(source)):
+                value = value.group()
+            else:
+                # whole buffer matched, keep it without copy
+                value = source
+        if self.decode and not isinstance(value, unicode):
+            return bytes(value).decode('utf-8')
+        return value
 
     def __repr__(self):
         return "<String(blank)>" if self.allow_blank else "<String>"
@@ -615,6 +1494,9 @@ class Email(String):
     'example.net'
     >>> extract_error(Email(),'foo')
     'value is not a valid email address'
+    >>> buf = bytearray(b'someone@example.net')
+    >>> Email().check(buf) is buf
+    True
     """
 
     regex = re.compile(
@@ -625,17 +1507,15 @@ class Email(String):
     min_length = None
     max_length = None
 
-    def __init__(self, allow_blank=False):
-        super(Email, self).__init__(allow_blank=allow_blank, regex=self.regex)
+    def __init__(self, allow_blank=False, decode=False):
+        super(Email, self).__init__(allow_blank=allow_blank, regex=self.regex,
+                                    decode=decode)
 
     def check_and_return(self, value):
         try:
             return super(Email, self).check_and_return(value)
         except DataError:
-            if value and isinstance(value, bytes):
-                decoded = value.decode('utf-8')
-            else:
-                decoded = value
+            decoded = _decoded(value)
             # Trivial case failed. Try for possible IDN domain-part
             if decoded and '@' in decoded:
                 parts = decoded.split('@')
@@ -674,19 +1554,17 @@ class URL(String):
     min_length = None
     max_length = None
 
-    def __init__(self, allow_blank=False):
-        super(URL, self).__init__(allow_blank=allow_blank, regex=self.regex)
+    def __init__(self, allow_blank=False, decode=False):
+        super(URL, self).__init__(allow_blank=allow_blank, regex=self.regex,
+                                  decode=decode)
 
     def check_and_return(self, value):
         try:
             return super(URL, self).check_and_return(value)
         except DataError:
             # Trivial case failed. Try for possible IDN domain-part
-            if value:
-                if isinstance(value, bytes):
-                    decoded = value.decode('utf-8')
-                else:
-                    decoded = value
+            decoded = _decoded(value)
+            if decoded:
                 scheme, netloc, path, query, fragment = urlparse.urlsplit(decoded)
                 try:
                     netloc = netloc.encode('idna').decode('ascii') # IDN -> ACE
@@ -737,6 +1615,62 @@ class SquareBracketsMeta(TrafaretMeta):
         return self(trafaret)
 
 
+def _bounds(trafaret):
+    """ Returns ``(lower, upper)`` bounds of ``Int`` trafaret """
+    if not isinstance(trafaret, Int):
+        return None, None
+    lower = trafaret.gte
+    if trafaret.gt is not None and (lower is None or trafaret.gt >= lower):
+        lower = int(trafaret.gt // 1) + 1
+    upper = trafaret.lte
+    if trafaret.lt is not None and (upper is None or trafaret.lt <= upper):
+        upper = int(-(-trafaret.lt // 1)) - 1
+    return lower, upper
+
+
+def _array_typecode(trafaret):
+    """
+    Picks ``array`` typecode for items of ``Int`` or ``Float`` trafaret,
+    smallest integer type that fits bounds of ``Int``
+
+    >>> _array_typecode(Int[0:255]), _array_typecode(Int[-1:1000])
+    ('B', 'h')
+    >>> _array_typecode(Int()), _array_typecode(Float())
+    ('q', 'd')
+    """
+    if isinstance(trafaret, Int):
+        lower, upper = _bounds(trafaret)
+        if lower is None or upper is None:
+            return 'Q' if lower is not None and lower >= 0 else 'q'
+        for code in 'bBhHiIlLqQ':
+            bits = array(code).itemsize * 8
+            if code.islower():
+                low, high = -2 ** (bits - 1), 2 ** (bits - 1) - 1
+            else:
+                low, high = 0, 2 ** bits - 1
+            if low <= lower and upper <= high:
+                return code
+        return 'q'
+    if isinstance(trafaret, Float):
+        return 'd'
+    raise RuntimeError("typecode is required for %r items" % trafaret)
+
+
+# workers count -> pool shared by all ``List(parallel=...)`` instances
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def _parallel_executor(workers):
+    with _executors_lock:
+        executor = _executors.get(workers)
+        if executor is None:
+            # pool starts threads on first submit only
+            executor = _executors[workers] = ThreadPoolExecutor(
+                max_workers=workers)
+        return executor
+
+
 @py3metafix
 class List(Trafaret):
 
@@ -765,33 +1699,309 @@ class List(Trafaret):
     'list length is greater than 2'
     >>> extract_error(List(Int), ["a"])
     {0: "value a can't be converted to int"}
+
+    ``max_errors`` limits stored errors, others are counted only:
+
+    >>> extract_error(List(Int, max_errors=2), ['a', 2, 'b', 'c', 'd'])
+    {0: "value a can't be converted to int", 2: "value b can't be converted to int", <truncated>: 'and 2 more'}
+    >>> extract_error(List(Int, max_errors=1, stop_on_limit=True), ['a', 'b', 'c'])
+    {0: "value a can't be converted to int", <truncated>: 'and more, validation stopped'}
+
+    ``output`` packs numbers into ``array.array`` or ``bytes``:
+
+    >>> List(Int[0:1000], output='array').check([1, '2', 3])
+    array('h', [1, 2, 3])
+    >>> List(Float, output='array').check([1, 2.5])
+    array('d', [1.0, 2.5])
+    >>> extract_error(List(Int[0:1000], output='array'), [1, 1001])
+    {1: 'value 1001 is greater than 1000'}
+    >>> extract_error(List(Int, output='array'), [2 ** 70])
+    {0: "value 1180591620717411303424 does not fit array of 'q'"}
+    >>> List(Int, output='bytes').check([1, 2, 255])
+    b'\\x01\\x02\\xff'
+    >>> data = bytearray(b'ab')
+    >>> List(Int, output='bytes').check(data) is data
+    True
+    >>> extract_error(List(Int[:97], output='bytes'), b'ab')
+    {1: 'value 98 is greater than 97'}
+
+    ``parallel`` splits lists of at least ``parallel_min`` items into
+    chunks checked in pool of ``parallel`` threads shared by lists with
+    same ``parallel``. It pays off with validators releasing GIL or on
+    free-threaded Python. Nested parallel lists are checked sequentially
+    inside pool threads, chunks left are dropped when ``stop_on_limit``
+    is reached:
+
+    >>> numbers = List(Int, parallel=4, parallel_min=2, max_errors=2)
+    >>> numbers.check(['1', 2, 3.0, 4, 5])
+    [1, 2, 3, 4, 5]
+    >>> extract_error(numbers, ['a', 2, 'b', 4, 'c'])
+    {0: "value a can't be converted to int", 2: "value b can't be converted to int", <truncated>: 'and 1 more'}
+
+    ``shared`` and ``cycles`` work like in ``Forward``, items referenced
+    many times are checked once:
+
+    >>> item = {'id': '1'}
+    >>> res = List(Dict(id=Int), shared=True).check([item, item])
+    >>> res, res[0] is res[1]
+    ([{'id': 1}, {'id': 1}], True)
     """
 
     __metaclass__ = SquareBracketsMeta
 
-    def __init__(self, trafaret, min_length=0, max_length=None):
+    def __init__(self, trafaret, min_length=0, max_length=None,
+                 max_errors=None, stop_on_limit=False, lazy=False,
+                 output='list', typecode=None, parallel=None,
+                 parallel_min=1000, shared=False, cycles='reject'):
         self.trafaret = self._trafaret(trafaret)
         self.min_length = min_length
         self.max_length = max_length
-
-    def check_and_return(self, value):
-        if not isinstance(value, list):
-            self._failure("value is not list")
+        self.max_errors = max_errors
+        self.stop_on_limit = stop_on_limit
+        self.lazy = lazy
+        if output not in ('list', 'array', 'bytes'):
+            raise RuntimeError("output should be 'list', 'array' or 'bytes'")
+        self.output = output
+        if output == 'bytes':
+            typecode = 'B'
+        elif output == 'array' and typecode is None:
+            typecode = _array_typecode(self.trafaret)
+        self.typecode = typecode
+        self.parallel = parallel
+        self.parallel_min = parallel_min
+        self.shared = shared
+        self.cycles = cycles
+        if parallel and ThreadPoolExecutor is None:
+            raise RuntimeError("parallel requires concurrent.futures")
+
+    def _check_length(self, value):
         if len(value) < self.min_length:
             self._failure("list length is less than %s" % self.min_length)
         if self.max_length is not None and len(value) > self.max_length:
             self._failure("list length is greater than %s" % self.max_length)
+
+    def _check_flat(self, items):
+        buckets = _flat_buckets(items)
+        if any(not path for path, _ in items) \
+                or not all(index.isdigit() for index in buckets):
+            return self.check(_flat_value(items))
+        buckets = sorted(buckets.items(), key=lambda kv: int(kv[0]))
+        self._check_length(buckets)
+        lst = []
+        errors = self._errors_collector()
+        for index, bucket in buckets:
+            try:
+                lst.append(_checked_flat(self.trafaret, bucket))
+            except DataError as err:
+                if not errors.add(index, err):
+                    break
+        if errors:
+            errors.raise_error()
+        return self._convert(lst)
+
+    def _check_buffer(self, value):
+        """
+        Passes bytes-like value through when item trafaret is plain ``Int``
+        and all bytes are within its bounds, returns ``None`` if items need
+        to be checked and converted
+        """
+        if isinstance(value, memoryview) and value.itemsize != 1:
+            self._failure("value is not list")
+        if type(self.trafaret) is not Int \
+                or hasattr(self.trafaret, 'converters'):
+            return None
+        lower, upper = _bounds(self.trafaret)
+        if len(value) and (lower is not None and min(value) < lower
+                           or upper is not None and max(value) > upper):
+            return None
+        if self.output == 'bytes':
+            return value
+        return array('B', bytes(value))
+
+    def _check_packed(self, value):
+        packed = array(self.typecode)
+        errors = self._errors_collector()
+        for index, item in enumerate(value):
+            try:
+                res = self.trafaret.check(item)
+                try:
+                    packed.append(res)
+                except (OverflowError, TypeError, ValueError):
+                    self._failure("value %s does not fit array of '%s'" % (
+                                  res, self.typecode))
+            except DataError as err:
+                if not errors.add(index, err):
+                    break
+        if errors:
+            errors.raise_error()
+        if self.output == 'bytes':
+            return packed.tobytes()
+        return packed
+
+    def check_and_return(self, value):
+        if self.typecode == 'B' and isinstance(value, _buffer_types):
+            self._check_length(value)
+            res = self._check_buffer(value)
+            if res is not None:
+                return res
+            return self._check_packed(bytearray(value))
+        if not isinstance(value, list):
+            self._failure("value is not list")
+        self._check_length(value)
+        if self.output != 'list':
+            return self._check_packed(value)
+        if self.lazy:
+            return LazyList(self, value)
+        errors = self._errors_collector()
+        check_batch = getattr(self.trafaret, 'check_batch', None)
+        if check_batch is not None:
+            # trafaret checks whole list at once, see contrib.object_id
+            lst = check_batch(value, errors)
+            if errors:
+                errors.raise_error()
+            return lst
+        if self._runs_parallel(value):
+            return self._check_parallel(value, errors)
         lst = []
-        errors = {}
         for index, item in enumerate(value):
             try:
                 lst.append(self.trafaret.check(item))
             except DataError as err:
-                errors[index] = err
+                if not errors.add(index, err):
+                    break
         if errors:
-            raise DataError(error=errors)
+            errors.raise_error()
         return lst
 
+    def _runs_parallel(self, value):
+        return self.parallel and isinstance(value, list) \
+            and len(value) >= self.parallel_min and not _local.parallel
+
+    def _check_chunk(self, value, start, stop, cancelled, failed_one, state):
+        """
+        Returns checked items and ``(index, error)`` pairs of chunk, stops
+        early when ``cancelled`` is set, calls ``failed_one`` on errors.
+        ``state`` is deadline and errors limit of calling thread.
+        """
+        previous = _local.deadline, _local.errors_limit
+        _local.deadline, _local.errors_limit = state
+        _local.parallel = True
+        try:
+            deadline = state[0]
+            countdown = deadline.every if deadline is not None else 0
+            lst = []
+            failed = []
+            check = self.trafaret.check
+            for index in range(start, stop):
+                if cancelled.is_set():
+                    break
+                if deadline is not None:
+                    countdown -= 1
+                    if countdown <= 0:
+                        countdown = deadline.every
+                        if deadline.expired():
+                            raise ValidationTimeout((index,))
+                try:
+                    lst.append(check(value[index]))
+                except ValidationTimeout as err:
+                    raise ValidationTimeout((index,) + err.path)
+                except DataError as err:
+                    failed.append((index, err))
+                    failed_one()
+            return lst, failed
+        finally:
+            _local.parallel = False
+            _local.deadline, _local.errors_limit = previous
+
+    def _check_parallel(self, value, errors):
+        size = -(-len(value) // self.parallel)
+        executor = _parallel_executor(self.parallel)
+        cancelled = threading.Event()
+        limit = errors.limit if errors.stop_on_limit else None
+        lock = threading.Lock()
+        failures = [0]
+
+        def failed_one():
+            # errors beyond limit stop checks, stop all chunks then
+            with lock:
+                failures[0] += 1
+                if limit is not None and failures[0] > limit:
+                    cancelled.set()
+        # workers check items with deadline and errors limit of this thread
+        state = _local.deadline, _local.errors_limit
+        futures = [executor.submit(self._check_chunk, value, start,
+                                   min(start + size, len(value)), cancelled,
+                                   failed_one, state)
+                   for start in range(0, len(value), size)]
+        lst = []
+        try:
+            for future in futures:
+                chunk, failed = future.result()
+                lst.extend(chunk)
+                for index, err in failed:
+                    if not errors.add(index, err):
+                        errors.raise_error()
+        finally:
+            # error limit reached or check failed, drop work left
+            cancelled.set()
+            for future in futures:
+                future.cancel()
+        if errors:
+            errors.raise_error()
+        return lst
+
+    def _check_patched(self, value, touched):
+        if self.lazy or self.output != 'list' or not isinstance(value, list) \
+                or hasattr(self.trafaret, 'check_batch'):
+            return self.check(value)
+        self._check_length(value)
+        errors = self._errors_collector()
+        if touched.resized:
+            # items were shifted, items of original list are valid as is
+            original = set(map(id, touched.original))
+            changed = [index for index, item in enumerate(value)
+                       if id(item) not in original]
+            children = dict((index, True) for index in changed)
+        else:
+            children = touched.children
+        for index in sorted(children):
+            try:
+                value[index] = _checked_patch(self.trafaret, value[index],
+                                              children[index])
+            except DataError as err:
+                if not errors.add(index, err):
+                    break
+        if errors:
+            errors.raise_error()
+        return value
+
+    check = _container_check
+
+    def _iter_check(self, value, shared=False):
+        if self.lazy or self.output != 'list' \
+                or hasattr(self.trafaret, 'check_batch') \
+                or not shared and self._runs_parallel(value):
+            # parallel workers read clock themselves
+            yield _Return(Trafaret.check(self, value))
+            return
+        if not isinstance(value, list):
+            self._failure("value is not list")
+        self._check_length(value)
+        errors = self._errors_collector()
+        lst = []
+        if shared and not hasattr(self, 'converters'):
+            yield _Output(lst)
+        for index, item in enumerate(value):
+            res = yield self.trafaret, item, index
+            if isinstance(res, DataError):
+                if not errors.add(index, res):
+                    break
+            else:
+                lst.append(res)
+        if errors:
+            errors.raise_error()
+        yield _Return(self._convert(lst))
+
     def __repr__(self):
         r = "<List("
         options = []
@@ -842,6 +2052,27 @@ class Tuple(Trafaret):
             self._failure(errors)
         return tuple(result)
 
+    check = _container_check
+
+    def _iter_check(self, value, shared=False):
+        try:
+            value = tuple(value)
+        except TypeError:
+            self._failure('value must be convertable to tuple')
+        if len(value) != self.length:
+            self._failure('value must contain exact %s items' % self.length)
+        result = []
+        errors = {}
+        for idx, (item, trafaret) in enumerate(zip(value, self.trafarets)):
+            res = yield trafaret, item, idx
+            if isinstance(res, DataError):
+                errors[idx] = res
+            else:
+                result.append(res)
+        if errors:
+            self._failure(errors)
+        yield _Return(self._convert(tuple(result)))
+
     def __repr__(self):
         return '<Tuple(' + ', '.join(repr(t) for t in self.trafarets) + ')'
 
@@ -878,14 +2109,10 @@ class Key(object):
 
     def pop(self, data):
         if self.name in data or self.default is not _empty:
-            if callable(self.default):
-                default = self.default()
-            else:
-                default = self.default
-            # default = callable(self.default) and self.default() or self.default
             yield self.get_name(), catch_error(self.trafaret,
-                    data.pop(self.name, default))
-            raise StopIteration
+                    data.pop(self.name) if self.name in data
+                    else self.get_default())
+            return
 
         if not self.optional:
             yield self.name, DataError(error='is required')
@@ -893,6 +2120,11 @@ class Key(object):
     def keys_names(self):
         yield self.name
 
+    def get_default(self):
+        if callable(self.default):
+            return self.default()
+        return self.default
+
     def set_trafaret(self, trafaret):
         self.trafaret = trafaret
 
@@ -911,6 +2143,10 @@ class Key(object):
            ' to "%s"' % self.to_name if getattr(self, 'to_name', False) else '')
 
 
+def _same(value):
+    return value
+
+
 class Dict(Trafaret):
 
     """
@@ -923,20 +2159,23 @@ class Dict(Trafaret):
     {'bar': 'is required'}
     >>> extract_error(trafaret, {"foo": 1, "bar": "spam", "eggs": None})
     {'eggs': 'eggs is not allowed key'}
-    >>> trafaret.allow_extra("eggs")
+    >>> trafaret = trafaret.allow_extra("eggs")
+    >>> trafaret
     <Dict(extras=(eggs) | bar=<String>, foo=<Int>)>
     >>> trafaret.check({"foo": 1, "bar": "spam", "eggs": None})
     >>> trafaret.check({"foo": 1, "bar": "spam"})
     >>> extract_error(trafaret, {"foo": 1, "bar": "spam", "ham": 100})
     {'ham': 'ham is not allowed key'}
-    >>> trafaret.allow_extra("*")
+    >>> trafaret = trafaret.allow_extra("*")
+    >>> trafaret
     <Dict(any, extras=(eggs) | bar=<String>, foo=<Int>)>
     >>> trafaret.check({"foo": 1, "bar": "spam", "ham": 100})
     >>> trafaret.check({"foo": 1, "bar": "spam", "ham": 100, "baz": None})
     >>> extract_error(trafaret, {"foo": 1, "ham": 100, "baz": None})
     {'bar': 'is required'}
     >>> trafaret = Dict({Key('bar', optional=True): String}, foo=Int)
-    >>> trafaret.allow_extra("*")
+    >>> trafaret = trafaret.allow_extra("*")
+    >>> trafaret
     <Dict(any | bar=<String>, foo=<Int>)>
     >>> trafaret.check({"foo": 1, "ham": 100, "baz": None})
     {'foo': 1, 'baz': None, 'ham': 100}
@@ -947,12 +2186,58 @@ class Dict(Trafaret):
     >>> trafaret = Dict({Key('bar', default='nyanya') >> 'baz': String}, foo=Int)
     >>> repr(trafaret.check({'foo': 4}))
     "{'baz': 'nyanya', 'foo': 4}"
-    >>> _ = trafaret.ignore_extra('fooz')
+    >>> trafaret = trafaret.ignore_extra('fooz')
     >>> repr(trafaret.check({'foo': 4, 'fooz': 5}))
     "{'baz': 'nyanya', 'foo': 4}"
-    >>> _ = trafaret.ignore_extra('*')
+    >>> trafaret = trafaret.ignore_extra('*')
     >>> repr(trafaret.check({'foo': 4, 'foor': 5}))
     "{'baz': 'nyanya', 'foo': 4}"
+    >>> schema = Dict(a=List(Int), b=Dict(c=String))
+    >>> schema.check_flat({'form__a__1': '2', 'form__a__0': 1, 'form__b__c': 'x'}, 'form')
+    {'a': [1, 2], 'b': {'c': 'x'}}
+    >>> extract_error(schema.check_flat, {'a__0': 'x', 'a__7': 'y', 'b__c': 1})
+    {'a__0': "value x can't be converted to int", 'a__7': "value y can't be converted to int", 'b__c': 'value is not a string'}
+    >>> extract_error(schema.check_flat, {'a__0': 1, 'b': 1})
+    {'b': "value '1' is not dict"}
+    >>> record = Dict({Key('id') >> 'pk': Int, Key('tag', optional=True): String}).as_record('Row')
+    >>> record.check({'id': '1'})
+    Row(pk=1, tag=<missing>)
+    >>> record.check_flat({'id': 2, 'tag': 'a'})
+    Row(pk=2, tag='a')
+    >>> extract_error(record, {'tag': 1, 'x': 2})
+    {'id': 'is required', 'tag': 'value is not a string', 'x': 'x is not allowed key'}
+    >>> Dict({'_id': Int, 'first-name': String}).as_record().check({'_id': 1, 'first-name': 'a'})
+    Record(_0=1, _1='a')
+    >>> trafaret = Dict(foo=Int).limit_errors(1)
+    >>> extract_error(trafaret, {'foo': 'a', 'bar': 1, 'baz': 2})
+    {'foo': "value a can't be converted to int", <truncated>: 'and 2 more'}
+
+    ``check_patch`` checks only patched paths of previous output:
+
+    >>> schema = Dict(a=List(Dict(b=Int)), c=Mapping(String, String))
+    >>> doc = schema.check({'a': [{'b': 1}, {'b': 2}], 'c': {}})
+    >>> new = schema.check_patch(doc, [{'op': 'replace', 'path': '/a/1/b', 'value': '3'}])
+    >>> new, new['a'][0] is doc['a'][0], new['c'] is doc['c']
+    ({'a': [{'b': 1}, {'b': 3}], 'c': {}}, True, True)
+    >>> extract_error(schema.check_patch, doc, {'c': {'x': 1}, 'a': None})
+    {'a': 'is required', 'c': {'x': {'value': 'value is not a string'}}}
+
+    ``adaptive`` builds specialized checks for key orders seen often:
+
+    >>> trafaret = Dict({'a': Int, Key('b', default=0): Int}).adaptive(2)
+    >>> [trafaret.check({'a': '1'}) for _ in range(3)]
+    [{'a': 1, 'b': 0}, {'a': 1, 'b': 0}, {'a': 1, 'b': 0}]
+    >>> list(trafaret._shapes)
+    [('a',)]
+    >>> extract_error(trafaret, {'a': 'x'})
+    {'a': "value x can't be converted to int"}
+
+    ``share`` checks values referenced many times once, see ``Forward``:
+
+    >>> item, numbers = [1], List(Int)
+    >>> res = Dict(a=numbers, b=numbers).share().check({'a': item, 'b': item})
+    >>> res['a'] is res['b']
+    True
     """
 
     def __init__(self, keys={}, **trafarets):
@@ -960,57 +2245,385 @@ class Dict(Trafaret):
         self.allow_any = False
         self.ignore = []
         self.ignore_any = False
+        self.max_errors = None
+        self.stop_on_limit = False
+        self.lazy = False
+        self.record_type = None
+        self.sightings = None
+        self.max_shapes = 0
+        self.shared = False
+        self.cycles = 'reject'
+        self._forget_shapes()
         self.keys = []
         for key, trafaret in itertools.chain(trafarets.items(), keys.items()):
             key_ = key if isinstance(key, Key) else Key(key)
             key_.set_trafaret(self._trafaret(trafaret))
             self.keys.append(key_)
+        # names of plain keys, ``check_flat`` passes their values as is
+        self._flat_keys = set(key.name for key in self.keys
+                              if type(key) is Key)
 
     def allow_extra(self, *names):
+        """
+        Returns copy allowing extra keys ``names``, ``'*'`` allows any.
+        Like with ``>>``, instance itself is not changed, so it can be
+        shared between threads.
+        """
+        res = copy.copy(self)
         for name in names:
             if name == "*":
-                self.allow_any = True
+                res.allow_any = True
             else:
-                self.extras.append(name)
-        return self
+                res.extras = res.extras + [name]
+        return res
 
     def ignore_extra(self, *names):
+        """
+        Returns copy ignoring extra keys ``names``, ``'*'`` ignores any
+        """
+        res = copy.copy(self)
         for name in names:
             if name == "*":
-                self.ignore_any = True
+                res.ignore_any = True
             else:
-                self.ignore.append(name)
+                res.ignore = res.ignore + [name]
+        return res
+
+    def __copy__(self):
+        res = self.__class__.__new__(self.__class__)
+        res.__dict__.update(self.__dict__)
+        res.keys = [copy.copy(key) for key in self.keys]
+        res._forget_shapes()
+        return res
+
+    def __getstate__(self):
+        # specialized checks are rebuilt after unpickling
+        state = dict(self.__dict__)
+        state.update(_shapes={}, _seen={})
+        return state
+
+    def limit_errors(self, max_errors, stop_on_limit=False):
+        """
+        Stores no more than ``max_errors`` errors, see ``List``
+        """
+        self.max_errors = max_errors
+        self.stop_on_limit = stop_on_limit
+        return self
+
+    def make_lazy(self, lazy=True):
+        """
+        Makes ``check`` return ``LazyDict``, see ``LazyDict``
+        """
+        self.lazy = lazy
+        return self
+
+    def share(self, shared=True, cycles='reject'):
+        """
+        Memoizes results of values referenced many times for one check,
+        same as ``shared`` and ``cycles`` of ``Forward``
+        """
+        self.shared = shared
+        self.cycles = cycles
+        return self
+
+    def as_record(self, name='Record'):
+        """
+        Makes ``check`` return instances of namedtuple generated from
+        keys output names and allowed extras. Optional keys absent in data
+        are ``missing``. Works only with plain ``Key`` instances. Names that
+        are not valid fields, like ``'_id'``, are renamed to ``_<index>``.
+        """
+        if self.allow_any:
+            raise RuntimeError("as_record can't be used with any extra keys")
+        if any(type(key) is not Key for key in self.keys):
+            raise RuntimeError("as_record supports only plain Key instances")
+        fields = [key.get_name() for key in self.keys] + list(self.extras)
+        record_type = namedtuple(name, fields, rename=True)
+        self._record_fields = fields
+        self._key_names = frozenset(key.name for key in self.keys)
+        self._extra_index = dict((name, index) for index, name
+                                 in enumerate(fields) if name in self.extras)
+        # set last, checks in other threads use record only when it is ready
+        self.record_type = record_type
         return self
 
+    def _check_record(self, value):
+        values = [missing] * len(self.record_type._fields)
+        errors = self._errors_collector()
+        found = 0
+        for index, key in enumerate(self.keys):
+            if key.name in value:
+                found += 1
+                res = catch_error(key.trafaret, value[key.name])
+            elif key.default is not _empty:
+                res = catch_error(key.trafaret, key.get_default())
+            elif key.optional:
+                continue
+            elif not errors.add(key.name, DataError(error='is required')):
+                errors.raise_error()
+            else:
+                continue
+            if isinstance(res, DataError):
+                if not errors.add(key.get_name(), res):
+                    errors.raise_error()
+            else:
+                values[index] = res
+        if found < len(value) and not self.ignore_any:
+            for name in value:
+                if name in self._key_names or name in self.ignore:
+                    continue
+                if name in self._extra_index:
+                    values[self._extra_index[name]] = value[name]
+                elif not errors.add(
+                        name, DataError("%s is not allowed key" % name)):
+                    break
+        if errors:
+            errors.raise_error()
+        return self.record_type(*values)
+
     def make_optional(self, *args):
         for key in self.keys:
             if key.name in args or '*' in args:
                 key.make_optional()
+        self._forget_shapes()
+        return self
+
+    def adaptive(self, sightings=3, max_shapes=8):
+        """
+        After ``sightings`` dicts with same keys in same order builds check
+        for that order, which takes values by name without looking for
+        missing and extra keys. Up to ``max_shapes`` orders are kept, other
+        dicts and invalid ones are checked as usual.
+        """
+        self.sightings = sightings
+        self.max_shapes = max_shapes
+        self._forget_shapes()
         return self
 
+    def _forget_shapes(self):
+        self._shapes = {}
+        self._seen = {}
+
+    def _shape_plan(self, shape):
+        """
+        Returns ``(name, check, get)`` triples in output order for dicts
+        with ``shape`` keys, ``None`` if such dicts are invalid or keys
+        are not plain ``Key`` instances
+        """
+        plan = []
+        names = set()
+        present = set(shape)
+        for key in self.keys:
+            if type(key) is not Key or key.name in names:
+                return None
+            names.add(key.name)
+            check = getattr(key.trafaret, 'check', key.trafaret)
+            if key.name in present:
+                plan.append((key.get_name(), check,
+                             operator.itemgetter(key.name)))
+            elif key.default is not _empty:
+                plan.append((key.get_name(), check,
+                             lambda value, key=key: key.get_default()))
+            elif not key.optional:
+                return None
+        for name in shape:
+            if name in names or self.ignore_any or name in self.ignore:
+                continue
+            if not self.allow_any and name not in self.extras:
+                return None
+            plan.append((name, _same, operator.itemgetter(name)))
+        return tuple(plan)
+
+    def _check_shape(self, value):
+        """
+        Checks ``value`` with check built for its keys order, returns
+        ``None`` if there is no such check yet or value is invalid, so
+        errors are reported by generic check
+        """
+        shape = tuple(value)
+        plan = self._shapes.get(shape)
+        if plan is None:
+            count = self._seen.get(shape, 0)
+            if count is None or len(self._shapes) >= self.max_shapes:
+                return None
+            if count + 1 < self.sightings:
+                if len(self._seen) >= 4 * self.max_shapes:
+                    self._seen.clear()
+                self._seen[shape] = count + 1
+                return None
+            plan = self._shape_plan(shape)
+            if plan is None:
+                self._seen[shape] = None
+                return None
+            self._shapes[shape] = plan
+        collect = {}
+        try:
+            for name, check, get in plan:
+                collect[name] = check(get(value))
+        except DataError:
+            return None
+        return collect
+
     def check_and_return(self, value):
         if not isinstance(value, dict):
             self._failure("value '%s' is not dict" % value)
-        data = copy.copy(value)
+        if self.record_type is not None:
+            return self._check_record(value)
+        if self.sightings is not None and not self.lazy:
+            res = self._check_shape(value)
+            if res is not None:
+                return res
+        return self._check_data(copy.copy(value), {}, self.lazy)
+
+    def _check_flat(self, items):
+        if any(not path for path, _ in items):
+            return self.check(_flat_value(items))
+        data = {}
+        flat = {}
+        for name, bucket in _flat_buckets(items).items():
+            if name in self._flat_keys:
+                flat[name] = bucket
+            else:
+                data[name] = _flat_value(bucket)
+        return self._convert(self._check_data(data, flat))
+
+    def _check_data(self, data, flat, lazy=False):
+        """
+        ``flat`` holds ``(path, value)`` pairs for plain keys, it is
+        filled by ``check_flat`` only. With ``lazy`` values of plain keys
+        are not checked here, but are left to ``LazyDict``.
+        """
         collect = {}
-        errors = {}
+        pending = {}
+        errors = self._errors_collector()
         for key in self.keys:
+            if lazy and type(key) is Key and (
+                    key.name in data or key.default is not _empty):
+                raw = data.pop(key.name) if key.name in data \
+                    else key.get_default()
+                pending[key.get_name()] = (key.trafaret, raw, key.get_name())
+                continue
+            if key.name in flat:
+                try:
+                    collect[key.get_name()] = _checked_flat(key.trafaret,
+                                                            flat[key.name])
+                except DataError as err:
+                    if not errors.add(key.name, err):
+                        errors.raise_error()
+                continue
             for k, v in key.pop(data):
                 if isinstance(v, DataError):
-                    errors[k] = v
+                    if not errors.add(k, v):
+                        errors.raise_error()
                 else:
                     collect[k] = v
+        self._check_extras(data, collect, errors)
+        if lazy:
+            return LazyDict(self, collect, pending)
+        if self.record_type is not None:
+            return self.record_type(*[collect.get(name, missing)
+                                      for name in self._record_fields])
+        return collect
+
+    def _check_extras(self, data, collect, errors):
+        """ Checks keys left in ``data`` and raises collected errors """
         if not self.ignore_any:
             for key in data:
                 if key in self.ignore:
                     continue
                 if not self.allow_any and key not in self.extras:
-                    errors[key] = DataError("%s is not allowed key" % key)
+                    if not errors.add(
+                            key, DataError("%s is not allowed key" % key)):
+                        break
                 else:
                     collect[key] = data[key]
         if errors:
-            raise DataError(error=errors)
-        return collect
+            errors.raise_error()
+
+    def _check_patched(self, value, touched):
+        if self.lazy or self.record_type is not None \
+                or not isinstance(value, dict):
+            return self.check(value)
+        names = set(touched.children)
+        errors = self._errors_collector()
+        for key in self.keys:
+            if type(key) is not Key:
+                # cross-key constraint, checks all its keys again
+                key_names = list(key.keys_names())
+                if names.isdisjoint(key_names):
+                    continue
+                names.difference_update(key_names)
+                data = dict((name, value.pop(name)) for name in key_names
+                            if name in value)
+                pairs = key.pop(data)
+            else:
+                name = key.get_name()
+                if name not in names:
+                    continue
+                names.discard(name)
+                if name in value:
+                    pairs = [(name, catch_error(
+                        _checked_patch, key.trafaret, value[name],
+                        touched.children[name]))]
+                elif key.default is not _empty:
+                    pairs = [(name, catch_error(key.trafaret,
+                                                key.get_default()))]
+                elif key.optional:
+                    continue
+                else:
+                    pairs = [(key.name, DataError(error='is required'))]
+            for k, v in pairs:
+                if isinstance(v, DataError):
+                    if not errors.add(k, v):
+                        errors.raise_error()
+                else:
+                    value[k] = v
+        for name in names:
+            if name not in value:
+                continue
+            if self.ignore_any or name in self.ignore:
+                del value[name]
+            elif not self.allow_any and name not in self.extras:
+                if not errors.add(
+                        name, DataError("%s is not allowed key" % name)):
+                    break
+        if errors:
+            errors.raise_error()
+        return value
+
+    check = _container_check
+
+    def _iter_check(self, value, shared=False):
+        if self.lazy or self.record_type is not None:
+            yield _Return(Trafaret.check(self, value))
+            return
+        if not isinstance(value, dict):
+            self._failure("value '%s' is not dict" % value)
+        data = copy.copy(value)
+        collect = {}
+        if shared and not hasattr(self, 'converters'):
+            yield _Output(collect)
+        errors = self._errors_collector()
+        for key in self.keys:
+            if type(key) is not Key:
+                pairs = key.pop(data)
+            elif key.name in data or key.default is not _empty:
+                raw = data.pop(key.name) if key.name in data \
+                    else key.get_default()
+                res = yield key.trafaret, raw, key.name
+                pairs = [(key.get_name(), res)]
+            elif key.optional:
+                continue
+            else:
+                pairs = [(key.name, DataError(error='is required'))]
+            for k, v in pairs:
+                if isinstance(v, DataError):
+                    if not errors.add(k, v):
+                        errors.raise_error()
+                else:
+                    collect[k] = v
+        self._check_extras(data, collect, errors)
+        yield _Return(self._convert(collect))
 
     def keys_names(self):
         for key in self.keys:
@@ -1071,37 +2684,297 @@ class Mapping(Trafaret):
     {'bar': {'value': 'value None is not int'}}
     >>> extract_error(trafaret, {"foo": 1, 2: "bar"})
     {2: {'key': 'value is not string', 'value': "value bar can't be converted to int"}}
+    >>> extract_error(Mapping(String, Int, max_errors=0), {"foo": None})
+    {<truncated>: 'and 1 more'}
+
+    ``shared`` and ``cycles`` work like in ``Forward``:
+
+    >>> item = [1]
+    >>> res = Mapping(String, List(Int), shared=True).check({'a': item, 'b': item})
+    >>> res['a'] is res['b']
+    True
     """
 
-    def __init__(self, key, value):
+    def __init__(self, key, value, max_errors=None, stop_on_limit=False,
+                 lazy=False, shared=False, cycles='reject'):
         self.key = self._trafaret(key)
         self.value = self._trafaret(value)
+        self.max_errors = max_errors
+        self.stop_on_limit = stop_on_limit
+        self.lazy = lazy
+        self.shared = shared
+        self.cycles = cycles
 
     def check_and_return(self, mapping):
         checked_mapping = {}
-        errors = {}
+        pending = {}
+        errors = self._errors_collector()
         for key, value in mapping.items():
             pair_errors = {}
             try:
                 checked_key = self.key.check(key)
             except DataError as err:
                 pair_errors['key'] = err
+            if self.lazy:
+                if pair_errors:
+                    if not errors.add(key, DataError(error=pair_errors)):
+                        break
+                else:
+                    pending[checked_key] = (self.value, value, key)
+                continue
             try:
                 checked_value = self.value.check(value)
             except DataError as err:
                 pair_errors['value'] = err
             if pair_errors:
-                errors[key] = DataError(error=pair_errors)
+                if not errors.add(key, DataError(error=pair_errors)):
+                    break
             else:
                 checked_mapping[checked_key] = checked_value
         if errors:
-            raise DataError(error=errors)
+            errors.raise_error()
+        if self.lazy:
+            return LazyDict(self, checked_mapping, pending, 'value')
         return checked_mapping
 
+    def _check_patched(self, mapping, touched):
+        if self.lazy or not isinstance(mapping, dict):
+            return self.check(mapping)
+        errors = self._errors_collector()
+        for key, child in touched.children.items():
+            if key not in mapping:
+                continue
+            pair_errors = {}
+            try:
+                checked_key = self.key.check(key)
+            except DataError as err:
+                pair_errors['key'] = err
+            try:
+                checked_value = _checked_patch(self.value, mapping[key], child)
+            except DataError as err:
+                pair_errors['value'] = err
+            if pair_errors:
+                if not errors.add(key, DataError(error=pair_errors)):
+                    break
+                continue
+            if checked_key != key:
+                del mapping[key]
+            mapping[checked_key] = checked_value
+        if errors:
+            errors.raise_error()
+        return mapping
+
+    check = _container_check
+
+    def _iter_check(self, mapping, shared=False):
+        if self.lazy:
+            yield _Return(Trafaret.check(self, mapping))
+            return
+        checked_mapping = {}
+        errors = self._errors_collector()
+        for key, value in mapping.items():
+            pair_errors = {}
+            checked_key = yield self.key, key
+            if isinstance(checked_key, DataError):
+                pair_errors['key'] = checked_key
+            checked_value = yield self.value, value, key
+            if isinstance(checked_value, DataError):
+                pair_errors['value'] = checked_value
+            if pair_errors:
+                if not errors.add(key, DataError(error=pair_errors)):
+                    break
+            else:
+                checked_mapping[checked_key] = checked_value
+        if errors:
+            errors.raise_error()
+        yield _Return(self._convert(checked_mapping))
+
     def __repr__(self):
         return "<Mapping(%r => %r)>" % (self.key, self.value)
 
 
+def _materialized(value):
+    if isinstance(value, (LazyDict, LazyList)):
+        return value.materialize()
+    return value
+
+
+class LazyDict(_MappingABC):
+
+    """
+    Read-only dict view returned by ``Dict(...).make_lazy()`` and
+    ``Mapping(..., lazy=True)``. Structure is checked by container, values
+    are checked on first access and memoized. ``materialize`` checks all
+    values and returns plain dict.
+
+    >>> d = Dict(a=Int, b=List(Int, lazy=True)).make_lazy()
+    >>> view = d.check({'a': '1', 'b': [1, 'x']})
+    >>> view
+    <LazyDict(2 keys)>
+    >>> view['a']
+    1
+    >>> view['b'][0]
+    1
+    >>> view['b'][1]
+    Traceback (most recent call last):
+    ...
+    trafaret.DataError: {1: DataError(value x can't be converted to int)}
+    >>> extract_error(view.materialize)
+    {'b': {1: "value x can't be converted to int"}}
+    >>> extract_error(d, {'b': []})
+    {'a': 'is required'}
+    >>> m = Mapping(String, Int, lazy=True).check({'a': 'x'})
+    >>> extract_error(lambda: m['a'])
+    {'a': {'value': "value x can't be converted to int"}}
+    """
+
+    def __init__(self, owner, ready, pending, wrap_key=None):
+        self._owner = owner
+        self._values = ready
+        # name -> (trafaret, raw value, error key)
+        self._pending = pending
+        self._errors = {}
+        self._wrap_key = wrap_key
+        self._names = list(ready) + list(pending)
+        self._error_keys = dict((name, entry[2])
+                                for name, entry in pending.items())
+
+    def _get(self, name):
+        """ Returns checked value or raises ``(error key, DataError)`` """
+        if name in self._errors:
+            return None, self._errors[name]
+        trafaret, raw, error_key = self._pending[name]
+        res = catch_error(trafaret, raw)
+        if isinstance(res, DataError):
+            if self._wrap_key is not None:
+                res = DataError(error={self._wrap_key: res})
+            self._errors[name] = error_key, res
+            return None, self._errors[name]
+        self._values[name] = res
+        del self._pending[name]
+        return res, None
+
+    def __getitem__(self, name):
+        try:
+            return self._values[name]
+        except KeyError:
+            if name not in self._pending:
+                raise
+        value, error = self._get(name)
+        if error:
+            raise DataError(error=dict([error]))
+        return value
+
+    def __contains__(self, name):
+        return name in self._values or name in self._pending
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self):
+        return len(self._names)
+
+    def materialize(self):
+        errors = self._owner._errors_collector()
+        res = {}
+        for name in self._names:
+            if name in self._values:
+                value, error = self._values[name], None
+            else:
+                value, error = self._get(name)
+            if error is None:
+                try:
+                    res[name] = _materialized(value)
+                    continue
+                except DataError as err:
+                    error = self._error_keys.get(name, name), err
+            if not errors.add(*error):
+                break
+        if errors:
+            errors.raise_error()
+        return res
+
+    def __repr__(self):
+        return '<LazyDict(%d keys)>' % len(self)
+
+
+class LazyList(_SequenceABC):
+
+    """
+    Read-only list view returned by ``List(..., lazy=True)``, items are
+    checked on first access and memoized. Keeps reference to checked list,
+    so it must not be changed while view is used.
+
+    >>> view = List(Int, lazy=True, max_length=3).check(['1', 'x'])
+    >>> view[0], view[-2], len(view)
+    (1, 1, 2)
+    >>> view[-3]
+    Traceback (most recent call last):
+    ...
+    IndexError: list index out of range
+    >>> extract_error(view.materialize)
+    {1: "value x can't be converted to int"}
+    >>> extract_error(List(Int, lazy=True, max_length=3), [1, 2, 3, 4])
+    'list length is greater than 3'
+    >>> List(Int, lazy=True).check(['1', '2']).materialize()
+    [1, 2]
+    """
+
+    def __init__(self, owner, value):
+        self._owner = owner
+        self._raw = value
+        self._values = [_empty] * len(value)
+        self._errors = {}
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self._raw)
+            if index < 0:
+                raise IndexError('list index out of range')
+        value, error = self._get(index)
+        if error is not None:
+            raise DataError(error={index: error})
+        return value
+
+    def _get(self, index):
+        value = self._values[index]
+        if value is not _empty:
+            return value, None
+        if index in self._errors:
+            return None, self._errors[index]
+        res = catch_error(self._owner.trafaret, self._raw[index])
+        if isinstance(res, DataError):
+            self._errors[index] = res
+            return None, res
+        self._values[index] = res
+        return res, None
+
+    def __len__(self):
+        return len(self._raw)
+
+    def materialize(self):
+        errors = self._owner._errors_collector()
+        res = []
+        for index in range(len(self._raw)):
+            value, error = self._get(index)
+            if error is None:
+                try:
+                    res.append(_materialized(value))
+                    continue
+                except DataError as err:
+                    error = err
+            if not errors.add(index, error):
+                break
+        if errors:
+            errors.raise_error()
+        return res
+
+    def __repr__(self):
+        return '<LazyList(%d items)>' % len(self)
+
+
 class Enum(Trafaret):
 
     """
@@ -1178,6 +3051,306 @@ class Call(Trafaret):
         return "<Call(%s)>" % self.fn.__name__
 
 
+def _canonical(value):
+    """
+    Hashable form of JSON-like value, equal for equal values regardless
+    of dict order. Types are kept, so ``1``, ``1.0`` and ``True`` differ
+
+    >>> _canonical({'b': [1, 2], 'a': None}) == _canonical({'a': None, 'b': [1, 2]})
+    True
+    >>> _canonical([1]) == _canonical([True])
+    False
+    """
+    cls = type(value)
+    if cls is dict:
+        return (dict, frozenset([(_canonical(k), _canonical(v))
+                                 for k, v in value.items()]))
+    if cls is list or cls is tuple:
+        return (cls, tuple([_canonical(v) for v in value]))
+    if cls is set or cls is frozenset:
+        return (cls, frozenset([_canonical(v) for v in value]))
+    if isinstance(value, dict):
+        return _canonical(dict(value))
+    hash(value)
+    return (cls, value)
+
+
+_immutable_types = str_types + (int, float, bool, type(None))
+
+
+def _copied(value):
+    """ Deep copy fast path for JSON-like values """
+    if isinstance(value, _immutable_types):
+        return value
+    if type(value) is dict:
+        return dict((k, _copied(v)) for k, v in value.items())
+    if type(value) is list:
+        return [_copied(v) for v in value]
+    return copy.deepcopy(value)
+
+
+class Cached(Trafaret):
+
+    """
+    Caches results and errors of trafaret for equal inputs. Input is keyed
+    by ``_canonical`` form or by ``key`` callable, e.g. idempotency key of
+    request. Cache keeps ``maxsize`` last used entries not older than
+    ``ttl`` seconds. Results are deep copied, pass ``copy=False`` if they
+    are immutable, e.g. records from ``Dict(...).as_record()``.
+
+    >>> calls = []
+    >>> record = Cached(Dict(id=Int) >> (lambda d: calls.append(d) or d))
+    >>> record
+    <Cached(<Dict(id=<Int>)>)>
+    >>> record.check({'id': '1'})
+    {'id': 1}
+    >>> record.check({'id': '1'})['id'] = 2
+    >>> record.check({'id': '1'}), len(calls), record.hits, record.misses
+    ({'id': 1}, 1, 2, 1)
+    >>> extract_error(record, {'id': 'x'})
+    {'id': "value x can't be converted to int"}
+    >>> extract_error(record, {'id': 'x'})
+    {'id': "value x can't be converted to int"}
+    >>> record.hits, len(record)
+    (3, 2)
+
+    Values without canonical form, or for which ``key`` raises
+    ``TypeError`` or ``LookupError``, are checked without cache. ``ttl`` is
+    measured with ``timer``, monotonic clock by default:
+
+    >>> extract_error(record, {'id': 1, 'extra': bytearray()})
+    {'extra': 'extra is not allowed key'}
+    >>> len(record)
+    2
+
+    >>> by_id = Cached(Dict(id=Int, body=String), maxsize=1,
+    ...                key=lambda d: d['id'])
+    >>> by_id.check({'id': 1, 'body': 'a'})['body']
+    'a'
+    >>> by_id.check({'id': 1, 'body': 'b'})['body']
+    'a'
+    >>> by_id.check({'id': 2, 'body': 'c'})['body']
+    'c'
+    >>> by_id.check({'id': 1, 'body': 'b'})['body']
+    'b'
+    >>> extract_error(by_id, {'body': 'b'})
+    {'id': 'is required'}
+    """
+
+    def __init__(self, trafaret, key=None, maxsize=1024, ttl=None,
+                 copy=True, timer=getattr(time, 'monotonic', time.time)):
+        self.trafaret = self._trafaret(trafaret)
+        self.key = key or _canonical
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.copy = copy
+        self.timer = timer
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._cache)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._cache.pop(key, None)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[0] is not None and entry[0] < self.timer():
+                self.misses += 1
+                return None
+            self._cache[key] = entry
+            self.hits += 1
+            return entry
+
+    def _put(self, key, is_error, result):
+        expires = None if self.ttl is None else self.timer() + self.ttl
+        with self._lock:
+            self._cache.pop(key, None)
+            self._cache[key] = (expires, is_error, result)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+
+    def _result(self, is_error, result):
+        if self.copy:
+            result = _copied(result)
+        elif is_error:
+            # raised instance collects traceback, do not raise cached one
+            result = copy.copy(result)
+        if is_error:
+            raise result
+        return result
+
+    def check_and_return(self, value):
+        try:
+            key = self.key(value)
+            hash(key)
+        except (TypeError, LookupError):
+            return self.trafaret.check(value)
+        deadline = _local.deadline
+        if deadline is not None and deadline.expired():
+            # keying big value took whole budget
+            raise ValidationTimeout()
+        entry = self._get(key)
+        if entry is not None:
+            return self._result(entry[1], entry[2])
+        result = catch_error(self.trafaret, value)
+        if isinstance(result, ValidationTimeout):
+            # says nothing about value, is not cached
+            raise result
+        is_error = isinstance(result, DataError)
+        # copy of error does not keep tracebacks with frames of this check
+        self._put(key, is_error, _copied(result) if is_error else result)
+        return self._result(is_error, result)
+
+    def __repr__(self):
+        return "<Cached(%r)>" % self.trafaret
+
+
+def check_limits(value, max_depth=None, max_total_items=None,
+                 max_string_length=None, max_dict_keys=None):
+    """
+    Scans ``value`` with explicit stack and raises ``DataError`` at first
+    place exceeding limits. Items of all lists, tuples and dicts are
+    counted together, dict keys are checked as strings too. Scan stops as
+    soon as budget is exceeded, so its time is bounded by limits, or by
+    ``Deadline`` of check it runs in.
+
+    >>> check_limits({'a': [1, 2, 3]}, max_total_items=3)
+    Traceback (most recent call last):
+    ...
+    trafaret.DataError: {'a': DataError(value has more than 3 items in total)}
+    >>> extract_error(check_limits, [[], {'a': [[]]}], max_depth=2)
+    {1: {'a': 'value is nested deeper than 2 containers'}}
+    >>> extract_error(check_limits, {'name': 'x' * 11}, max_string_length=10)
+    {'name': 'string is longer than 10 characters'}
+    >>> extract_error(check_limits, {'a' * 11: 1}, max_string_length=10)
+    'key aaaaaaaaaa... is longer than 10 characters'
+    >>> extract_error(check_limits, [{}, dict.fromkeys('abc')], max_dict_keys=2)
+    {1: 'dict has more than 2 keys'}
+    """
+    total = 0
+    string_types = str_types + (bytearray, memoryview)
+    container_types = (dict, list, tuple)
+    max_string = max_string_length
+    if isinstance(value, string_types):
+        if max_string is not None and len(value) > max_string:
+            _limit_failure(None, "string is longer than %s characters"
+                                 % max_string)
+        return
+    if not isinstance(value, container_types):
+        return
+    # without depth and items limits shared containers are scanned once
+    seen = set() if max_depth is None and max_total_items is None else None
+    deadline = _local.deadline
+    countdown = deadline.every if deadline is not None else 0
+    stack = [(value, 0, None)]
+    while stack:
+        value, depth, path = stack.pop()
+        if max_depth is not None and depth >= max_depth:
+            _limit_failure(path, "value is nested deeper than %s containers"
+                                 % max_depth)
+        total += len(value)
+        if max_total_items is not None and total > max_total_items:
+            _limit_failure(path, "value has more than %s items in total"
+                                 % max_total_items)
+        if seen is not None:
+            if id(value) in seen:
+                continue
+            seen.add(id(value))
+        if isinstance(value, dict):
+            if max_dict_keys is not None and len(value) > max_dict_keys:
+                _limit_failure(path, "dict has more than %s keys"
+                                     % max_dict_keys)
+            if max_string is not None:
+                for key in value:
+                    if isinstance(key, string_types) \
+                            and len(key) > max_string:
+                        _limit_failure(path, "key %s... is longer than %s"
+                                       " characters" % (key[:max_string],
+                                                        max_string))
+            items = value.items()
+        else:
+            items = enumerate(value)
+        for key, item in items:
+            if deadline is not None:
+                countdown -= 1
+                if countdown <= 0:
+                    countdown = deadline.every
+                    if deadline.expired():
+                        raise ValidationTimeout(_linked_path((key, path)))
+            if isinstance(item, container_types):
+                stack.append((item, depth + 1, (key, path)))
+            elif max_string is not None and isinstance(item, string_types) \
+                    and len(item) > max_string:
+                _limit_failure((key, path), "string is longer than %s"
+                               " characters" % max_string)
+
+
+def _linked_path(path):
+    """ Returns tuple of keys of ``(key, parent)`` linked path """
+    keys = []
+    while path is not None:
+        key, path = path
+        keys.append(key)
+    return tuple(reversed(keys))
+
+
+def _limit_failure(path, message):
+    """ Raises error nested by ``(key, parent)`` linked path """
+    error = DataError(message)
+    while path is not None:
+        key, path = path
+        error = DataError({key: error})
+    raise error
+
+
+class Limited(Trafaret):
+
+    """
+    Checks size of value with ``check_limits`` before checking it with
+    trafaret, so huge or deep values are rejected before any work:
+
+    >>> text = Limited(String(regex='^a+$'), max_string_length=5)
+    >>> text
+    <Limited(<String>)>
+    >>> extract_error(text, 'a' * 10 ** 6)
+    'string is longer than 5 characters'
+    >>> node = Forward()
+    >>> node << List(node)
+    >>> deep = []
+    >>> for _ in range(100000):
+    ...     deep = [deep]
+    >>> extract_error(Limited(node, max_depth=2), deep)
+    {0: {0: 'value is nested deeper than 2 containers'}}
+    >>> extract_error(Limited(List(Int), max_total_items=3), [1, 2, 3, 4])
+    'value has more than 3 items in total'
+    """
+
+    def __init__(self, trafaret, max_depth=None, max_total_items=None,
+                 max_string_length=None, max_dict_keys=None):
+        self.trafaret = self._trafaret(trafaret)
+        self.max_depth = max_depth
+        self.max_total_items = max_total_items
+        self.max_string_length = max_string_length
+        self.max_dict_keys = max_dict_keys
+
+    def check_and_return(self, value):
+        check_limits(value, self.max_depth, self.max_total_items,
+                     self.max_string_length, self.max_dict_keys)
+        return self.trafaret.check(value)
+
+    def __repr__(self):
+        return "<Limited(%r)>" % self.trafaret
+
+
 class Forward(Trafaret):
 
     """
@@ -1198,11 +3371,43 @@ class Forward(Trafaret):
     <Forward(None)>
     >>> extract_error(empty_node, 'something')
     'trafaret not set yet'
-    """
 
-    def __init__(self):
+    With ``iterative`` nested containers are checked with explicit stack
+    instead of recursion, ``max_depth`` limits nesting of containers:
+
+    >>> tree = Forward(iterative=True)
+    >>> tree << List(tree)
+    >>> deep = []
+    >>> for _ in range(100000):
+    ...     deep = [deep]
+    >>> res, depth = tree.check(deep), 0
+    >>> while res:
+    ...     res, depth = res[0], depth + 1
+    >>> depth
+    100000
+    >>> limited = Forward(max_depth=100)
+    >>> limited << List(limited)
+    >>> extract_error(limited, deep)
+    'value is nested deeper than 100 containers'
+
+    ``shared`` checks values referenced many times once, see
+    ``check_iterative``:
+
+    >>> tree = Forward(shared=True)
+    >>> tree << List(tree)
+    >>> loop = []
+    >>> loop.append(loop)
+    >>> extract_error(tree, loop)
+    {0: 'value has reference cycle'}
+    """
+
+    def __init__(self, iterative=False, max_depth=None, shared=False,
+                 cycles='reject'):
         self.trafaret = None
-        self._recur_repr = False
+        self.iterative = iterative or max_depth is not None or shared
+        self.max_depth = max_depth
+        self.shared = shared
+        self.cycles = cycles
 
     def __lshift__(self, trafaret):
         self.provide(trafaret)
@@ -1215,16 +3420,253 @@ class Forward(Trafaret):
     def check_and_return(self, value):
         if self.trafaret is None:
             self._failure('trafaret not set yet')
+        if self.iterative:
+            return _check_walk(self.trafaret, value, self.max_depth,
+                               self.shared, self.cycles, _local.deadline,
+                               self)
         return self.trafaret.check(value)
 
+    check = _container_check
+
+    def _iter_check(self, value, shared=False):
+        if self.trafaret is None:
+            self._failure('trafaret not set yet')
+        res = yield self.trafaret, value
+        if isinstance(res, DataError):
+            raise res
+        yield _Return(self._convert(res))
+
+    def _check_patched(self, value, touched):
+        if self.trafaret is None:
+            self._failure('trafaret not set yet')
+        return _checked_patch(self.trafaret, value, touched)
+
+    def _check_flat(self, items):
+        if self.trafaret is None:
+            self._failure('trafaret not set yet')
+        return self._convert(_checked_flat(self.trafaret, items))
+
+    def __copy__(self):
+        res = self.__class__.__new__(self.__class__)
+        res.__dict__.update(self.__dict__)
+        if self.trafaret is None:
+            # copy sees trafaret provided to original later
+            res.trafaret = self
+            res.iterative = False
+        return res
+
     def __repr__(self):
-        # XXX not threadsafe
-        if self._recur_repr:
+        in_repr = _local.__dict__.setdefault('forward_repr', set())
+        if id(self) in in_repr:
             return "<recur>"
-        self._recur_repr = True
-        r = "<Forward(%r)>" % self.trafaret
-        self._recur_repr = False
-        return r
+        in_repr.add(id(self))
+        try:
+            return "<Forward(%r)>" % self.trafaret
+        finally:
+            in_repr.discard(id(self))
+
+
+def _walks_itself(trafaret):
+    """
+    Containers with ``shared`` and ``Forward`` with ``max_depth`` walk their
+    value themselves, so depth, memo and cycles options hold inside other
+    checks too
+    """
+    return getattr(trafaret, 'shared', False) or isinstance(
+        trafaret, Forward) and trafaret.max_depth is not None
+
+
+class _Output(object):
+
+    """
+    Output container yielded by ``_iter_check`` before children are
+    checked, lets ``check_iterative`` reproduce reference cycles
+    """
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+
+class _Return(object):
+
+    """
+    Final value of ``_iter_check`` generator
+    """
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+
+def check_iterative(trafaret, value, max_depth=None, shared=False,
+                    cycles='reject', deadline=None):
+    """
+    Checks value with explicit stack instead of recursion. Containers
+    implement ``_iter_check`` generator, it yields ``(trafaret, value)``
+    or ``(trafaret, value, key)`` for every child and gets back checked
+    value or ``DataError``, then yields ``_Return`` with result. Other
+    trafarets are checked as usual. ``max_depth`` limits count of nested
+    containers, ``deadline`` is ``Deadline`` checked every
+    ``deadline.every`` values.
+
+    >>> check_iterative(Dict(a=List(Int | String)), {'a': ['1', 2, 'x']})
+    {'a': [1, 2, 'x']}
+    >>> extract_error(check_iterative, Tuple(Int, Int), [1, 'x'])
+    {1: "value x can't be converted to int"}
+    >>> extract_error(check_iterative, List(List(Int)), [[1]], 1)
+    'value is nested deeper than 1 containers'
+    >>> tree = Forward()
+    >>> tree << List(tree)
+    >>> loop = []
+    >>> loop.append(loop)
+    >>> extract_error(check_iterative, tree, loop)
+    {0: 'value has reference cycle'}
+
+    With ``shared`` results are memoized by identity of value and
+    trafaret for the call, so value referenced many times is checked once
+    and result is shared in output the same way. Reference cycles are
+    rejected, or with ``cycles='reproduce'`` are reproduced in output for
+    ``Dict`` and ``List`` without converters:
+
+    >>> item = {'id': '1'}
+    >>> res = check_iterative(List(Dict(id=Int)), [item, item], shared=True)
+    >>> res, res[0] is res[1]
+    ([{'id': 1}, {'id': 1}], True)
+    >>> node = Forward()
+    >>> node << Dict(name=String, next=node | Null)
+    >>> loop = {'name': 'a', 'next': None}
+    >>> loop['next'] = loop
+    >>> extract_error(check_iterative, node, loop, shared=True)
+    {'next': {0: 'value has reference cycle', 1: 'value should be None'}}
+    >>> res = check_iterative(node, loop, shared=True, cycles='reproduce')
+    >>> res['next'] is res
+    True
+    """
+    return _check_walk(trafaret, value, max_depth, shared, cycles, deadline)
+
+
+def _check_walk(trafaret, value, max_depth, shared, cycles, deadline,
+                walker=None):
+    """
+    Loop of ``check_iterative``. ``walker`` is ``Forward`` or container
+    walking value with its options, its references in value are walked by
+    same loop.
+    """
+    if cycles not in ('reject', 'reproduce'):
+        raise RuntimeError("cycles should be 'reject' or 'reproduce'")
+    stack = []
+    # with ``shared``: memo key and value for every generator in ``stack``
+    frames = []
+    memo = {} if shared else None
+    # memo key -> output container or None while value is being checked
+    progress = {}
+    # keys of values checked by generators in ``stack``
+    keys = []
+    # without ``shared``: ids of value and trafaret for every generator in
+    # ``stack``, same pair nested in itself is reference cycle
+    active = set()
+    active_keys = []
+    countdown = deadline.every if deadline is not None else 0
+    result = None
+    task = (trafaret, value)
+    while True:
+        if task is not None:
+            trafaret, value = task[0], task[1]
+            if deadline is not None:
+                countdown -= 1
+                if countdown <= 0:
+                    countdown = deadline.every
+                    if deadline.expired():
+                        for gen in stack:
+                            gen.close()
+                        path = keys + list(task[2:])
+                        raise ValidationTimeout(tuple(
+                            key for key in path if key is not _empty))
+            path_key = task[2] if len(task) > 2 else _empty
+            task = None
+            # plain Forward adds nothing to result, skip its level
+            while type(trafaret) is Forward and trafaret.trafaret is not None \
+                    and not hasattr(trafaret, 'converters') \
+                    and (trafaret is walker or not _walks_itself(trafaret)):
+                trafaret = trafaret.trafaret
+            if trafaret is not walker and _walks_itself(trafaret):
+                iter_check = None
+            else:
+                iter_check = getattr(trafaret, '_iter_check', None)
+            if iter_check is None:
+                try:
+                    result = getattr(trafaret, 'check', trafaret)(value)
+                except ValidationTimeout as err:
+                    # raised by nested check, e.g. of ``Limited`` container
+                    for gen in stack:
+                        gen.close()
+                    raise ValidationTimeout(tuple(
+                        key for key in keys + [path_key]
+                        if key is not _empty) + err.path)
+                except DataError as err:
+                    result = err
+            elif max_depth is not None and len(stack) >= max_depth:
+                for gen in stack:
+                    gen.close()
+                raise DataError(error='value is nested deeper than %s '
+                                      'containers' % max_depth)
+            elif memo is None:
+                key = (id(value), id(trafaret))
+                if key in active:
+                    result = DataError(error='value has reference cycle')
+                else:
+                    active.add(key)
+                    active_keys.append(key)
+                    stack.append(iter_check(value))
+                    keys.append(path_key)
+                    result = None
+            else:
+                key = (id(value), id(trafaret))
+                if key in memo:
+                    result = memo[key][1]
+                elif key in progress:
+                    result = progress[key]
+                    if cycles == 'reject' or result is None:
+                        result = DataError(error='value has reference cycle')
+                else:
+                    progress[key] = None
+                    frames.append((key, value))
+                    stack.append(iter_check(value, True))
+                    keys.append(path_key)
+                    result = None
+        if not stack:
+            if isinstance(result, DataError):
+                raise result
+            return result
+        try:
+            res = stack[-1].send(result)
+        except ValidationTimeout as err:
+            # raised by whole check in generator, e.g. of lazy ``Dict``
+            for gen in stack:
+                gen.close()
+            raise ValidationTimeout(tuple(
+                key for key in keys if key is not _empty) + err.path)
+        except DataError as err:
+            res = _Return(err)
+        if isinstance(res, _Return):
+            stack.pop().close()
+            keys.pop()
+            result = res.value
+            if memo is None:
+                active.discard(active_keys.pop())
+            else:
+                key, value = frames.pop()
+                del progress[key]
+                # keep value referenced, so its id is not reused
+                memo[key] = (value, result)
+        elif isinstance(res, _Output):
+            progress[frames[-1][0]] = res.value
+            result = None
+        else:
+            task = res
 
 
 class GuardError(DataError):
@@ -0,0 +1,240 @@
+"""
+Command line validator for NDJSON and JSON files::
+
+    python -m trafaret validate mymodule:schema data.ndjson --workers 4
+
+Failures are written as NDJSON lines ``{"line": 3, "path": "a.0",
+"message": "..."}``, for JSON array ``line`` is number of item. Summary
+goes to stderr. Exit status is 0 if all
+records are valid, 1 if there are failures.
+"""
+import argparse
+import importlib
+import json
+import mmap
+import multiprocessing
+import os
+import sys
+import time
+
+from . import DataError
+
+
+# elapsed time, wall clock can jump while file is checked
+timer = getattr(time, 'monotonic', time.time)
+
+
+def load_schema(spec):
+    """ Imports ``module:attribute`` trafaret """
+    module, _, attr = spec.partition(':')
+    if not module or not attr:
+        raise ValueError('schema should be given as module:attribute')
+    obj = importlib.import_module(module)
+    for name in attr.split('.'):
+        obj = getattr(obj, name)
+    return obj
+
+
+def record_errors(schema, record):
+    """ Returns ``(path, message)`` pairs of record errors """
+    try:
+        schema.check(record)
+    except DataError as err:
+        return [('.'.join(map(str, path)), str(message))
+                for path, message in err.iter_errors()]
+    return []
+
+
+def split_chunks(mm, size, chunk_size):
+    """ Yields ``(start, end)`` of chunks ending on line boundaries """
+    start = 0
+    while start < size:
+        end = mm.find(b'\n', min(start + chunk_size, size) - 1)
+        end = size if end == -1 else end + 1
+        yield start, end
+        start = end
+
+
+_schema = None
+
+
+def _init_worker(spec):
+    global _schema
+    _schema = load_schema(spec)
+
+
+def check_chunk(task):
+    """
+    Checks lines of file chunk, returns ``(lines, records, checked,
+    failures)``, ``records`` are lines that are not blank, ``failures``
+    holds ``(line, path, message)`` with line numbers relative to chunk
+    start. Stops after ``limit`` failures.
+    """
+    path, start, end, first, sample, limit = task
+    with open(path, 'rb') as fp:
+        mm = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            data = mm[start:end]
+        finally:
+            mm.close()
+    lines = data.split(b'\n')
+    if lines and not lines[-1]:
+        lines.pop()
+    checked = records = 0
+    consumed = len(lines)
+    failures = []
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        records += 1
+        if (first + number - 2) % sample:
+            continue
+        checked += 1
+        try:
+            record = json.loads(line.decode('utf-8'))
+        except ValueError as err:
+            errors = [('', 'invalid JSON: %s' % err)]
+        else:
+            errors = record_errors(_schema, record)
+        failures.extend((number, error_path, message)
+                        for error_path, message in errors)
+        if limit is not None and len(failures) >= limit:
+            consumed = number
+            break
+    return consumed, records, checked, failures
+
+
+def ndjson_tasks(path, chunk_size, sample, limit):
+    """
+    Yields chunk tasks, first line number of every chunk is known only
+    after previous chunk is checked, so it is counted here with one pass
+    over memory mapped file
+    """
+    size = os.path.getsize(path)
+    if not size:
+        return
+    with open(path, 'rb') as fp:
+        mm = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            first = 1
+            for start, end in split_chunks(mm, size, chunk_size):
+                yield path, start, end, first, sample, limit
+                first += mm[start:end].count(b'\n') + (
+                    0 if mm[end - 1:end] == b'\n' else 1)
+        finally:
+            mm.close()
+
+
+def json_results(path, schema, sample, limit):
+    """ Checks items of JSON array, item number is reported as line """
+    with open(path, 'rb') as fp:
+        data = json.loads(fp.read().decode('utf-8'))
+    if not isinstance(data, list):
+        data = [data]
+    checked = 0
+    failures = []
+    consumed = len(data)
+    for number, record in enumerate(data, 1):
+        if (number - 1) % sample:
+            continue
+        checked += 1
+        failures.extend((number, error_path, message) for error_path, message
+                        in record_errors(schema, record))
+        if limit is not None and len(failures) >= limit:
+            consumed = number
+            break
+    yield consumed, consumed, checked, failures
+
+
+def validate(args, out=None, err=None):
+    out = sys.stdout if out is None else out
+    err = sys.stderr if err is None else err
+    limit = 1 if args.fail_fast else args.max_errors
+    is_json = args.format == 'json' or args.format == 'auto' \
+        and args.path.endswith('.json')
+    started = timer()
+    pool = None
+    if is_json:
+        results = json_results(args.path, load_schema(args.schema),
+                               args.sample, limit)
+    else:
+        tasks = ndjson_tasks(args.path, args.chunk_size, args.sample, limit)
+        if args.workers > 1:
+            pool = multiprocessing.Pool(args.workers, _init_worker,
+                                        (args.schema,))
+            results = pool.imap(check_chunk, tasks)
+        else:
+            _init_worker(args.schema)
+            results = (check_chunk(task) for task in tasks)
+    lines = records = checked = reported = 0
+    failed = set()
+    try:
+        for chunk_lines, chunk_records, chunk_checked, failures in results:
+            for number, error_path, message in failures:
+                if limit is not None and reported >= limit:
+                    break
+                out.write(json.dumps({'line': lines + number,
+                                      'path': error_path,
+                                      'message': message}) + '\n')
+                failed.add(lines + number)
+                reported += 1
+            lines += chunk_lines
+            records += chunk_records
+            checked += chunk_checked
+            if limit is not None and reported >= limit:
+                break
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+    elapsed = max(timer() - started, 1e-9)
+    err.write('checked %d of %d records in %.2f s, %.0f records/s, '
+              '%.1f MB/s\n' % (checked, records, elapsed, checked / elapsed,
+                               os.path.getsize(args.path) / 1048576.0
+                               / elapsed))
+    err.write('%d records failed, %d errors reported%s\n' % (
+        len(failed), reported,
+        ', stopped on limit' if limit is not None and reported >= limit
+        else ''))
+    return 1 if failed else 0
+
+
+def parser():
+    parser = argparse.ArgumentParser(prog='python -m trafaret')
+    commands = parser.add_subparsers(dest='command')
+    command = commands.add_parser(
+        'validate', help='check records of NDJSON or JSON file')
+    command.add_argument('schema', help='trafaret as module:attribute')
+    command.add_argument('path', help='NDJSON file, or JSON array file')
+    command.add_argument('--format', choices=('auto', 'ndjson', 'json'),
+                         default='auto',
+                         help='input format, auto is json for .json files')
+    command.add_argument('-j', '--workers', type=int,
+                         default=multiprocessing.cpu_count(),
+                         help='worker processes for NDJSON')
+    command.add_argument('--chunk-size', type=int, default=4 * 1024 * 1024,
+                         help='bytes of NDJSON per worker task')
+    command.add_argument('--fail-fast', action='store_true',
+                         help='stop on first failure')
+    command.add_argument('--max-errors', type=int,
+                         help='stop after this many errors')
+    command.add_argument('--sample', type=int, default=1, metavar='N',
+                         help='check every N-th record only')
+    return parser
+
+
+def main(argv=None):
+    commands = parser()
+    args = commands.parse_args(argv)
+    if args.command != 'validate':
+        commands.print_help()
+        return 2
+    if args.sample < 1 or args.chunk_size < 1 or args.workers < 1:
+        sys.stderr.write('sample, chunk size and workers should be'
+                         ' positive\n')
+        return 2
+    return validate(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
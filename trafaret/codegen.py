@@ -0,0 +1,528 @@
+""" Generates standalone Python modules from trafarets.
+
+Generated module defines ``check(value)`` with one plain function per
+trafaret, keys of ``Dict`` and branches of ``Or`` are unrolled, regex
+patterns are kept with their flags and compiled on first use only. Module
+imports nothing but ``trafaret`` itself, so loading it does not build
+schema. ``load`` keeps generated modules in cache directory.
+
+>>> from trafaret import Dict, Key, List, Int, String, Or, Null, Forward
+>>> schema = Dict({Key('id') >> 'pk': Int[1:], 'tags': List(String(regex='^[a-z]+$')),
+...                Key('note', optional=True): String | Null})
+>>> check = compile_trafaret(schema).check
+>>> check({'id': '1', 'tags': ['a']}) == {'pk': 1, 'tags': ['a']}
+True
+>>> extract_error(check, {'id': 0, 'tags': ['A'], 'x': 1}) == \\
+...     extract_error(schema, {'id': 0, 'tags': ['A'], 'x': 1})
+True
+>>> node = Forward()
+>>> node << Dict(name=String, children=List(node))
+>>> compile_trafaret(node).check({'name': 'a', 'children': [{'name': 'b', 'children': []}]})
+{'name': 'a', 'children': [{'name': 'b', 'children': []}]}
+>>> compile_trafaret(Int >> str)
+Traceback (most recent call last):
+...
+RuntimeError: code can't be generated for <Int> with converters
+"""
+import hashlib
+import importlib
+import marshal
+import os
+import re
+import sys
+
+import trafaret as t
+from . import Trafaret, DataError, Key, extract_error
+
+
+CODEGEN_VERSION = '1'
+
+_literal_types = (type(None), bool, int, float, str, bytes) + (
+    (long, unicode) if sys.version_info[0] == 2 else ())  # noqa
+
+
+def _literal(value):
+    """ Returns ``repr`` of value that can be evaluated back """
+    if isinstance(value, tuple):
+        return '(%s)' % ''.join('%s, ' % _literal(v) for v in value)
+    if type(value) not in _literal_types or \
+            isinstance(value, float) and value != value:
+        raise RuntimeError("value %r can't be written into code" % (value,))
+    return repr(value)
+
+
+class _Generator(object):
+
+    def __init__(self):
+        self.names = {}
+        self.header = []
+        self.functions = []
+        self.pending = []
+
+    def name(self, trafaret):
+        """ Returns name of function for trafaret, queues its generation """
+        while type(trafaret) is t.Forward and not trafaret.iterative \
+                and not hasattr(trafaret, 'converters'):
+            if trafaret.trafaret is None:
+                raise RuntimeError("trafaret for Forward is not set")
+            trafaret = trafaret.trafaret
+        if id(trafaret) not in self.names:
+            self.names[id(trafaret)] = '_t%d' % len(self.names)
+            self.pending.append(trafaret)
+        return self.names[id(trafaret)]
+
+    def generate(self, trafaret):
+        root = self.name(trafaret)
+        while self.pending:
+            trafaret = self.pending.pop()
+            self.functions.append(self.function(trafaret))
+        return '\n'.join([
+            '# Generated by trafaret.codegen from',
+            '# %s' % repr(trafaret).replace('\n', ' '),
+            'import numbers',
+            'import re',
+            '',
+            'import trafaret as _trafaret',
+            'from trafaret import DataError, ErrorsCollector',
+            '',
+            '',
+            'def _collector(limit, stop_on_limit):',
+            '    if limit is None:',
+            '        return ErrorsCollector(*_trafaret._default_errors_limit())',
+            '    return ErrorsCollector(limit, stop_on_limit)',
+            '',
+            '_real = _trafaret.str_types + (numbers.Real,)',
+        ] + self.header + [''] + self.functions + [
+            '',
+            'check = %s' % root,
+            '',
+        ])
+
+    def function(self, trafaret):
+        if hasattr(trafaret, 'converters'):
+            raise RuntimeError("code can't be generated for %r with "
+                               "converters" % trafaret)
+        method = getattr(self, 'gen_' + type(trafaret).__name__, None)
+        if method is None or getattr(t, type(trafaret).__name__, None) \
+                is not type(trafaret):
+            raise RuntimeError("code can't be generated for %r" % trafaret)
+        name = self.names[id(trafaret)]
+        body = method(trafaret, name)
+        return '\ndef %s(value):\n%s\n' % (
+            name, '\n'.join('    ' + line if line else line
+                            for line in body))
+
+    def gen_Any(self, trafaret, name):
+        return ['return value']
+
+    def gen_Null(self, trafaret, name):
+        return ['if value is not None:',
+                '    raise DataError("value should be None")',
+                'return value']
+
+    def gen_Bool(self, trafaret, name):
+        return ['if not isinstance(value, bool):',
+                '    raise DataError("value %s should be True or False"'
+                ' % value)',
+                'return value']
+
+    def gen_Type(self, trafaret, name):
+        type_ = trafaret.type_
+        module = getattr(type_, '__module__', None)
+        qualname = getattr(type_, '__qualname__', type_.__name__)
+        if module in ('builtins', '__builtin__'):
+            ref = qualname
+        else:
+            try:
+                found = importlib.import_module(module)
+                for part in qualname.split('.'):
+                    found = getattr(found, part)
+            except (ImportError, AttributeError, TypeError):
+                found = None
+            if found is not type_:
+                raise RuntimeError("type %r can't be imported" % type_)
+            ref = '_type%s' % name
+            self.header.append('from %s import %s as %s' % (
+                module, qualname, ref))
+        return ['if not isinstance(value, %s):' % ref,
+                '    raise DataError(%s)' % _literal(
+                    'value is not %s' % type_.__name__),
+                'return value']
+
+    def gen_Float(self, trafaret, name):
+        type_name = trafaret.value_type.__name__
+        lines = ['val = value',
+                 'if not isinstance(val, %s):' % type_name]
+        if trafaret.value_type is int:
+            lines += ['    if isinstance(val, float) and not val.is_integer():',
+                      "        raise DataError('value %s is not int' % (val))"]
+        lines += [
+            '    if not isinstance(val, _real):',
+            "        raise DataError('value %%s is not %s' %% (val,))"
+            % type_name,
+            '    try:',
+            '        value = %s(val)' % type_name,
+            '    except ValueError:',
+            '        raise DataError("value %%s can\'t be converted to %s"'
+            ' %% (val,))' % type_name,
+        ]
+        for attr, op, message in (
+                ('gte', '<', 'value %s is less than %s'),
+                ('lte', '>', 'value %s is greater than %s'),
+                ('lt', '>=', 'value %s should be less than %s'),
+                ('gt', '<=', 'value %s should be greater than %s')):
+            bound = getattr(trafaret, attr)
+            if bound is not None:
+                lines += ['if value %s %s:' % (op, _literal(bound)),
+                          '    raise DataError(%s %% (value, %s))' % (
+                              _literal(message), _literal(bound))]
+        return lines + ['return value']
+    gen_Int = gen_Float
+
+    def gen_Atom(self, trafaret, name):
+        return ['if %s != value:' % _literal(trafaret.value),
+                '    raise DataError(%s)' % _literal(
+                    "value is not exactly '%s'" % trafaret.value),
+                'return value']
+
+    def gen_Enum(self, trafaret, name):
+        return ['if value not in %s:' % _literal(tuple(trafaret.variants)),
+                '    raise DataError("value doesn\'t match any variant")',
+                'return value']
+
+    def gen_String(self, trafaret, name):
+        if trafaret.utf8 or trafaret.decode:
+            raise RuntimeError("code can't be generated for String with "
+                               "utf8 or decode")
+        regex = trafaret.regex
+        fallback = '_string%s' % name
+        self.header += [
+            '%s = []' % fallback,
+            '',
+            'def %s_fallback(value):' % name,
+            '    # values other than text are rare, runtime String checks'
+            ' them',
+            '    if not %s:' % fallback,
+            '        %s.append(_trafaret.String(allow_blank=%r, regex=%s,'
+            ' min_length=%r, max_length=%r))' % (
+                fallback, trafaret.allow_blank,
+                're.compile(%s, %d)' % (_literal(regex.pattern), regex.flags)
+                if regex is not None else 'None',
+                trafaret.min_length, trafaret.max_length),
+            '    return %s[0].check(value)' % fallback,
+            '',
+        ]
+        # runtime String counts characters of utf-8 bytes, so only text
+        # and bytes for bytes patterns are checked here
+        if regex is None or not isinstance(regex.pattern, bytes):
+            text = '_trafaret.unicode'
+        else:
+            text = 'bytes'
+        lines = ['if not isinstance(value, %s):' % text,
+                 '    return %s_fallback(value)' % name]
+        if not trafaret.allow_blank:
+            lines += ['if len(value) == 0:',
+                      '    raise DataError("blank value is not allowed")']
+        if trafaret.min_length is not None:
+            lines += ['if len(value) < %d:' % trafaret.min_length,
+                      '    raise DataError(%s)' % _literal(
+                          'String is shorter than %s characters'
+                          % trafaret.min_length)]
+        if trafaret.max_length is not None:
+            lines += ['if len(value) > %d:' % trafaret.max_length,
+                      '    raise DataError(%s)' % _literal(
+                          'String is longer than %s characters'
+                          % trafaret.max_length)]
+        if regex is None:
+            return lines + ['return value']
+        compiled = '_re%s' % name
+        self.header += ['%s = []' % compiled]
+        return lines + [
+            'if not %s:' % compiled,
+            '    %s.append(re.compile(%s, %d))' % (
+                compiled, _literal(regex.pattern), regex.flags),
+            'match = %s[0].match(value)' % compiled,
+            'if not match:',
+            '    raise DataError("value \'%%s\' does not match pattern: %%s"'
+            ' %% (value, %s))' % _literal(repr(regex.pattern)),
+            'return match.group()',
+        ]
+
+    def gen_List(self, trafaret, name):
+        if trafaret.lazy or trafaret.output != 'list' or trafaret.parallel \
+                or trafaret.typecode is not None or trafaret.shared \
+                or hasattr(trafaret.trafaret, 'check_batch'):
+            raise RuntimeError("code can't be generated for %r with lazy, "
+                               "packed, parallel or shared options"
+                               % trafaret)
+        lines = ['if not isinstance(value, list):',
+                 '    raise DataError("value is not list")']
+        if trafaret.min_length:
+            lines += ['if len(value) < %d:' % trafaret.min_length,
+                      '    raise DataError(%s)' % _literal(
+                          'list length is less than %s'
+                          % trafaret.min_length)]
+        if trafaret.max_length is not None:
+            lines += ['if len(value) > %d:' % trafaret.max_length,
+                      '    raise DataError(%s)' % _literal(
+                          'list length is greater than %s'
+                          % trafaret.max_length)]
+        return lines + [
+            'errors = _collector(%r, %r)' % (trafaret.max_errors,
+                                             trafaret.stop_on_limit),
+            'lst = []',
+            'append = lst.append',
+            'for index, item in enumerate(value):',
+            '    try:',
+            '        append(%s(item))' % self.name(trafaret.trafaret),
+            '    except DataError as err:',
+            '        if not errors.add(index, err):',
+            '            break',
+            'if errors:',
+            '    errors.raise_error()',
+            'return lst',
+        ]
+
+    def gen_Dict(self, trafaret, name):
+        if trafaret.lazy or trafaret.record_type is not None \
+                or trafaret.shared:
+            raise RuntimeError("code can't be generated for %r with lazy, "
+                               "record or shared options" % trafaret)
+        lines = ['if not isinstance(value, dict):',
+                 '    raise DataError("value \'%s\' is not dict" % value)',
+                 'data = dict(value)',
+                 'collect = {}',
+                 'errors = _collector(%r, %r)' % (trafaret.max_errors,
+                                                  trafaret.stop_on_limit)]
+        for key in trafaret.keys:
+            if type(key) is not Key:
+                raise RuntimeError("code can't be generated for %r" % key)
+            if callable(key.default):
+                raise RuntimeError("code can't be generated for callable "
+                                   "default of %r" % key)
+            check = self.name(key.trafaret)
+            key_name, out = _literal(key.name), _literal(key.get_name())
+            lines += ['if %s in data:' % key_name,
+                      '    try:',
+                      '        collect[%s] = %s(data.pop(%s))' % (
+                          out, check, key_name),
+                      '    except DataError as err:',
+                      '        if not errors.add(%s, err):' % out,
+                      '            errors.raise_error()']
+            if key.default is not t._empty:
+                lines += ['else:',
+                          '    try:',
+                          '        collect[%s] = %s(%s)' % (
+                              out, check, _literal(key.default)),
+                          '    except DataError as err:',
+                          '        if not errors.add(%s, err):' % out,
+                          '            errors.raise_error()']
+            elif not key.optional:
+                lines += ['elif not errors.add(%s, DataError('
+                          'error="is required")):' % key_name,
+                          '    errors.raise_error()']
+        if not trafaret.ignore_any:
+            lines += ['for key in data:']
+            if trafaret.ignore:
+                lines += ['    if key in %s:' % _literal(
+                    tuple(trafaret.ignore)), '        continue']
+            if trafaret.allow_any:
+                lines += ['    collect[key] = data[key]']
+            else:
+                lines += [
+                    '    if key not in %s:' % _literal(
+                        tuple(trafaret.extras)),
+                    '        if not errors.add(key, DataError('
+                    '"%s is not allowed key" % key)):',
+                    '            break',
+                    '    else:',
+                    '        collect[key] = data[key]']
+        return lines + ['if errors:',
+                        '    errors.raise_error()',
+                        'return collect']
+
+    def gen_Mapping(self, trafaret, name):
+        if trafaret.lazy or trafaret.shared:
+            raise RuntimeError("code can't be generated for lazy or shared %r"
+                               % trafaret)
+        return [
+            'checked_mapping = {}',
+            'errors = _collector(%r, %r)' % (trafaret.max_errors,
+                                             trafaret.stop_on_limit),
+            'for key, item in value.items():',
+            '    pair_errors = {}',
+            '    try:',
+            '        checked_key = %s(key)' % self.name(trafaret.key),
+            '    except DataError as err:',
+            "        pair_errors['key'] = err",
+            '    try:',
+            '        checked_value = %s(item)' % self.name(trafaret.value),
+            '    except DataError as err:',
+            "        pair_errors['value'] = err",
+            '    if pair_errors:',
+            '        if not errors.add(key, DataError(error=pair_errors)):',
+            '            break',
+            '    else:',
+            '        checked_mapping[checked_key] = checked_value',
+            'if errors:',
+            '    errors.raise_error()',
+            'return checked_mapping',
+        ]
+
+    def gen_Tuple(self, trafaret, name):
+        lines = [
+            'try:',
+            '    value = tuple(value)',
+            'except TypeError:',
+            '    raise DataError("value must be convertable to tuple")',
+            'if len(value) != %d:' % trafaret.length,
+            '    raise DataError(%s)' % _literal(
+                'value must contain exact %s items' % trafaret.length),
+            'result = []',
+            'errors = {}',
+        ]
+        for index, item in enumerate(trafaret.trafarets):
+            lines += ['try:',
+                      '    result.append(%s(value[%d]))' % (
+                          self.name(item), index),
+                      'except DataError as err:',
+                      '    errors[%d] = err' % index]
+        return lines + ['if errors:',
+                        '    raise DataError(error=errors)',
+                        'return tuple(result)']
+
+    def gen_Or(self, trafaret, name):
+        # adaptive order changes speed only, first branch order is kept
+        lines = []
+        for index, branch in enumerate(trafaret.trafarets):
+            lines += ['try:',
+                      '    return %s(value)' % self.name(branch),
+                      'except DataError as err:',
+                      '    error%d = err' % index]
+        return lines + ['raise DataError({%s})' % ', '.join(
+            '%d: error%d' % (index, index)
+            for index in range(len(trafaret.trafarets)))]
+
+
+def generate(trafaret):
+    """
+    Returns source of module checking values like ``trafaret``. Raises
+    ``RuntimeError`` for trafarets code can't be generated for: ones with
+    converters, custom classes, non-literal defaults and options.
+    """
+    return _Generator().generate(trafaret)
+
+
+_source_digests = {}
+
+
+def _file_digest(path):
+    if path not in _source_digests:
+        with open(path, 'rb') as fp:
+            _source_digests[path] = hashlib.sha256(fp.read()).hexdigest()
+    return _source_digests[path]
+
+
+def fingerprint(*parts):
+    """
+    Hex digest of parts together with codegen and Python versions and
+    source of trafaret, which generated code calls
+    """
+    digest = hashlib.sha256()
+    for part in (CODEGEN_VERSION, sys.version[:sys.version.index(' ')],
+                 _file_digest(t.__file__), _file_digest(__file__)) + parts:
+        if not isinstance(part, bytes):
+            part = part.encode('utf-8')
+        digest.update(part)
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class Generated(Trafaret):
+
+    """
+    Trafaret checking values with ``check`` function of generated module
+    """
+
+    def __init__(self, module):
+        self.module = module
+        self.check_and_return = module.check
+
+    def __repr__(self):
+        return '<Generated(%s)>' % self.module.__name__
+
+
+def _module(name, code, path=None):
+    module = type(sys)(name)
+    module.__file__ = path
+    exec(code, module.__dict__)
+    return module
+
+
+def _write(path, data, mode):
+    tmp = '%s.%d.tmp' % (path, os.getpid())
+    with open(tmp, mode) as fp:
+        fp.write(data)
+    # rename is atomic, concurrent workers never see partial file
+    os.rename(tmp, path)
+
+
+def compile_trafaret(trafaret):
+    """ Returns ``Generated`` from trafaret without writing files """
+    code = compile(generate(trafaret), '<trafaret.codegen>', 'exec')
+    return Generated(_module('trafaret_generated', code))
+
+
+def _source_path(module_name):
+    try:
+        from importlib.util import find_spec
+    except ImportError:
+        import imp
+        path = None
+        for part in module_name.split('.'):
+            found = imp.find_module(part, path and [path])
+            path = found[1]
+        return path
+    spec = find_spec(module_name)
+    if spec is None or not spec.origin or not os.path.isfile(spec.origin):
+        raise RuntimeError("source of %s is not found" % module_name)
+    return spec.origin
+
+
+def load(spec, cache_dir=None):
+    """
+    Returns ``Generated`` for ``module:attribute`` trafaret. Module
+    generated for it and its code object are looked up in ``cache_dir``
+    by fingerprint of ``spec``, source of schema module and of trafaret,
+    so schema module is not imported at all when cache is warm. Cache does
+    not track modules schema module imports from, clear cache when they
+    change. Default ``cache_dir`` is
+    ``TRAFARET_CODEGEN_CACHE`` environment variable or
+    ``~/.cache/trafaret``.
+    """
+    module_name, _, attr = spec.partition(':')
+    if not module_name or not attr:
+        raise ValueError('schema should be given as module:attribute')
+    if cache_dir is None:
+        cache_dir = os.environ.get('TRAFARET_CODEGEN_CACHE') \
+            or os.path.join(os.path.expanduser('~'), '.cache', 'trafaret')
+    name = 'trafaret_%s_%s' % (
+        re.sub(r'\W', '_', spec),
+        fingerprint(spec, _file_digest(_source_path(module_name)))[:16])
+    path = os.path.join(cache_dir, name)
+    if os.path.exists(path + '.code'):
+        with open(path + '.code', 'rb') as fp:
+            return Generated(_module(name, marshal.load(fp), path + '.py'))
+    if not os.path.isdir(cache_dir):
+        os.makedirs(cache_dir)
+    if not os.path.exists(path + '.py'):
+        trafaret = importlib.import_module(module_name)
+        for part in attr.split('.'):
+            trafaret = getattr(trafaret, part)
+        _write(path + '.py', generate(trafaret), 'w')
+    with open(path + '.py') as fp:
+        code = compile(fp.read(), path + '.py', 'exec')
+    # code object is kept too, big modules take long to compile and
+    # bytecode of modules may be disabled
+    _write(path + '.code', marshal.dumps(code), 'wb')
+    return Generated(_module(name, code, path + '.py'))
@@ -0,0 +1,324 @@
+""" Exports trafarets to ``js/contract.js`` for checks in browser.
+
+Document is JSON that ``loadTrafaret`` of ``contract.js`` builds checker
+from. Parts that can't be checked same way in JavaScript are exported as
+``Any`` and listed in ``unexported`` with path and reason, so client check
+is looser than server one, never stricter:
+
+>>> import trafaret as t
+>>> doc = export(t.Dict({'id': t.Int[1:], 'name': t.String(regex=r'^\\w+$'),
+...                      'tags': t.List(t.Enum('a', 'b'), max_length=3),
+...                      'owner': t.Type(int) | t.Null}))
+>>> doc['trafaret']['keys'][1]['trafaret']
+{'type': 'String', 'regex': '^[\\\\p{L}\\\\p{N}_]+(?=\\\\n?$)', 'flags': 'uy'}
+>>> doc['unexported']
+[{'path': 'owner.0', 'reason': "<Type(int)> can't be exported"}]
+"""
+import json
+import re
+
+try:
+    from re import _parser as sre_parse, _constants as sre_constants
+except ImportError:
+    import sre_parse
+    import sre_constants
+
+import trafaret as t
+from . import Trafaret, Key
+
+
+VERSION = 1
+
+
+try:
+    unichr
+except NameError:
+    unichr = chr
+
+
+class _Unexportable(RuntimeError):
+    pass
+
+
+def _char(code):
+    char = unichr(code)
+    if char.isalnum() and code < 128:
+        return char
+    return '\\u{%x}' % code
+
+
+# Python ``\s``, characters of ``str.isspace``, JavaScript ``\s`` differs
+_space = '\\t\\n\\v\\f\\r \\x1c-\\x1f\\x85\\p{Z}'
+
+# category -> (outside of class, inside of class) for unicode and ASCII
+# patterns, ``None`` if category can't be written in JavaScript
+_categories = {
+    sre_constants.CATEGORY_DIGIT: (('\\p{Nd}', '\\p{Nd}'), ('\\d', '\\d')),
+    sre_constants.CATEGORY_NOT_DIGIT: (('\\P{Nd}', '\\P{Nd}'),
+                                       ('\\D', '\\D')),
+    sre_constants.CATEGORY_WORD: (('[\\p{L}\\p{N}_]', '\\p{L}\\p{N}_'),
+                                  ('\\w', '\\w')),
+    sre_constants.CATEGORY_NOT_WORD: (('[^\\p{L}\\p{N}_]', None),
+                                      ('\\W', '\\W')),
+    sre_constants.CATEGORY_SPACE: (('[%s]' % _space, _space),
+                                   ('[\\t\\n\\v\\f\\r ]', '\\t\\n\\v\\f\\r ')),
+    sre_constants.CATEGORY_NOT_SPACE: (('[^%s]' % _space, None),
+                                       ('[^\\t\\n\\v\\f\\r ]', None)),
+}
+
+
+# ops written as single atom
+_atoms = (sre_constants.LITERAL, sre_constants.NOT_LITERAL, sre_constants.ANY,
+          sre_constants.IN, sre_constants.SUBPATTERN)
+
+
+class _Regex(object):
+
+    """
+    Writes parsed Python regex as JavaScript regex for ``u`` and ``y``
+    flags. JavaScript differs in ``.``, ``$``, ``\\w``, ``\\d`` and ``\\s``,
+    they are written out explicitly, what can't be is reported as
+    unexportable.
+    """
+
+    def __init__(self, flags):
+        self.ascii = bool(flags & re.ASCII) if hasattr(re, 'ASCII') \
+            else not flags & re.UNICODE
+        self.multiline = bool(flags & re.MULTILINE)
+        self.dotall = bool(flags & re.DOTALL)
+
+    def category(self, code, inside):
+        written = _categories.get(code, ((None, None), (None, None)))[
+            self.ascii][inside]
+        if written is None:
+            raise _Unexportable("regex category %s can't be exported" % code)
+        return written
+
+    def item(self, op, arg):
+        if op == sre_constants.LITERAL:
+            return _char(arg)
+        if op == sre_constants.RANGE:
+            return '%s-%s' % (_char(arg[0]), _char(arg[1]))
+        if op == sre_constants.CATEGORY:
+            return self.category(arg, True)
+        raise _Unexportable("regex set with %s can't be exported" % op)
+
+    def pattern(self, parsed):
+        return ''.join(self.op(op, arg) for op, arg in parsed)
+
+    def op(self, op, arg):
+        if op == sre_constants.LITERAL:
+            return _char(arg)
+        if op == sre_constants.NOT_LITERAL:
+            return '[^%s]' % _char(arg)
+        if op == sre_constants.ANY:
+            return '[\\s\\S]' if self.dotall else '[^\\n]'
+        if op == sre_constants.IN:
+            if len(arg) == 1 and arg[0][0] == sre_constants.CATEGORY:
+                # ``\S`` is parsed as set with single category
+                return self.category(arg[0][1], False)
+            if arg and arg[0][0] == sre_constants.NEGATE:
+                return '[^%s]' % ''.join(self.item(*item) for item in arg[1:])
+            return '[%s]' % ''.join(self.item(*item) for item in arg)
+        if op == sre_constants.CATEGORY:
+            return self.category(arg, False)
+        if op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+            low, high, item = arg
+            if high == sre_constants.MAXREPEAT:
+                count = {0: '*', 1: '+'}.get(low, '{%d,}' % low)
+            elif (low, high) == (0, 1):
+                count = '?'
+            else:
+                count = '{%d,%d}' % (low, high)
+            lazy = '?' if op == sre_constants.MIN_REPEAT else ''
+            written = self.pattern(item)
+            if len(item) != 1 or item[0][0] not in _atoms:
+                written = '(?:%s)' % written
+            return written + count + lazy
+        if op == sre_constants.SUBPATTERN:
+            if len(arg) > 2 and (arg[1] or arg[2]):
+                raise _Unexportable("regex group flags can't be exported")
+            return ('(?:%s)' if arg[0] is None else '(%s)') % self.pattern(
+                arg[-1])
+        if op == sre_constants.BRANCH:
+            return '(?:%s)' % '|'.join(self.pattern(item) for item in arg[1])
+        if op == sre_constants.GROUPREF:
+            return '(?:\\%d)' % arg
+        if op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            return '(?%s%s%s)' % ('<' if arg[0] < 0 else '',
+                                  '=' if op == sre_constants.ASSERT else '!',
+                                  self.pattern(arg[1]))
+        if op == sre_constants.AT:
+            return self.at(arg)
+        raise _Unexportable("regex with %s can't be exported" % op)
+
+    def at(self, code):
+        if code == sre_constants.AT_BEGINNING:
+            return '^'
+        if code == sre_constants.AT_BEGINNING_STRING:
+            return '(?<![\\s\\S])'
+        if code == sre_constants.AT_END:
+            # Python ``$`` matches before trailing newline too
+            return '$' if self.multiline else '(?=\\n?$)'
+        if code == sre_constants.AT_END_STRING:
+            return '(?![\\s\\S])'
+        if self.ascii and code == sre_constants.AT_BOUNDARY:
+            return '\\b'
+        if self.ascii and code == sre_constants.AT_NON_BOUNDARY:
+            return '\\B'
+        raise _Unexportable("regex with %s can't be exported" % code)
+
+
+def js_regex(regex):
+    """
+    Returns ``(source, flags)`` of JavaScript regex that matches same
+    strings as compiled Python ``regex`` at start of string, raises
+    ``RuntimeError`` if it can't be written
+    """
+    if isinstance(regex.pattern, bytes):
+        raise _Unexportable("bytes regex can't be exported")
+    writer = _Regex(regex.flags)
+    source = writer.pattern(sre_parse.parse(regex.pattern, regex.flags))
+    flags = 'u' + 'i' * bool(regex.flags & re.IGNORECASE) \
+        + 'm' * writer.multiline + 'y'
+    return source, flags
+
+
+class _Exporter(object):
+
+    def __init__(self):
+        self.forwards = {}
+        self.unexported = []
+
+    def node(self, trafaret, path):
+        name = type(trafaret).__name__
+        method = getattr(self, 'export_' + name, None)
+        try:
+            if method is None or not isinstance(trafaret, Trafaret) \
+                    or getattr(t, name, None) is not type(trafaret):
+                raise _Unexportable("%r can't be exported" % (trafaret,))
+            node = {'type': name}
+            node.update(method(trafaret, path))
+        except _Unexportable as exc:
+            self.flag(path, str(exc))
+            return {'type': 'Any'}
+        if getattr(trafaret, 'converters', None):
+            self.flag(path, "converters can't be exported")
+        return node
+
+    def flag(self, path, reason):
+        self.unexported.append({'path': '.'.join(map(str, path)),
+                                'reason': reason})
+
+    def export_Any(self, trafaret, path):
+        return {}
+    export_Null = export_Bool = export_Any
+
+    def export_Float(self, trafaret, path):
+        node = {}
+        for arg in ('gte', 'lte', 'gt', 'lt'):
+            value = getattr(trafaret, arg)
+            if value is not None:
+                if not isinstance(value, (int, float)) \
+                        or isinstance(value, bool):
+                    raise _Unexportable("bound %r can't be exported"
+                                        % (value,))
+                node[arg] = value
+        return node
+    export_Int = export_Float
+
+    def export_String(self, trafaret, path):
+        node = {}
+        if trafaret.allow_blank:
+            node['allow_blank'] = True
+        for arg in ('min_length', 'max_length'):
+            if getattr(trafaret, arg) is not None:
+                node[arg] = getattr(trafaret, arg)
+        if trafaret.regex is not None:
+            try:
+                node['regex'], node['flags'] = js_regex(trafaret.regex)
+            except _Unexportable as exc:
+                self.flag(path, str(exc))
+        return node
+
+    def export_Email(self, trafaret, path):
+        self.flag(path, "%r is checked as string" % trafaret)
+        return {'type': 'String', 'allow_blank': trafaret.allow_blank}
+    export_URL = export_Email
+
+    def json_value(self, value):
+        if value is not None and not isinstance(value, (
+                bool, int, float, str)):
+            raise _Unexportable("value %r can't be exported" % (value,))
+        return value
+
+    def export_Enum(self, trafaret, path):
+        return {'variants': [self.json_value(v) for v in trafaret.variants]}
+
+    def export_Atom(self, trafaret, path):
+        return {'type': 'Enum', 'variants': [self.json_value(trafaret.value)]}
+
+    def export_List(self, trafaret, path):
+        node = {'trafaret': self.node(trafaret.trafaret, path + [0])}
+        if trafaret.min_length:
+            node['min_length'] = trafaret.min_length
+        if trafaret.max_length is not None:
+            node['max_length'] = trafaret.max_length
+        return node
+
+    def export_Or(self, trafaret, path):
+        return {'trafarets': [self.node(item, path + [index]) for index, item
+                              in enumerate(trafaret.trafarets)]}
+
+    def export_Dict(self, trafaret, path):
+        keys = []
+        for key in trafaret.keys:
+            if type(key) is not Key or not isinstance(key.name, t.str_types):
+                raise _Unexportable("%r can't be exported" % (key,))
+            item = {'name': key.name,
+                    'trafaret': self.node(key.trafaret, path + [key.name])}
+            # defaults are filled in on server
+            if key.optional or key.default is not t._empty:
+                item['optional'] = True
+            keys.append(item)
+        node = {'keys': keys}
+        extras = list(trafaret.extras) + ['*'] * trafaret.allow_any
+        ignore = list(trafaret.ignore) + ['*'] * trafaret.ignore_any
+        if extras:
+            node['allow_extra'] = [self.json_value(name) for name in extras]
+        if ignore:
+            node['ignore_extra'] = [self.json_value(name) for name in ignore]
+        return node
+
+    def export_Forward(self, trafaret, path):
+        if id(trafaret) in self.forwards:
+            return {'ref': self.forwards[id(trafaret)]}
+        if trafaret.trafaret is None:
+            raise _Unexportable("trafaret for Forward is not set")
+        self.forwards[id(trafaret)] = len(self.forwards)
+        return {'id': self.forwards[id(trafaret)],
+                'trafaret': self.node(trafaret.trafaret, path)}
+
+
+def export(trafaret):
+    """
+    Returns document for ``loadTrafaret`` of ``js/contract.js``. Parts
+    that are not exported are listed in ``unexported``.
+    """
+    exporter = _Exporter()
+    node = exporter.node(trafaret, [])
+    return {'version': VERSION, 'trafaret': node,
+            'unexported': exporter.unexported}
+
+
+def dumps(trafaret, strict=False):
+    """
+    Returns document as JSON text, raises ``RuntimeError`` with
+    ``strict`` if any part is not exported
+    """
+    document = export(trafaret)
+    if strict and document['unexported']:
+        raise RuntimeError('not exported: %s' % ', '.join(
+            '%(path)s: %(reason)s' % item
+            for item in document['unexported']))
+    return json.dumps(document, sort_keys=True)
@@ -1,28 +1,91 @@
+import re
+
 from bson import ObjectId
-from bson.errors import InvalidId
 
-from .. import Trafaret, str_types
+from .. import Trafaret, DataError, str_types
+
+
+HEX_ID = re.compile(r'[0-9a-fA-F]{24}\Z')
 
 
 class MongoId(Trafaret):
-    """ Trafaret type check & convert bson.ObjectId values
+    """ Trafaret type check & convert bson.ObjectId values.
+    Strings are checked with precompiled pattern, so bad ids are rejected
+    without constructing ``ObjectId``. With ``convert=False`` valid strings
+    are returned as is.
+
+    >>> MongoId().check('5a0b8d7e1d41c80a4c1e2a3f')
+    ObjectId('5a0b8d7e1d41c80a4c1e2a3f')
+    >>> MongoId(convert=False).check('5a0b8d7e1d41c80a4c1e2a3f')
+    '5a0b8d7e1d41c80a4c1e2a3f'
+    >>> from trafaret import extract_error, List
+    >>> extract_error(MongoId(), '5a0b8d7e1d41c80a4c1e2a3z')
+    'value is not ObjectId'
+    >>> List(MongoId).check(['5a0b8d7e1d41c80a4c1e2a3f'])
+    [ObjectId('5a0b8d7e1d41c80a4c1e2a3f')]
+    >>> extract_error(List(MongoId), ['5a0b8d7e1d41c80a4c1e2a3f', 1])
+    {1: 'value is not ObjectId'}
+    >>> MongoId().check(b'5a0b8d7e1d41c80a4c1e2a3f')
+    ObjectId('5a0b8d7e1d41c80a4c1e2a3f')
     """
 
     convertable = str_types + (ObjectId,)
     value_type = ObjectId
 
+    def __init__(self, allow_blank=False, convert=True):
+        self.allow_blank = allow_blank
+        self.convert = convert
+
     def __repr__(self):
         return "<MongoId(blank)>" if self.allow_blank else "<MongoId>"
 
-    def converter(self, value):
-        try:
-            return self.value_type(value)
-        except InvalidId as e:
-            self._failure(e.message)
+    def is_valid(self, value):
+        if isinstance(value, ObjectId):
+            return True
+        if isinstance(value, bytes):
+            if len(value) == 12:
+                return True
+            value = value.decode('latin-1')
+        elif not isinstance(value, str_types):
+            return False
+        if not value:
+            return self.allow_blank
+        return HEX_ID.match(value) is not None
 
-    def check_and_return(self, value):
+    def _converted(self, value):
+        if isinstance(value, bytes) and len(value) != 12:
+            # hex id, checked by ``is_valid``
+            value = value.decode('ascii')
+        return self.value_type(value)
 
-        if isinstance(value, self.convertable):
+    def converter(self, value):
+        if not self.convert or not value:
             return value
+        return self._converted(value)
 
+    def check_and_return(self, value):
+        if self.is_valid(value):
+            return value
         self._failure('value is not %s' % self.value_type.__name__)
+
+    def check_batch(self, values, errors):
+        """
+        ``List`` hook, checks all ids first and converts them in one pass
+        """
+        custom = hasattr(self, 'converters')
+        res = []
+        for index, value in enumerate(values):
+            try:
+                if custom:
+                    res.append(self.check(value))
+                elif not self.is_valid(value):
+                    self._failure('value is not %s' % self.value_type.__name__)
+            except DataError as err:
+                if not errors.add(index, err):
+                    break
+        if custom:
+            return res
+        if errors or not self.convert:
+            return list(values)
+        converted = self._converted
+        return [converted(value) if value else value for value in values]
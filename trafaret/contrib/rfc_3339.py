@@ -1,28 +1,127 @@
-from dateutil.parser import parse
-from datetime import datetime
+import re
+from datetime import datetime, timedelta, tzinfo
 from .. import Trafaret, str_types
 
+try:
+    from dateutil.parser import parse
+except ImportError:
+    parse = None
+
+try:
+    from datetime import timezone
+except ImportError:
+    class timezone(tzinfo):
+        """ Fixed offset timezone for python 2 """
+
+        def __init__(self, offset):
+            self._offset = offset
+
+        def utcoffset(self, dt):
+            return self._offset
+
+        def dst(self, dt):
+            return timedelta(0)
+
+        def tzname(self, dt):
+            return None
+
+    timezone.utc = timezone(timedelta(0))
+
+
+RFC_3339 = re.compile(
+    r'([0-9]{4})-([0-9]{2})-([0-9]{2})[Tt ]'
+    r'([0-9]{2}):([0-9]{2}):([0-9]{2})(?:\.([0-9]+))?'
+    r'(?:[Zz]|([+-])([01][0-9]|2[0-3]):([0-5][0-9]))\Z'
+)
+
+# offset in minutes -> tzinfo, offsets are few so cache is small
+_timezones = {0: timezone.utc}
+
+
+def _timezone(sign, hours, minutes):
+    offset = int(hours) * 60 + int(minutes)
+    if sign == '-':
+        offset = -offset
+    try:
+        return _timezones[offset]
+    except KeyError:
+        return _timezones.setdefault(offset,
+                                     timezone(timedelta(minutes=offset)))
+
+
+def parse_rfc3339(value):
+    """
+    Strict RFC 3339 timestamp parser, returns aware ``datetime`` or
+    ``None`` if value does not match format. Leap second ``60`` can't be
+    represented by ``datetime`` and is clamped to ``59``.
+
+    >>> parse_rfc3339('2012-05-30T12:01:02.5+03:00')
+    datetime.datetime(2012, 5, 30, 12, 1, 2, 500000, tzinfo=datetime.timezone(datetime.timedelta(seconds=10800)))
+    >>> parse_rfc3339('2012-05-30 12:01:02Z')
+    datetime.datetime(2012, 5, 30, 12, 1, 2, tzinfo=datetime.timezone.utc)
+    >>> parse_rfc3339('2012-05-30')
+    >>> parse_rfc3339('2012-05-30T12:01:02+01:75')
+    >>> parse_rfc3339('2012-05-30T12:01:02Z\\n')
+    >>> parse_rfc3339(u'\u0662\u0660\u0661\u0662-05-30T12:01:02Z')
+    >>> parse_rfc3339('2016-12-31T23:59:60.5Z')
+    datetime.datetime(2016, 12, 31, 23, 59, 59, 500000, tzinfo=datetime.timezone.utc)
+    """
+    if isinstance(value, bytes):
+        value = value.decode('ascii', 'replace')
+    match = RFC_3339.match(value)
+    if match is None:
+        return None
+    (year, month, day, hour, minute, second, fraction,
+     sign, tz_hours, tz_minutes) = match.groups()
+    tz = _timezone(sign, tz_hours, tz_minutes) if sign else timezone.utc
+    microsecond = int(fraction[:6].ljust(6, '0')) if fraction else 0
+    second = int(second)
+    if second == 60:
+        second = 59
+    return datetime(int(year), int(month), int(day), int(hour), int(minute),
+                    second, microsecond, tz)
+
 
 class DateTime(Trafaret):
-    """ Class for support parsing date im RFC3339 formats
-        via dateutil.parse helper
+    """ Class for support parsing date im RFC3339 formats.
+        Timestamps are parsed with strict RFC3339 parser, with
+        ``fallback=True`` other formats are parsed with ``dateutil.parse``
+
+    >>> DateTime().check('2012-05-30T12:01:02Z')
+    datetime.datetime(2012, 5, 30, 12, 1, 2, tzinfo=datetime.timezone.utc)
+    >>> from trafaret import extract_error
+    >>> extract_error(DateTime(), '2012-05-30T25:01:02Z')
+    'hour must be in 0..23'
+    >>> extract_error(DateTime(), '30 May 2012')
+    'value is not RFC3339 timestamp'
+    >>> DateTime(allow_blank=True).check('')
+    ''
     """
     convertable = str_types + (datetime,)
     value_type = datetime
 
-    def __init__(self, allow_blank=False):
+    def __init__(self, allow_blank=False, fallback=False):
         self.allow_blank = allow_blank
+        self.fallback = fallback
 
     def __repr__(self):
         return "<Date(blank)>" if self.allow_blank else "<Date>"
 
     def converter(self, value):
-        if isinstance(value, datetime):
+        if isinstance(value, datetime) or len(value) == 0:
+            # blank value passed check_and_return, allow_blank is set
             return value
         try:
-            return parse(value)
+            res = parse_rfc3339(value)
+            if res is None and self.fallback:
+                if parse is None:
+                    self._failure('dateutil is required to parse value')
+                res = parse(value)
         except ValueError as e:
-            self._failure(e.message)
+            self._failure(str(e))
+        if res is None:
+            self._failure('value is not RFC3339 timestamp')
+        return res
 
     def check_and_return(self, value):
         if isinstance(value, str_types):
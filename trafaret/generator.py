@@ -0,0 +1,398 @@
+""" Generates documents for trafarets, valid ones and broken on purpose.
+
+Streams are deterministic for given seed, documents are checked with
+trafaret before they are returned:
+
+>>> import trafaret as t
+>>> node = t.Forward()
+>>> node << t.Dict({'name': t.String(regex='^[a-z]{2,5}$'),
+...                 t.Key('size', optional=True): t.Int[1:10],
+...                 t.Key('kind', default='file'): t.Enum('file', 'dir'),
+...                 'children': t.List(node, max_length=3)})
+>>> docs = list(documents(node, 20, seed=1, invalid=0.25))
+>>> docs == list(documents(node, 20, seed=1, invalid=0.25))
+True
+>>> all(isinstance(t.catch_error(node, doc), t.DataError) != ok
+...     for doc, ok in docs)
+True
+>>> sum(not ok for doc, ok in docs)
+5
+>>> Generator(t.Dict(id=t.Int[1:9], tags=t.List(t.Enum('a', 'b'))), seed=2).valid()
+{'id': 1, 'tags': []}
+>>> Generator(t.Callable()).valid()
+Traceback (most recent call last):
+...
+RuntimeError: values can't be generated for <Callable>
+"""
+import math
+import random
+import string
+
+try:
+    from re import _parser as sre_parse, _constants as sre_constants
+except ImportError:
+    import sre_parse
+    import sre_constants
+
+import trafaret as t
+from . import Trafaret, DataError, Key, catch_error
+
+
+_letters = string.ascii_letters + string.digits
+_categories = {
+    sre_constants.CATEGORY_DIGIT: string.digits,
+    sre_constants.CATEGORY_WORD: _letters + '_',
+    sre_constants.CATEGORY_SPACE: ' \t\n',
+}
+_printable = _letters + ' -_.,:/@'
+# values tried in place of broken ones, first rejected one is used
+_foreign = [None, True, -1, 0.5, 10 ** 12, '', 'x', 'x' * 1000, [], {},
+            [None], {'': None}]
+
+
+class Generator(object):
+
+    """
+    Makes documents for trafaret from ``random.Random(seed)``. Lists and
+    mappings get no more than ``max_items`` items, below ``max_depth``
+    containers only optional keys, shortest lists and non-recursive ``Or``
+    branches are used, so recursive schemas give finite documents.
+
+    >>> import trafaret as t
+    >>> gen = Generator(t.Dict(id=t.Int[1:9], email=t.Email), seed=3)
+    >>> sorted(gen.valid())
+    ['email', 'id']
+    >>> t.extract_error(t.Dict(id=t.Int[1:9], email=t.Email), gen.invalid()) \\
+    ...     is not None
+    True
+    """
+
+    def __init__(self, trafaret, seed=0, max_items=5, max_depth=4,
+                 attempts=20):
+        self.trafaret = trafaret
+        self.random = random.Random(seed)
+        self.max_items = max_items
+        self.max_depth = max_depth
+        self.attempts = attempts
+        self._recursive = {}
+
+    def valid(self):
+        """ Returns document accepted by trafaret """
+        for _ in range(self.attempts):
+            value = self.value(self.trafaret, 0)
+            if not isinstance(catch_error(self.trafaret, value), DataError):
+                return value
+        raise RuntimeError("valid value for %r is not found in %d attempts"
+                           % (self.trafaret, self.attempts))
+
+    def invalid(self):
+        """ Returns valid document with one part broken """
+        for _ in range(self.attempts):
+            value = self.broken(self.trafaret, self.valid(), 0)
+            if isinstance(catch_error(self.trafaret, value), DataError):
+                return value
+        raise RuntimeError("invalid value for %r is not found in %d attempts"
+                           % (self.trafaret, self.attempts))
+
+    def value(self, trafaret, depth):
+        if not isinstance(trafaret, Trafaret):
+            raise RuntimeError("values can't be generated for %r" % trafaret)
+        name = type(trafaret).__name__
+        method = getattr(self, 'value_' + name, None)
+        if method is None or getattr(t, name, None) is not type(trafaret):
+            raise RuntimeError("values can't be generated for %r" % trafaret)
+        return method(trafaret, depth)
+
+    def value_Any(self, trafaret, depth):
+        return self.random.randint(-1000, 1000)
+
+    def value_Null(self, trafaret, depth):
+        return None
+
+    def value_Bool(self, trafaret, depth):
+        return self.random.random() < 0.5
+
+    def value_Type(self, trafaret, depth):
+        for type_, make in ((int, self.value_Any), (bool, self.value_Bool),
+                            (float, lambda *args: self.random.random()),
+                            (str, lambda *args: self.text(1, 10)),
+                            (type(None), self.value_Null),
+                            (list, lambda *args: []),
+                            (dict, lambda *args: {})):
+            if issubclass(type_, trafaret.type_):
+                return make(trafaret, depth)
+        raise RuntimeError("values can't be generated for %r" % trafaret)
+
+    def bounds(self, trafaret, step):
+        low = [trafaret.gte] if trafaret.gte is not None else []
+        if trafaret.gt is not None:
+            low.append(trafaret.gt + step)
+        high = [trafaret.lte] if trafaret.lte is not None else []
+        if trafaret.lt is not None:
+            high.append(trafaret.lt - step)
+        low = max(low) if low else None
+        high = min(high) if high else None
+        if low is None:
+            low = -1000 if high is None else high - 1000
+        if high is None:
+            high = low + 1000
+        if low > high:
+            raise RuntimeError("bounds of %r are empty" % trafaret)
+        return low, high
+
+    def value_Float(self, trafaret, depth):
+        return self.random.uniform(*self.bounds(trafaret, 1e-9))
+
+    def value_Int(self, trafaret, depth):
+        low, high = self.bounds(trafaret, 1)
+        return self.random.randint(int(math.ceil(low)), int(math.floor(high)))
+
+    def value_Atom(self, trafaret, depth):
+        return trafaret.value
+
+    def value_Enum(self, trafaret, depth):
+        return self.random.choice(trafaret.variants)
+
+    def text(self, low, high):
+        return ''.join(self.random.choice(_letters)
+                       for _ in range(self.random.randint(low, high)))
+
+    def value_String(self, trafaret, depth):
+        low = trafaret.min_length or (0 if trafaret.allow_blank else 1)
+        high = low + 10
+        if trafaret.max_length is not None:
+            high = min(high, trafaret.max_length)
+        if trafaret.regex is None:
+            return self.text(low, high)
+        pattern = trafaret.regex.pattern
+        if isinstance(pattern, bytes):
+            raise RuntimeError("values can't be generated for bytes regex")
+        parsed = sre_parse.parse(pattern)
+        for _ in range(self.attempts):
+            value = self.matching(parsed, {})
+            if low <= len(value) <= (trafaret.max_length or len(value)) \
+                    and trafaret.regex.match(value):
+                return value
+        raise RuntimeError("value matching %r is not found in %d attempts"
+                           % (pattern, self.attempts))
+
+    def value_Email(self, trafaret, depth):
+        return '%s@%s.com' % (self.text(1, 8), self.text(1, 8))
+
+    def value_URL(self, trafaret, depth):
+        return 'https://%s.com/%s' % (self.text(1, 8), self.text(0, 8))
+
+    def matching(self, pattern, groups):
+        """ Returns text matching parsed regex, lookarounds are ignored """
+        parts = []
+        for op, arg in pattern:
+            if op == sre_constants.LITERAL:
+                parts.append(chr(arg))
+            elif op == sre_constants.NOT_LITERAL:
+                parts.append(self.random.choice(_printable.replace(
+                    chr(arg), '')))
+            elif op == sre_constants.ANY:
+                parts.append(self.random.choice(_letters))
+            elif op == sre_constants.IN:
+                parts.append(self.char_in(arg))
+            elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+                low, high, item = arg
+                high = min(high, low + 3)
+                parts.extend(self.matching(item, groups) for _ in range(
+                    self.random.randint(low, high)))
+            elif op == sre_constants.SUBPATTERN:
+                text = self.matching(arg[-1], groups)
+                groups[arg[0]] = text
+                parts.append(text)
+            elif op == sre_constants.BRANCH:
+                parts.append(self.matching(self.random.choice(arg[1]),
+                                           groups))
+            elif op == sre_constants.GROUPREF:
+                parts.append(groups.get(arg, ''))
+            elif op not in (sre_constants.AT, sre_constants.ASSERT,
+                            sre_constants.ASSERT_NOT):
+                raise RuntimeError("values can't be generated for regex "
+                                   "with %s" % op)
+        return ''.join(parts)
+
+    def char_in(self, items):
+        if items and items[0][0] == sre_constants.NEGATE:
+            allowed = [c for c in _printable
+                       if not any(self.in_item(item, c) for item in items[1:])]
+            return self.random.choice(allowed)
+        op, arg = self.random.choice(items)
+        if op == sre_constants.LITERAL:
+            return chr(arg)
+        if op == sre_constants.RANGE:
+            return chr(self.random.randint(*arg))
+        if op == sre_constants.CATEGORY and arg in _categories:
+            return self.random.choice(_categories[arg])
+        raise RuntimeError("values can't be generated for regex with %s"
+                           % op)
+
+    def in_item(self, item, char):
+        op, arg = item
+        if op == sre_constants.LITERAL:
+            return ord(char) == arg
+        if op == sre_constants.RANGE:
+            return arg[0] <= ord(char) <= arg[1]
+        if op == sre_constants.CATEGORY:
+            return char in _categories.get(arg, '')
+        return True
+
+    def count(self, low, high, depth):
+        if depth >= self.max_depth:
+            return low
+        high = low + self.max_items if high is None \
+            else min(high, low + self.max_items)
+        return self.random.randint(low, high)
+
+    def value_List(self, trafaret, depth):
+        return [self.value(trafaret.trafaret, depth + 1) for _ in range(
+            self.count(trafaret.min_length, trafaret.max_length, depth))]
+
+    def value_Tuple(self, trafaret, depth):
+        return tuple(self.value(item, depth + 1)
+                     for item in trafaret.trafarets)
+
+    def value_Mapping(self, trafaret, depth):
+        return dict((self.value(trafaret.key, depth + 1),
+                     self.value(trafaret.value, depth + 1))
+                    for _ in range(self.count(0, None, depth)))
+
+    def value_Dict(self, trafaret, depth):
+        value = {}
+        for key in trafaret.keys:
+            if type(key) is not Key:
+                raise RuntimeError("values can't be generated for %r" % key)
+            if (key.optional or key.default is not t._empty) and (
+                    depth >= self.max_depth or self.random.random() < 0.5):
+                continue
+            value[key.name] = self.value(key.trafaret, depth + 1)
+        for name in trafaret.extras:
+            if depth < self.max_depth and self.random.random() < 0.25:
+                value[name] = self.value_Any(trafaret, depth)
+        return value
+
+    def recursive(self, trafaret, seen=()):
+        """ Checks if trafaret contains ``Forward`` """
+        if id(trafaret) not in self._recursive:
+            children = [getattr(trafaret, name, None) for name in (
+                'trafaret', 'key', 'value')]
+            children += list(getattr(trafaret, 'trafarets', ()))
+            children += [key.trafaret for key in getattr(trafaret, 'keys', ())
+                         if isinstance(key, Key)]
+            self._recursive[id(trafaret)] = isinstance(trafaret, t.Forward) \
+                or any(self.recursive(child) for child in children
+                       if isinstance(child, Trafaret))
+        return self._recursive[id(trafaret)]
+
+    def value_Or(self, trafaret, depth):
+        branches = list(trafaret.trafarets)
+        self.random.shuffle(branches)
+        if depth >= self.max_depth:
+            branches.sort(key=self.recursive)
+        for branch in branches:
+            try:
+                return self.value(branch, depth)
+            except RuntimeError:
+                pass
+        raise RuntimeError("values can't be generated for %r" % trafaret)
+
+    def value_Forward(self, trafaret, depth):
+        return self.value(trafaret.trafaret, depth)
+
+    def value_Limited(self, trafaret, depth):
+        return self.value(trafaret.trafaret, depth)
+    value_Cached = value_Limited
+
+    def broken(self, trafaret, value, depth):
+        """
+        Returns value with one part replaced or removed, result can be
+        still valid, e.g. for ``Any`` or ``Or``
+        """
+        if isinstance(trafaret, (t.Forward, t.Limited, t.Cached)):
+            return self.broken(trafaret.trafaret, value, depth)
+        choices = ['self']
+        if isinstance(value, dict) and isinstance(trafaret, t.Dict):
+            choices += ['key'] * len(value)
+            if not trafaret.allow_any and not trafaret.ignore_any:
+                choices.append('extra')
+            if any(key.name in value and not key.optional
+                   and key.default is t._empty for key in trafaret.keys):
+                choices.append('missing')
+        elif isinstance(value, dict) and isinstance(trafaret, t.Mapping):
+            choices += ['item'] * len(value)
+        elif isinstance(value, (list, tuple)) and isinstance(
+                trafaret, (t.List, t.Tuple)):
+            choices += ['item'] * len(value) + ['length']
+        choice = self.random.choice(choices)
+        if choice == 'key':
+            value = dict(value)
+            key = self.random.choice([key for key in trafaret.keys
+                                      if key.name in value] or [None])
+            if key is not None:
+                value[key.name] = self.broken(key.trafaret, value[key.name],
+                                              depth + 1)
+            return value
+        if choice == 'extra':
+            return dict(value, **{'_extra%d' % depth: 1})
+        if choice == 'missing':
+            value = dict(value)
+            value.pop(self.random.choice([
+                key.name for key in trafaret.keys if key.name in value
+                and not key.optional and key.default is t._empty]))
+            return value
+        if choice == 'item' and isinstance(value, dict):
+            value = dict(value)
+            key = self.random.choice(sorted(value, key=repr))
+            value[key] = self.broken(trafaret.value, value[key], depth + 1)
+            return value
+        if choice == 'item':
+            index = self.random.randrange(len(value))
+            item = trafaret.trafaret if isinstance(trafaret, t.List) \
+                else trafaret.trafarets[index]
+            items = list(value)
+            items[index] = self.broken(item, items[index], depth + 1)
+            return type(value)(items)
+        if choice == 'length':
+            if isinstance(trafaret, t.List) and trafaret.max_length \
+                    is not None and len(value) <= trafaret.max_length:
+                return list(value) + [value[0] if value else None] * (
+                    trafaret.max_length + 1 - len(value))
+            return value[:-1] if value else value
+        return self.rejected(trafaret)
+
+    def rejected(self, trafaret):
+        """ Returns simple value rejected by trafaret, if any """
+        candidates = list(_foreign)
+        for attr, step in (('gte', -1), ('gt', 0), ('lte', 1), ('lt', 0)):
+            bound = getattr(trafaret, attr, None)
+            if isinstance(bound, (int, float)):
+                candidates.append(bound + step)
+        self.random.shuffle(candidates)
+        for candidate in candidates:
+            try:
+                error = catch_error(trafaret, candidate)
+            except Exception:
+                # value crashes trafaret instead of being rejected
+                continue
+            if isinstance(error, DataError):
+                return candidate
+        return candidates[0]
+
+
+def documents(trafaret, count=None, seed=0, invalid=0.0, **kwargs):
+    """
+    Yields ``(document, is_valid)`` pairs, ``invalid`` is fraction of
+    broken documents. Stream is endless if ``count`` is ``None``, other
+    arguments go to ``Generator``.
+    """
+    gen = Generator(trafaret, seed=seed, **kwargs)
+    number = 0
+    while count is None or number < count:
+        if gen.random.random() < invalid:
+            yield gen.invalid(), False
+        else:
+            yield gen.valid(), True
+        number += 1
@@ -0,0 +1,426 @@
+""" Describes trafarets as plain data that can be stored as JSON.
+
+Description is a document of dicts, lists and literals, trafarets are
+nodes with ``type`` and constructor arguments that differ from defaults.
+Functions, converters and types are referenced by name in ``Registry``:
+
+>>> import trafaret as t
+>>> to_upper = registry.register(lambda s: s.upper(), name='upper')
+>>> node = t.Forward()
+>>> node << t.Dict({t.Key('id') >> 'pk': t.Int[1:],
+...                 'name': t.String(max_length=8) >> to_upper,
+...                 t.Key('children', default=[]): t.List(node)})
+>>> text = dumps(node)
+>>> schema = loads(text)
+>>> schema.check({'id': 1, 'name': 'ab', 'children': [{'id': '2', 'name': 'c'}]})
+{'pk': 1, 'name': 'AB', 'children': [{'pk': 2, 'name': 'C', 'children': []}]}
+>>> dumps(schema) == text
+True
+>>> describe(t.Int[1:] | t.Null)['trafaret']
+{'type': 'Or', 'trafarets': [{'type': 'Int', 'gte': 1}, {'type': 'Null'}]}
+>>> describe(t.Int >> abs)
+Traceback (most recent call last):
+...
+RuntimeError: <built-in function abs> is not registered
+
+``Described`` is pickled as its description, so workers rebuild schema
+with their registry instead of pickling functions:
+
+>>> import pickle
+>>> pickle.loads(pickle.dumps(Described(node))).check({'id': 1, 'name': 'x'})
+{'pk': 1, 'name': 'X', 'children': []}
+"""
+import importlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import trafaret as t
+from . import Trafaret, Key
+
+
+VERSION = 1
+
+_literal_types = (type(None), bool, int, float, str) + (
+    (long, unicode) if str is bytes else ())  # noqa
+
+
+class Registry(object):
+
+    """
+    Names of callables and types for descriptions. Register functions in
+    module that defines them, module is imported when document is built
+    in other process:
+
+    >>> names = Registry()
+    >>> @names.register
+    ... def strip(value):
+    ...     return value.strip()
+    >>> names.name_of(strip), names.get('strip') is strip
+    ('strip', True)
+    >>> names.register(len, name='strip')
+    Traceback (most recent call last):
+    ...
+    RuntimeError: name strip is already registered
+    """
+
+    def __init__(self):
+        self.callables = {}
+        self.names = {}
+        self.modules = {}
+        self._lock = threading.Lock()
+
+    def register(self, fn=None, name=None):
+        """ Registers ``fn``, returns it, works as decorator too """
+        if fn is None:
+            return lambda fn: self.register(fn, name)
+        name = name or getattr(fn, '__name__', None)
+        if not name or name == '<lambda>':
+            raise RuntimeError("name should be given for %r" % fn)
+        with self._lock:
+            if self.callables.get(name, fn) is not fn:
+                raise RuntimeError("name %s is already registered" % name)
+            self.callables[name] = fn
+            self.names[fn] = name
+            self.modules[name] = getattr(fn, '__module__', None)
+        return fn
+
+    def name_of(self, fn):
+        try:
+            return self.names[fn]
+        except (KeyError, TypeError):
+            raise RuntimeError("%r is not registered" % fn)
+
+    def get(self, name):
+        try:
+            return self.callables[name]
+        except KeyError:
+            raise RuntimeError("name %s is not registered" % name)
+
+
+registry = Registry()
+for _fn in (int, float, str, bytes, bool, list, dict, tuple, set, frozenset,
+            t.ignore):
+    registry.register(_fn)
+registry.register(type(None), name='NoneType')
+
+
+# type name -> (argument, kind, default) of constructor, ``*`` kinds are
+# positional varargs
+_arguments = {
+    'Any': (), 'Null': (), 'Bool': (), 'StrBool': (), 'Callable': (),
+    'Float': (('gte', 'value', None), ('lte', 'value', None),
+              ('gt', 'value', None), ('lt', 'value', None)),
+    'Atom': (('value', 'value', t._empty),),
+    'Enum': (('variants', '*value', ()),),
+    'Type': (('type_', 'callable', None),),
+    'Call': (('fn', 'callable', None),),
+    'Email': (('allow_blank', 'value', False), ('decode', 'value', False)),
+    'Tuple': (('trafarets', '*trafaret', ()),),
+    'Or': (('trafarets', '*trafaret', ()), ('adaptive', 'value', False),
+           ('reorder_every', 'value', 1000)),
+    'List': (('trafaret', 'trafaret', None), ('min_length', 'value', 0),
+             ('max_length', 'value', None), ('max_errors', 'value', None),
+             ('stop_on_limit', 'value', False), ('lazy', 'value', False),
+             ('output', 'value', 'list'), ('typecode', 'value', None),
+             ('parallel', 'value', None), ('parallel_min', 'value', 1000),
+             ('shared', 'value', False), ('cycles', 'value', 'reject')),
+    'Mapping': (('key', 'trafaret', None), ('value', 'trafaret', None),
+                ('max_errors', 'value', None),
+                ('stop_on_limit', 'value', False), ('lazy', 'value', False),
+                ('shared', 'value', False), ('cycles', 'value', 'reject')),
+    'Limited': (('trafaret', 'trafaret', None),
+                ('max_depth', 'value', None),
+                ('max_total_items', 'value', None),
+                ('max_string_length', 'value', None),
+                ('max_dict_keys', 'value', None)),
+    'Cached': (('trafaret', 'trafaret', None),
+               ('key', 'callable', t._canonical),
+               ('maxsize', 'value', 1024), ('ttl', 'value', None),
+               ('copy', 'value', True),
+               ('timer', 'callable', getattr(time, 'monotonic', time.time))),
+}
+_arguments['Int'] = _arguments['Float']
+_arguments['URL'] = _arguments['Email']
+
+
+def _literal(value):
+    """ Checks that value survives JSON round trip """
+    if isinstance(value, (list, tuple)):
+        return [_literal(item) for item in value]
+    if isinstance(value, dict) and all(isinstance(key, str) for key in value):
+        return dict((key, _literal(item)) for key, item in value.items())
+    if type(value) not in _literal_types:
+        raise RuntimeError("value %r can't be described" % (value,))
+    return value
+
+
+class _Describer(object):
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.forwards = {}
+        self.modules = set()
+
+    def callable(self, fn):
+        name = self.registry.name_of(fn)
+        module = self.registry.modules.get(name)
+        if module not in (None, 'builtins', '__builtin__', 'trafaret'):
+            self.modules.add(module)
+        return name
+
+    def node(self, trafaret):
+        if not isinstance(trafaret, Trafaret):
+            # plain functions are accepted in place of trafarets
+            return {'type': 'function', 'fn': self.callable(trafaret)}
+        name = type(trafaret).__name__
+        if getattr(t, name, None) is not type(trafaret):
+            raise RuntimeError("%r can't be described" % trafaret)
+        method = getattr(self, 'describe_' + name, self.arguments)
+        node = {'type': name}
+        if name not in _arguments and method == self.arguments:
+            raise RuntimeError("%r can't be described" % trafaret)
+        node.update(method(trafaret))
+        if hasattr(trafaret, 'converters'):
+            node['converters'] = [self.callable(fn)
+                                  for fn in trafaret.converters]
+        return node
+
+    def arguments(self, trafaret):
+        node = {}
+        for arg, kind, default in _arguments[type(trafaret).__name__]:
+            value = getattr(trafaret, arg)
+            if kind == 'value':
+                if value != default or type(value) is not type(default):
+                    node[arg] = _literal(value)
+            elif kind == '*value':
+                node[arg] = _literal(value)
+            elif kind == 'callable':
+                if value is not default:
+                    node[arg] = self.callable(value)
+            elif kind == 'trafaret':
+                node[arg] = self.node(value)
+            else:
+                node[arg] = [self.node(item) for item in value]
+        return node
+
+    def describe_String(self, trafaret):
+        node = {}
+        if trafaret.allow_blank:
+            node['allow_blank'] = True
+        if trafaret.regex is not None:
+            node['regex'] = _literal(trafaret.regex.pattern)
+            if trafaret.regex.flags != re.compile(node['regex']).flags:
+                node['flags'] = trafaret.regex.flags
+        for arg in ('min_length', 'max_length'):
+            if getattr(trafaret, arg) is not None:
+                node[arg] = getattr(trafaret, arg)
+        if trafaret.decode:
+            node['decode'] = True
+        elif trafaret.utf8:
+            node['utf8'] = True
+        return node
+
+    def describe_Dict(self, trafaret):
+        keys = []
+        for key in trafaret.keys:
+            if type(key) is not Key:
+                raise RuntimeError("%r can't be described" % key)
+            item = {'name': _literal(key.name),
+                    'trafaret': self.node(key.trafaret)}
+            if key.to_name is not None:
+                item['to_name'] = _literal(key.to_name)
+            if callable(key.default):
+                item['default_fn'] = self.callable(key.default)
+            elif key.default is not t._empty:
+                item['default'] = _literal(key.default)
+            if key.optional:
+                item['optional'] = True
+            keys.append(item)
+        node = {'keys': keys}
+        extras = list(trafaret.extras) + ['*'] * trafaret.allow_any
+        ignore = list(trafaret.ignore) + ['*'] * trafaret.ignore_any
+        for arg, value in (('allow_extra', extras), ('ignore_extra', ignore),
+                           ('max_errors', trafaret.max_errors)):
+            if value:
+                node[arg] = _literal(value)
+        if trafaret.stop_on_limit:
+            node['stop_on_limit'] = True
+        if trafaret.lazy:
+            node['lazy'] = True
+        if trafaret.record_type is not None:
+            node['record'] = trafaret.record_type.__name__
+        if trafaret.sightings is not None:
+            node['sightings'] = _literal(trafaret.sightings)
+            node['max_shapes'] = _literal(trafaret.max_shapes)
+        if trafaret.shared:
+            node['shared'] = True
+            node['cycles'] = _literal(trafaret.cycles)
+        return node
+
+    def describe_Forward(self, trafaret):
+        if id(trafaret) in self.forwards:
+            return {'ref': self.forwards[id(trafaret)]}
+        self.forwards[id(trafaret)] = len(self.forwards)
+        node = {'id': self.forwards[id(trafaret)]}
+        for arg, default in (('iterative', False), ('max_depth', None),
+                             ('shared', False), ('cycles', 'reject')):
+            if getattr(trafaret, arg) != default:
+                node[arg] = _literal(getattr(trafaret, arg))
+        if trafaret.trafaret is not None:
+            node['trafaret'] = self.node(trafaret.trafaret)
+        return node
+
+
+def describe(trafaret, registry=registry):
+    """
+    Returns description document of trafaret. Raises ``RuntimeError`` for
+    custom trafarets and keys, unregistered callables and values that
+    can't be stored in JSON.
+    """
+    describer = _Describer(registry)
+    node = describer.node(trafaret)
+    return {'version': VERSION, 'imports': sorted(describer.modules),
+            'trafaret': node}
+
+
+class _Builder(object):
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.forwards = {}
+
+    def node(self, node):
+        name = node['type']
+        if name == 'function':
+            return self.registry.get(node['fn'])
+        if name not in _arguments and name not in ('String', 'Dict',
+                                                   'Forward'):
+            raise RuntimeError("unknown trafaret type %s" % name)
+        method = getattr(self, 'build_' + name, self.arguments)
+        trafaret = method(getattr(t, name), node)
+        for fn in node.get('converters', ()):
+            trafaret.append(self.registry.get(fn))
+        return trafaret
+
+    def arguments(self, cls, node):
+        args = []
+        kwargs = {}
+        for arg, kind, default in _arguments[cls.__name__]:
+            if arg not in node:
+                continue
+            value = node[arg]
+            if kind == 'callable':
+                value = self.registry.get(value)
+            elif kind == 'trafaret':
+                value = self.node(value)
+            elif kind == '*trafaret':
+                value = [self.node(item) for item in value]
+            if kind.startswith('*'):
+                args.extend(value)
+            else:
+                kwargs[arg] = value
+        return cls(*args, **kwargs)
+
+    def build_String(self, cls, node):
+        kwargs = dict((arg, node[arg]) for arg in (
+            'allow_blank', 'min_length', 'max_length', 'utf8', 'decode')
+            if arg in node)
+        if 'regex' in node:
+            kwargs['regex'] = re.compile(node['regex'], node.get('flags', 0))
+        return cls(**kwargs)
+
+    def build_Dict(self, cls, node):
+        keys = OrderedDict()
+        for item in node['keys']:
+            default = self.registry.get(item['default_fn']) \
+                if 'default_fn' in item else item.get('default', t._empty)
+            key = Key(item['name'], default=default,
+                      optional=item.get('optional', False),
+                      to_name=item.get('to_name'))
+            keys[key] = self.node(item['trafaret'])
+        trafaret = cls(keys)
+        trafaret = trafaret.allow_extra(*node.get('allow_extra', ())) \
+            .ignore_extra(*node.get('ignore_extra', ()))
+        if 'max_errors' in node:
+            trafaret.limit_errors(node['max_errors'],
+                                  node.get('stop_on_limit', False))
+        if node.get('lazy'):
+            trafaret.make_lazy()
+        if 'record' in node:
+            trafaret.as_record(node['record'])
+        if 'sightings' in node:
+            trafaret.adaptive(node['sightings'], node['max_shapes'])
+        if node.get('shared'):
+            trafaret.share(cycles=node['cycles'])
+        return trafaret
+
+    def build_Forward(self, cls, node):
+        if 'ref' in node:
+            return self.forwards[node['ref']]
+        trafaret = self.forwards[node['id']] = cls(
+            **dict((arg, node[arg]) for arg in (
+                'iterative', 'max_depth', 'shared', 'cycles') if arg in node))
+        if 'trafaret' in node:
+            trafaret.provide(self.node(node['trafaret']))
+        return trafaret
+
+
+def build(document, registry=registry):
+    """
+    Returns trafaret for description document. Modules listed in
+    ``imports`` are imported first, they register callables they define.
+    """
+    if document.get('version') != VERSION:
+        raise RuntimeError("description version %r is not supported"
+                           % document.get('version'))
+    for module in document.get('imports', ()):
+        importlib.import_module(module)
+    return _Builder(registry).node(document['trafaret'])
+
+
+def dumps(trafaret, registry=registry):
+    """ Returns description of trafaret as JSON text """
+    return json.dumps(describe(trafaret, registry), sort_keys=True)
+
+
+def loads(text, registry=registry):
+    """ Builds trafaret from JSON text returned by ``dumps`` """
+    return build(json.loads(text), registry)
+
+
+# JSON text -> trafaret, unpickled copies of one description share it
+_built = {}
+_built_limit = 128
+
+
+def _rebuild(text):
+    trafaret = _built.get(text)
+    if trafaret is None:
+        if len(_built) >= _built_limit:
+            _built.clear()
+        trafaret = _built[text] = loads(text)
+    return Described(trafaret, text)
+
+
+class Described(Trafaret):
+
+    """
+    Trafaret pickled as its JSON description, unpickled copies are built
+    with default ``registry`` once per process and description
+    """
+
+    def __init__(self, trafaret, text=None):
+        self.trafaret = self._trafaret(trafaret)
+        self.text = text or dumps(self.trafaret)
+
+    def check_and_return(self, value):
+        return self.trafaret.check(value)
+
+    def __reduce__(self):
+        return _rebuild, (self.text,)
+
+    def __repr__(self):
+        return '<Described(%r)>' % self.trafaret
@@ -1,39 +1,37 @@
 """
 There will be small helpers to render forms with exist trafarets for DRY.
 """
-import collections
-from itertools import groupby
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
 
 
-def recursive_unfold(data, prefix='', delimeter='__'):
-
-    def concat(prefix, value, delimeter):
-        return (prefix + delimeter if prefix else '') + str(value)
-
-    def unfold_list(data, prefix, delimeter):
-        i = 0
-        for value in data:
-            for pair in recursive_unfold(
-                    value, concat(prefix, str(i), delimeter), delimeter):
-                yield pair
-            i += 1
-
-    def unfold_dict(data, prefix, delimeter):
-        for key, value in data.items():
-            for pair in recursive_unfold(
-                    value, concat(prefix, key, delimeter), delimeter):
-                yield pair
+def iter_unfold(data, prefix='', delimeter='__'):
+    """
+    Yields ``(flat_key, value)`` pairs for nested dicts and lists.
+    Walks structure with explicit stack instead of nested generators.
 
-    if isinstance(data, collections.Mapping):
-        for pair in unfold_dict(data, prefix, delimeter):
-            yield pair
+    >>> list(iter_unfold({'a': [1, {'b': 2}]}))
+    [('a__0', 1), ('a__1__b', 2)]
+    """
+    stack = [(prefix, data)]
+    while stack:
+        prefix, data = stack.pop()
+        if isinstance(data, Mapping):
+            items = list(data.items())
+        elif isinstance(data, (list, tuple)):
+            items = list(enumerate(data))
+        else:
+            yield prefix, data
+            continue
+        head = prefix + delimeter if prefix else ''
+        for key, value in reversed(items):
+            stack.append((head + str(key), value))
 
-    elif isinstance(data, (list, tuple)):
-        for pair in unfold_list(data, prefix, delimeter):
-            yield pair
 
-    else:
-        yield prefix, data
+# backward compatibility
+recursive_unfold = iter_unfold
 
 
 def unfold(data, prefix='', delimeter='__'):
@@ -48,11 +46,14 @@ def unfold(data, prefix='', delimeter='__'):
     >>> repr(unfold({'a': {'a': 4, 'b': 5}}, 'form'))
     "{'form__a__a': 4, 'form__a__b': 5}"
     """
-    return dict(recursive_unfold(data, prefix, delimeter))
+    return dict(iter_unfold(data, prefix, delimeter))
 
 
 def fold(data, prefix='', delimeter='__'):
     """
+    Builds nested structure from flat keys in one pass over ``data``,
+    nodes with only numeric keys become lists ordered by index.
+
     >>> from reprlib import repr
     >>> repr(fold({'a__a': 4}))
     "{'a': {'a': 4}}"
@@ -66,24 +67,62 @@ def fold(data, prefix='', delimeter='__'):
     "{'a': {'a': [4, 7], 'b': 5}}"
     >>> repr(fold({'form__1__b': 5, 'form__0__a__0': 4, 'form__0__a__1': 7}, 'form'))
     "[{'a': [4, 7]}, {'b': 5}]"
+    >>> fold({'a__10': 10, 'a__2': 2, 'a__1': 1})
+    {'a': [1, 2, 10]}
+    >>> fold({'a': 1, 'a__b': 2})
+    Traceback (most recent call last):
+    ...
+    ValueError: a has both value and nested keys
     """
-    def deep(data):
-        if len(data) == 1 and len(data[0][0]) < 2:
-            if data[0][0]:
-                return {data[0][0][0]: data[0][1]}
-            return data[0][1]
-
-        collect = {}
-        for key, group in groupby(data, lambda kv: kv[0][0]):
-            nest_data = [(k[1:], v) for k, v in group]
-            collect[key] = deep(nest_data)
-
-        is_num = all(k.isdigit() for k in collect.keys())
-        if is_num:
-            return [i[1] for i in sorted(collect.items())]
-        return collect
-
-    data_ = [(key.split(delimeter), value)
-                 for key, value in sorted(data.items())]
-    result = deep(data_)
-    return result[prefix] if prefix else result
+    head = prefix + delimeter if prefix else ''
+    head_len = len(head)
+    pairs = []
+    for key, value in data.items():
+        if head:
+            if not key.startswith(head):
+                continue
+            key = key[head_len:]
+        pairs.append((key.split(delimeter), value))
+    return fold_paths(pairs, delimeter)
+
+
+def fold_paths(pairs, delimeter='__'):
+    """
+    Same as ``fold`` for ``(path, value)`` pairs with already splitted keys,
+    raises ``ValueError`` if path is both value and prefix of other paths
+
+    >>> fold_paths([(('a', '0'), 1), (('a', '1', 'b'), 2)])
+    {'a': [1, {'b': 2}]}
+    """
+    root = {}
+    # (parent, key, node) in creation order, parents go before children
+    nodes = []
+    created = set([id(root)])
+    for path, value in pairs:
+        node = root
+        for depth, name in enumerate(path[:-1]):
+            if name not in node:
+                child = node[name] = {}
+                created.add(id(child))
+                nodes.append((node, name, child))
+            elif id(node[name]) not in created:
+                _conflict(path[:depth + 1], delimeter)
+            node = node[name]
+        if id(node.get(path[-1])) in created:
+            _conflict(path, delimeter)
+        node[path[-1]] = value
+    for parent, name, node in reversed(nodes):
+        if parent.get(name) is node:
+            parent[name] = _fold_node(node)
+    return _fold_node(root)
+
+
+def _conflict(path, delimeter):
+    raise ValueError('%s has both value and nested keys'
+                     % delimeter.join(map(str, path)))
+
+
+def _fold_node(node):
+    if node and all(k.isdigit() for k in node):
+        return [v for k, v in sorted(node.items(), key=lambda kv: int(kv[0]))]
+    return node
@@ -1,24 +1,39 @@
 """ This module is expirement. API and implementation are unstable.
     Supposed to use with ``Request`` object or something like that.
 """
-from collections import Mapping
-from . import Trafaret, DataError, Key, catch_error
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+import weakref
+from . import Trafaret, DataError, Key, catch_error, _empty
+
+
+# type -> True if values of type are looked up by items first, weak keys
+# let classes created at runtime go away
+_item_access = weakref.WeakKeyDictionary()
+
+
+def get_step(obj, key):
+    """ Looks up one path step, items for mappings, then attributes """
+    cls = type(obj)
+    try:
+        by_item = _item_access[cls]
+    except KeyError:
+        by_item = _item_access[cls] = isinstance(obj, Mapping)
+    if by_item and key in obj:
+        return obj[key]
+    try:
+        return getattr(obj, key)
+    except AttributeError:
+        raise DataError(error='Unexistent key')
 
 
 def get_deep_attr(obj, keys):
     """ Helper for DeepKey"""
     cur = obj
     for k in keys:
-        if isinstance(cur, Mapping) and k in cur:
-            cur = cur[k]
-            continue
-        else:
-            try:
-                cur = getattr(cur, k)
-                continue
-            except AttributeError:
-                pass
-        raise DataError(error='Unexistent key')
+        cur = get_step(cur, k)
     return cur
 
 
@@ -37,24 +52,52 @@ class DeepKey(Key):
     >>> dict((DeepKey('B.a') >> 'B_a').pop(A))
     {'B.a': DataError(Unexistent key)}
     >>> dict(DeepKey('c.B.d.a', to_name='B_a', trafaret=Int()).pop({'c': A}))
-    {'B_a': DataError(value can't be converted to int)}
+    {'B_a': DataError(value word can't be converted to int)}
     """
 
+    def __init__(self, name, *args, **kwargs):
+        super(DeepKey, self).__init__(name, *args, **kwargs)
+        self.path = tuple(name.split('.'))
+
     def pop(self, data):
         try:
-            yield self.get_name(),  catch_error(self.trafaret,
-                    get_deep_attr(data, self.name.split('.')))
+            value = get_deep_attr(data, self.path)
         except DataError as e:
-            if self.default:
-                yield self.get_name(), self.default
-            elif not self.optional:
-                yield self.name, e
+            value = e
+        return self.pop_resolved(value)
+
+    def pop_resolved(self, value):
+        """ Same as ``pop`` for already looked up value or lookup error """
+        if not isinstance(value, DataError):
+            yield self.get_name(), catch_error(self.trafaret, value)
+        elif self.default is not _empty:
+            yield self.get_name(), self.default
+        elif not self.optional:
+            yield self.name, value
 
 
 class Visitor(Trafaret):
     """ Check any object or mapping with ``DeepKey`` instances.
     This means that counts only existance and correctness of given paths.
     Visitor will not check for additional attributes etc.
+
+    Keys are merged to prefix tree, so common path prefixes are looked up
+    once per check.
+
+    >>> from trafaret import Int, String, extract_error
+    >>> class User(object):
+    ...     profile = {'name': 'Adam', 'age': '42'}
+    >>> request = {'user': User}
+    >>> visitor = Visitor({
+    ...     'user.profile.name': String,
+    ...     DeepKey('user.profile.age') >> 'age': Int,
+    ...     'user.email': String,
+    ... })
+    >>> extract_error(visitor, request)
+    {'user.email': 'Unexistent key'}
+    >>> visitor = Visitor({'user.profile.name': String, DeepKey('user.profile.age') >> 'age': Int})
+    >>> sorted(visitor.check(request).items())
+    [('age', 42), ('user.profile.name', 'Adam')]
     """
 
     def __init__(self, keys):
@@ -63,16 +106,35 @@ class Visitor(Trafaret):
             key_ = key if isinstance(key, DeepKey) else DeepKey(key)
             key_.set_trafaret(self._trafaret(trafaret))
             self.keys.append(key_)
+        # node is (children by path step, keys ending at node)
+        self.trie = ({}, [])
+        for key in self.keys:
+            node = self.trie
+            for step in key.path:
+                node = node[0].setdefault(step, ({}, []))
+            node[1].append(key)
 
-    def _check_val(self, value):
+    def check_and_return(self, value):
         errors = {}
         data = {}
-        for key in self.keys:
-            for name, res in key.pop(value):
-                if isinstance(res, DataError):
-                    errors[name] = res
-                else:
-                    data[name] = res
+        stack = [(self.trie, value)]
+        while stack:
+            (children, keys), cur = stack.pop()
+            for key in keys:
+                for name, res in key.pop_resolved(cur):
+                    if isinstance(res, DataError):
+                        errors[name] = res
+                    else:
+                        data[name] = res
+            for step, child in children.items():
+                # lookup error is passed down to every key under the step
+                found = cur
+                if not isinstance(cur, DataError):
+                    try:
+                        found = get_step(cur, step)
+                    except DataError as e:
+                        found = e
+                stack.append((child, found))
         if errors:
             raise DataError(error=errors)
         return data